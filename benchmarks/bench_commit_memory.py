@@ -0,0 +1,90 @@
+"""
+Memory held by the parsed commits of a synthetic history: the previous `__dict__` commit class with a list of
+`Author` dataclasses per commit against the slotted `TGITCommit` with interned authors.
+
+Usage: python -m benchmarks.bench_commit_memory [commits ...]
+"""
+
+import gc
+import sys
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from tgit.changelog import TGITCommit, parse_commit_subject
+from tgit.gitlog import CommitAuthor, CommitRecord
+
+AUTHORS = [CommitAuthor(f"Contributor {n}", f"contributor{n}@example.com") for n in range(40)]
+TYPES = ["feat", "fix", "refactor", "docs", "chore", "test", "perf"]
+SCOPES = ["cli", "core", "changelog", "version", "commit"]
+
+
+@dataclass
+class LegacyAuthor:
+    name: str
+    email: str
+
+
+class LegacyCommit:
+    """The commit class before it was slotted: one `__dict__` and fresh Author objects per commit."""
+
+    def __init__(self, record: CommitRecord, message_dict: dict[str, Any]) -> None:
+        self.authors = [LegacyAuthor(record.author.name, record.author.email)]
+        self.authors += [LegacyAuthor(a.name, a.email) for a in record.co_authors]
+        self.date = record.committed_datetime
+        self.emoji = message_dict.get("emoji")
+        self.type = message_dict.get("type")
+        self.scope = message_dict.get("scope")
+        self.description = message_dict.get("description")
+        self.breaking = bool(message_dict.get("breaking"))
+        self.hash = record.short_hash
+
+
+def build_records(count: int) -> list[CommitRecord]:
+    start = datetime(2020, 1, 1, tzinfo=UTC)
+    records = []
+    for i in range(count):
+        sha = f"{i:040x}"
+        subject = f"{TYPES[i % len(TYPES)]}({SCOPES[i % len(SCOPES)]}): change number {i}"
+        co_authors = (AUTHORS[(i + 1) % len(AUTHORS)],) if i % 4 == 0 else ()
+        records.append(
+            CommitRecord(sha, sha[:7], (), AUTHORS[i % len(AUTHORS)], start + timedelta(minutes=i), subject, co_authors),
+        )
+    return records
+
+
+def build_legacy(records: list[CommitRecord]) -> list[Any]:
+    return [LegacyCommit(record, parse_commit_subject(record.subject) or {}) for record in records]
+
+
+def build_slotted(records: list[CommitRecord]) -> list[Any]:
+    return [TGITCommit.from_record(record, parse_commit_subject(record.subject) or {}) for record in records]
+
+
+def measure(build: Callable[[list[CommitRecord]], list[Any]], records: list[CommitRecord]) -> int:
+    """Bytes still allocated once the commits are built, i.e. what a changelog run keeps alive."""
+    gc.collect()
+    tracemalloc.start()
+    commits = build(records)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del commits
+    return current
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [200_000]
+    for size in sizes:
+        records = build_records(size)
+        legacy = measure(build_legacy, records)
+        slotted = measure(build_slotted, records)
+        print(
+            f"{size:>8} commits  dict + Author list {legacy / 2**20:8.1f} MiB"
+            f"  slotted + interned {slotted / 2**20:8.1f} MiB  ({legacy / slotted:4.1f}x)",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Compare reading the whole changelog into memory with the streamed prepend in `write_changelog_prepend`.
+
+Usage: python -m benchmarks.bench_prepend [megabytes ...]
+"""
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from tgit.changelog import write_changelog_prepend
+
+NEW_CONTENT = "## v9.9.9\n\n### Features\n\n- **cli**: something new\n"
+
+
+def build_changelog(path: Path, megabytes: int) -> None:
+    block = "".join(f"## v0.{i}.0\n\n### Bug Fixes\n\n- fix the thing number {i}\n\n" for i in range(1000))
+    with path.open("w", encoding="utf-8") as f:
+        written = 0
+        while written < megabytes * 1024 * 1024:
+            written += f.write(block)
+
+
+def read_all_prepend(filepath: str, new_content: str) -> None:
+    """The old behaviour: read the file and rewrite it in place."""
+    path = Path(filepath)
+    with path.open("r", encoding="utf-8") as f:
+        old_content = f.read()
+    with path.open("w", encoding="utf-8") as f:
+        f.write(new_content.strip("\n") + "\n\n" + old_content)
+
+
+def measure(prepend: Callable[[str, str], None], path: Path) -> tuple[float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    prepend(str(path), NEW_CONTENT)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [50]
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "CHANGELOG.md"
+            build_changelog(path, size)
+            old_time, old_peak = measure(read_all_prepend, path)
+            new_time, new_peak = measure(write_changelog_prepend, path)
+            print(
+                f"{size:>5} MB  read-all {old_time:7.3f}s peak {old_peak / 2**20:8.1f} MiB"
+                f"  streamed {new_time:7.3f}s peak {new_peak / 2**20:8.1f} MiB",
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Compare one `git log` per version segment with the single-pass segment walk.
+
+Usage: python -m benchmarks.bench_segments [tags ...]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import git
+
+from benchmarks.synthetic import build_linear_repo
+from tgit.changelog import bucket_records_by_segment, prepare_changelog_segments
+from tgit.gitlog import iter_commit_records
+
+COMMITS_PER_TAG = 5
+
+
+def time_single_pass(repo: git.Repo, segments: list) -> float:
+    start = time.perf_counter()
+    for _ in bucket_records_by_segment(repo, segments):
+        pass
+    return time.perf_counter() - start
+
+
+def time_per_segment(repo: git.Repo, segments: list) -> float:
+    """The old behaviour: one history walk per segment."""
+    start = time.perf_counter()
+    for segment in segments:
+        list(iter_commit_records(repo, f"{segment.from_hash}...{segment.to_hash}"))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    tag_counts = [int(arg) for arg in sys.argv[1:]] or [100, 1000]
+    for tags in tag_counts:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo = git.Repo(build_linear_repo(Path(temp_dir) / "repo", tags * COMMITS_PER_TAG, tag_every=COMMITS_PER_TAG))
+            segments = prepare_changelog_segments(repo)
+            new = time_single_pass(repo, segments)
+            old = time_per_segment(repo, segments)
+            print(f"{tags:>6} tags  single pass {new:8.3f}s  per segment {old:8.3f}s  ({old / new:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
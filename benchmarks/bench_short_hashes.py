@@ -0,0 +1,44 @@
+"""
+Compare per-commit `git rev-parse --short` with in-memory abbreviation in `get_commits`.
+
+Usage: python benchmarks/bench_short_hashes.py [commits ...]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import git
+
+from benchmarks.synthetic import build_linear_repo
+from tgit.changelog import get_commits, get_first_commit_hash
+
+
+def time_get_commits(repo: git.Repo, first: str) -> float:
+    start = time.perf_counter()
+    get_commits(repo, first, "HEAD")
+    return time.perf_counter() - start
+
+
+def time_rev_parse(repo: git.Repo, first: str) -> float:
+    """The old behaviour: one `git rev-parse` subprocess per commit."""
+    start = time.perf_counter()
+    for commit in repo.iter_commits(f"{first}...HEAD"):
+        repo.git.rev_parse(commit.hexsha, short=7)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 5000]
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo = git.Repo(build_linear_repo(Path(temp_dir) / "repo", size))
+            first = get_first_commit_hash(repo)
+            new = time_get_commits(repo, first)
+            old = time_rev_parse(repo, first) + new
+            print(f"{size:>8} commits  get_commits {new:8.3f}s  with per-commit rev-parse {old:8.3f}s  ({old / new:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Peak memory and time of building the AI prompt diff for a large staged file: the whole `git diff --cached`
+output split and truncated in Python against the streamed `read_staged_changes` with per-file limits.
+
+Usage: python -m benchmarks.bench_staged_diff [megabytes ...]
+"""
+
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+import git
+
+from tgit.commit import _build_diff_for_ai, _patch_limits, _truncate_diff_section
+from tgit.staged import read_staged_changes
+
+
+def build_repo(path: Path, megabytes: int) -> git.Repo:
+    subprocess.run(["git", "init", "-q", str(path)], check=True)
+    line = "INSERT INTO dump VALUES (1, 'some row of a database dump that nobody wants in the prompt');\n"
+    with (path / "dump.sql").open("w") as f:
+        f.write(line * (megabytes * 1024 * 1024 // len(line)))
+    (path / "app.py").write_text("print('hello')\n")
+    repo = git.Repo(path)
+    repo.index.add(["dump.sql", "app.py"])
+    return repo
+
+
+def whole_diff(repo: git.Repo) -> str:
+    """The old path: the full diff as one string, split per file and then truncated."""
+    diff = repo.git.diff("--cached", "-M")
+    sections: list[str] = []
+    current: list[str] = []
+    for line in diff.splitlines(keepends=True):
+        if line.startswith("diff --git ") and current:
+            sections.append("".join(current))
+            current = [line]
+            continue
+        current.append(line)
+    if current:
+        sections.append("".join(current))
+    return "".join(_truncate_diff_section(section) for section in sections)
+
+
+def streamed_diff(repo: git.Repo) -> str:
+    return _build_diff_for_ai(read_staged_changes(repo, _patch_limits())) or ""
+
+
+def measure(build: Callable[[git.Repo], str], repo: git.Repo) -> tuple[float, int, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    diff = build(repo)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, len(diff)
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [200]
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo = build_repo(Path(temp_dir), size)
+            old_time, old_peak, old_len = measure(whole_diff, repo)
+            new_time, new_peak, new_len = measure(streamed_diff, repo)
+            print(
+                f"{size:>5} MB staged  whole diff {old_time:7.2f}s peak {old_peak / 2**20:8.1f} MiB"
+                f"  streamed {new_time:7.2f}s peak {new_peak / 2**20:8.1f} MiB  (prompt {old_len} vs {new_len} chars)",
+            )
+
+
+if __name__ == "__main__":
+    main()
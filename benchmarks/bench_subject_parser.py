@@ -0,0 +1,86 @@
+"""
+Throughput of conventional-commit parsing: the full-message regex plus Co-authored-by line scan
+against `parse_commit_subject` on the subject and trailer values `git log` already extracted.
+
+Usage: python -m benchmarks.bench_subject_parser [messages ...]
+"""
+
+import random
+import re
+import sys
+import time
+from collections.abc import Callable
+
+from tgit.changelog import commit_pattern, parse_commit_subject
+from tgit.gitlog import parse_trailer_authors
+
+SUBJECTS = [
+    "feat(cli): add a flag number {i}",
+    "fix: handle the edge case {i}",
+    ":sparkles: feat: emoji subject {i}",
+    "refactor(core)!: rename internals {i}",
+    "Merge pull request #{i} from someone/branch",
+    "Update README.md",
+    "WIP {i}",
+]
+BODY = "\n".join(f"Some explanation of the change, line {n}." for n in range(8))
+co_author_pattern = re.compile(r"Co-authored-by: (?P<name>.+?) <(?P<email>.+?)>", re.IGNORECASE)
+
+
+def build_messages(count: int) -> list[tuple[str, str, str]]:
+    """(full message, subject, trailer values) triples, a third of them with a co-author."""
+    rng = random.Random(0)
+    messages = []
+    for i in range(count):
+        subject = rng.choice(SUBJECTS).format(i=i)
+        trailers = f"Jane Doe <jane{i % 50}@example.com>" if i % 3 == 0 else ""
+        message = f"{subject}\n\n{BODY}\n"
+        if trailers:
+            message += f"\nCo-authored-by: {trailers}\n"
+        messages.append((message, subject, trailers))
+    return messages
+
+
+def full_message(messages: list[tuple[str, str, str]]) -> int:
+    """The old path: the regex on the whole message and a scan of every line for co-authors."""
+    matched = 0
+    for message, _, _ in messages:
+        if m := commit_pattern.match(message):
+            m.groupdict()
+            co_author_raws = [line for line in message.split("\n") if line.lower().startswith("co-authored-by:")]
+            [match.groupdict() for co_author in co_author_raws if (match := co_author_pattern.match(co_author))]
+            matched += 1
+    return matched
+
+
+def subject_only(messages: list[tuple[str, str, str]]) -> int:
+    matched = 0
+    for _, subject, trailers in messages:
+        if parse_commit_subject(subject) is not None:
+            parse_trailer_authors(trailers)
+            matched += 1
+    return matched
+
+
+def measure(parse: Callable[[list[tuple[str, str, str]]], int], messages: list[tuple[str, str, str]]) -> tuple[float, int]:
+    start = time.perf_counter()
+    matched = parse(messages)
+    return time.perf_counter() - start, matched
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000_000]
+    for size in sizes:
+        messages = build_messages(size)
+        old, old_matched = measure(full_message, messages)
+        new, new_matched = measure(subject_only, messages)
+        if old_matched != new_matched:
+            msg = f"parsers disagree: {old_matched} vs {new_matched} matches"
+            raise RuntimeError(msg)
+        print(
+            f"{size:>9} messages  full message {size / old:12,.0f} msg/s  subject only {size / new:12,.0f} msg/s  ({old / new:4.1f}x)",
+        )
+
+
+if __name__ == "__main__":
+    main()
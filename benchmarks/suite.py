@@ -0,0 +1,211 @@
+"""
+Time changelog and version operations on synthetic repositories and store the results as JSON.
+
+Usage:
+    python -m benchmarks.suite                          # the default 10k-commit scenarios
+    python -m benchmarks.suite -s linear-100k -s merge-heavy-100k
+    python -m benchmarks.suite -s all --repeat 3 --baseline benchmarks/results/<earlier>.json
+
+Built repositories are kept in --workdir (default: a temp dir) so later runs can reuse them.
+Results go to benchmarks/results/<timestamp>.json unless --output is given.
+"""
+
+import argparse
+import dataclasses
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+
+import git
+
+from benchmarks.synthetic import RepoSpec, build_repo
+from tgit.changelog import ChangelogArgs, get_commits, get_git_commits_range, group_commits_by_type, handle_changelog
+from tgit.repo_cache import clear_repo_cache
+from tgit.version import Version, VersionArgs, get_default_bump_by_commits_dict, get_detected_files, update_version_files
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+SCENARIOS = {
+    "linear-10k": RepoSpec(10_000, tags=10),
+    "linear-10k-5000tags": RepoSpec(10_000, tags=5_000),
+    "merge-heavy-10k": RepoSpec(10_000, tags=100, merge_every=5),
+    "monorepo-10k": RepoSpec(10_000, tags=50, packages=50),
+    "linear-100k": RepoSpec(100_000, tags=500),
+    "merge-heavy-100k": RepoSpec(100_000, tags=1_000, merge_every=5),
+    "monorepo-100k": RepoSpec(100_000, tags=500, packages=500),
+    "linear-1m": RepoSpec(1_000_000, tags=5_000),
+}
+DEFAULT_SCENARIOS = ("linear-10k", "linear-10k-5000tags", "merge-heavy-10k", "monorepo-10k")
+
+
+def _changelog(path: Path, *, cached: bool, traversal: str = "all") -> Callable[[], object]:
+    output = path / "CHANGELOG.md"
+
+    def run() -> None:
+        output.unlink(missing_ok=True)
+        args = ChangelogArgs(
+            from_raw=None,
+            to_raw=None,
+            verbose=0,
+            path=str(path),
+            output=str(output),
+            no_cache=not cached,
+            render="none",
+            traversal=traversal,
+        )
+        handle_changelog(args)
+
+    if cached:
+        # 先跑一次填充缓存，计时的是缓存命中后的运行
+        run()
+    return run
+
+
+def _default_bump(path: Path) -> Callable[[], object]:
+    def run() -> str:
+        repo = git.Repo(path)
+        from_ref, to_ref = get_git_commits_range(repo, "", "")
+        commits_by_type = group_commits_by_type(get_commits(repo, from_ref, to_ref))
+        return get_default_bump_by_commits_dict(commits_by_type, Version(0, 1, 0))
+
+    return run
+
+
+def _update_version_files(path: Path) -> Callable[[], object]:
+    args = VersionArgs(
+        version="",
+        verbose=0,
+        no_commit=True,
+        no_tag=True,
+        no_push=True,
+        patch=False,
+        minor=False,
+        major=False,
+        prepatch="",
+        preminor="",
+        premajor="",
+        recursive=True,
+        custom="",
+        path=str(path),
+    )
+    return lambda: update_version_files(args, Version(1, 2, 3), 0, recursive=True)
+
+
+OPERATIONS: dict[str, Callable[[Path], Callable[[], object]]] = {
+    "handle_changelog": lambda path: _changelog(path, cached=False),
+    "handle_changelog_cached": lambda path: _changelog(path, cached=True),
+    "handle_changelog_first_parent": lambda path: _changelog(path, cached=False, traversal="first-parent"),
+    "handle_changelog_merges": lambda path: _changelog(path, cached=False, traversal="merges"),
+    "get_default_bump_by_commits_dict": _default_bump,
+    "get_detected_files": lambda path: lambda: get_detected_files(str(path)),
+    "update_version_files": _update_version_files,
+}
+
+
+def time_operation(run: Callable[[], object], repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        # 每次都从冷的进程内缓存开始
+        clear_repo_cache()
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def prepare_repo(workdir: Path, name: str, spec: RepoSpec) -> tuple[Path, float]:
+    """Build the scenario's repository unless `workdir` already has one for the same spec; returns the build time."""
+    path = workdir / name
+    spec_file = workdir / f"{name}.json"
+    spec_json = json.dumps(dataclasses.asdict(spec), sort_keys=True)
+    if path.exists() and spec_file.exists() and spec_file.read_text() == spec_json:
+        return path, 0.0
+    shutil.rmtree(path, ignore_errors=True)
+    start = time.perf_counter()
+    build_repo(path, spec)
+    spec_file.write_text(spec_json)
+    return path, time.perf_counter() - start
+
+
+def environment() -> dict[str, Any]:
+    revision = subprocess.run(
+        ["git", "rev-parse", "HEAD"], cwd=Path(__file__).parent, capture_output=True, text=True, check=False
+    ).stdout.strip()
+    return {
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "tgit": metadata.version("tgit"),
+        "revision": revision or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "git": git.Git().version(),
+    }
+
+
+def run_suite(scenarios: list[str], workdir: Path, repeat: int) -> dict[str, Any]:
+    results = []
+    for name in scenarios:
+        spec = SCENARIOS[name]
+        path, build_seconds = prepare_repo(workdir, name, spec)
+        print(f"{name}: {spec.commits} commits, {spec.tags} tags" + (f" (built in {build_seconds:.1f}s)" if build_seconds else ""))
+        for operation, make in OPERATIONS.items():
+            timings = time_operation(make(path), repeat)
+            results.append(
+                {
+                    "scenario": name,
+                    "spec": dataclasses.asdict(spec),
+                    "operation": operation,
+                    "seconds": timings,
+                    "best": min(timings),
+                },
+            )
+            print(f"  {operation:<34} {min(timings):9.3f}s")
+    return {"environment": environment(), "results": results}
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any]) -> None:
+    """Print how each result changed against a baseline report; ratios above 1 are slower."""
+    previous = {(r["scenario"], r["operation"]): r["best"] for r in baseline["results"]}
+    print(f"\nCompared with {baseline['environment'].get('revision') or baseline['environment']['timestamp']}:")
+    for result in report["results"]:
+        before = previous.get((result["scenario"], result["operation"]))
+        if before:
+            print(f"  {result['scenario']:<22} {result['operation']:<34} {result['best'] / before:6.2f}x")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-s", "--scenario", action="append", choices=[*SCENARIOS, "all"], help="scenario to run, repeatable")
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per operation; the best is reported")
+    parser.add_argument("--workdir", type=Path, help="keep built repositories here and reuse them")
+    parser.add_argument("--output", type=Path, help="where to write the JSON results")
+    parser.add_argument("--baseline", type=Path, help="earlier JSON results to compare with")
+    args = parser.parse_args(argv)
+
+    scenarios = args.scenario or list(DEFAULT_SCENARIOS)
+    if "all" in scenarios:
+        scenarios = list(SCENARIOS)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        workdir = args.workdir or Path(temp_dir)
+        workdir.mkdir(parents=True, exist_ok=True)
+        report = run_suite(scenarios, workdir.resolve(), args.repeat)
+
+    output = args.output or RESULTS_DIR / f"{report['environment']['timestamp'].replace(':', '')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\nResults written to {output}")
+    if args.baseline:
+        compare(report, json.loads(args.baseline.read_text()))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,146 @@
+"""Deterministic synthetic git repositories for benchmarks, built with `git fast-import`."""
+
+import json
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO
+
+COMMIT_TYPES = ("feat", "fix", "refactor", "perf", "docs", "test", "chore", "ci")
+SCOPES = (None, "cli", "core", "api", "docs")
+AUTHORS = (("Alice", "alice@example.com"), ("Bob", "bob@example.com"), ("Carol", "carol@example.com"))
+BASE_TIMESTAMP = 1_600_000_000
+FILES_PER_AREA = 20
+
+
+@dataclass(frozen=True)
+class RepoSpec:
+    """
+    Shape of a synthetic repository.
+
+    `commits` counts every commit, merges included. `tags` are spread evenly over the main line.
+    With `packages`, commits touch `packages/pkg-N/` directories that each carry version files.
+    With `merge_every`, every that many commits a topic branch of `branch_length` commits is merged with a merge commit.
+    """
+
+    commits: int
+    tags: int = 0
+    packages: int = 0
+    merge_every: int = 0
+    branch_length: int = 3
+
+
+def commit_message(index: int, scope: str | None = None) -> str:
+    commit_type = COMMIT_TYPES[index % len(COMMIT_TYPES)]
+    scope = scope or SCOPES[index % len(SCOPES)]
+    breaking = "!" if index % 997 == 0 and index else ""
+    prefix = f"{commit_type}({scope})" if scope else commit_type
+    message = f"{prefix}{breaking}: change number {index}\n\nBody line for commit {index}.\n"
+    if index % 5 == 0:
+        message += "\nCo-authored-by: Dave <dave@example.com>\n"
+    return message
+
+
+def package_files(packages: int) -> dict[str, str]:
+    """Version files for the root and every package, alternating between Python and Node packages."""
+    files = {"pyproject.toml": '[project]\nname = "root"\nversion = "0.1.0"\n'}
+    for n in range(packages):
+        if n % 2:
+            files[f"packages/pkg-{n}/package.json"] = json.dumps({"name": f"pkg-{n}", "version": "0.1.0"}, indent=2) + "\n"
+        else:
+            files[f"packages/pkg-{n}/pyproject.toml"] = f'[project]\nname = "pkg-{n}"\nversion = "0.1.0"\n'
+    return files
+
+
+class _FastImport:
+    """Streams commits into a `git fast-import` process, one mark per commit."""
+
+    def __init__(self, stream: IO[bytes]) -> None:
+        self.stream = stream
+        self.mark = 0
+
+    def commit(self, index: int, message: str, files: dict[str, str], parents: tuple[int, ...] = ()) -> int:
+        """Commit on main; topic branch commits are written there too, their parents are set with `from`."""
+        self.mark += 1
+        name, email = AUTHORS[index % len(AUTHORS)]
+        data = message.encode()
+        out = [
+            f"commit refs/heads/main\nmark :{self.mark}\n".encode(),
+            f"committer {name} <{email}> {BASE_TIMESTAMP + index * 60} +0000\n".encode(),
+            f"data {len(data)}\n".encode() + data,
+        ]
+        if parents:
+            out.append(f"from :{parents[0]}\n".encode())
+            out.extend(f"merge :{parent}\n".encode() for parent in parents[1:])
+        for file_path, content in files.items():
+            blob = content.encode()
+            out.append(f"M 644 inline {file_path}\ndata {len(blob)}\n".encode() + blob + b"\n")
+        self.stream.write(b"".join(out) + b"\n")
+        return self.mark
+
+    def tag(self, name: str, mark: int) -> None:
+        self.stream.write(f"reset refs/tags/{name}\nfrom :{mark}\n\n".encode())
+
+
+def _change(spec: RepoSpec, index: int) -> tuple[str, dict[str, str]]:
+    """Message and touched file of the `index`-th ordinary commit."""
+    if spec.packages:
+        package = f"pkg-{index % spec.packages}"
+        path = f"packages/{package}/src/file{index % FILES_PER_AREA}.txt"
+        return commit_message(index, package), {path: f"line {index}\n"}
+    return commit_message(index), {f"file{index % 100}.txt": f"line {index}\n"}
+
+
+def _write_history(spec: RepoSpec, fast_import: _FastImport) -> None:
+    main_tip = 0
+    tag_interval = spec.commits / spec.tags if spec.tags else 0
+    next_tag_at = tag_interval
+    tag_count = 0
+    index = 0
+
+    def advance_main(mark: int) -> None:
+        nonlocal main_tip, next_tag_at, tag_count
+        main_tip = mark
+        if tag_interval and index >= next_tag_at and tag_count < spec.tags:
+            tag_count += 1
+            fast_import.tag(f"v0.{tag_count}.0", mark)
+            next_tag_at += tag_interval
+
+    while index < spec.commits:
+        if spec.merge_every and index and index % spec.merge_every == 0 and index + spec.branch_length < spec.commits:
+            branch_tip = main_tip
+            for _ in range(spec.branch_length):
+                message, files = _change(spec, index)
+                branch_tip = fast_import.commit(index, message, files, (branch_tip,))
+                index += 1
+            merge_message = f"Merge branch 'topic-{index}'\n"
+            merge = fast_import.commit(index, merge_message, {}, (main_tip, branch_tip))
+            index += 1
+            advance_main(merge)
+            continue
+        message, files = _change(spec, index)
+        if index == 0 and spec.packages:
+            files = {**package_files(spec.packages), **files}
+        mark = fast_import.commit(index, message, files, (main_tip,) if main_tip else ())
+        index += 1
+        advance_main(mark)
+
+
+def build_repo(path: Path, spec: RepoSpec) -> Path:
+    """Create a repository shaped by `spec` at `path`; the same spec always gives the same commits."""
+    path.mkdir(parents=True, exist_ok=True)
+    subprocess.run(["git", "init", "-q", str(path)], check=True)
+    with subprocess.Popen(["git", "fast-import", "--quiet"], stdin=subprocess.PIPE, cwd=path) as process:
+        assert process.stdin is not None  # noqa: S101
+        _write_history(spec, _FastImport(process.stdin))
+        process.stdin.close()
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, "git fast-import")
+    subprocess.run(["git", "symbolic-ref", "HEAD", "refs/heads/main"], cwd=path, check=True)
+    subprocess.run(["git", "reset", "-q", "--hard", "main"], cwd=path, check=True)
+    return path
+
+
+def build_linear_repo(path: Path, commits: int, tag_every: int = 0) -> Path:
+    """Create a repository with `commits` linear conventional commits, tagging every `tag_every` commits."""
+    return build_repo(path, RepoSpec(commits, tags=commits // tag_every if tag_every else 0))
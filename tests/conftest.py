@@ -1,13 +1,28 @@
 import tempfile
 from pathlib import Path
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import git
 import pytest
 
+from tgit.repo_cache import clear_repo_cache
 from tgit.version import Version
 
 
+@pytest.fixture(autouse=True)
+def _clear_repo_cache():
+    """Keep memoised repository metadata from leaking between tests."""
+    yield
+    clear_repo_cache()
+
+
+@pytest.fixture
+def no_commit_cache():
+    """Bypass the AI commit message cache for tests whose repository is a mock."""
+    with patch("tgit.commit._get_commit_cache_key", return_value=None):
+        yield
+
+
 @pytest.fixture
 def temp_git_repo():
     """Create a temporary git repository for testing."""
@@ -1,6 +1,12 @@
 """Tests for changelog module."""
 
-from unittest.mock import Mock, patch, mock_open
+import io
+import json
+import time
+from unittest.mock import ANY, Mock, patch, mock_open
+
+import git
+import pytest
 from datetime import datetime, UTC
 from click.testing import CliRunner
 
@@ -14,6 +20,7 @@ from tgit.changelog import (
     get_latest_git_tag,
     get_tag_by_idx,
     get_first_commit_hash,
+    get_root_commits,
     get_commit_hash_from_tag,
     get_simple_hash,
     ref_to_hash,
@@ -31,14 +38,50 @@ from tgit.changelog import (
     get_changelog_by_range,
     get_git_commits_range,
     _get_range_segments,
-    _generate_changelogs_from_segments,
+    bucket_records_by_segment,
+    iter_traversal_records,
+    iter_changelogs_from_segments,
+    segment_rev_args,
+    TRAVERSALS,
+    iter_ndjson_changelog,
+    iter_segment_commits,
+    write_changelog,
+    iter_changelog_lines,
+    ChangelogWriter,
+    ConsoleChangelogWriter,
+    FileChangelogWriter,
+    PrependChangelogWriter,
+    resolve_render_mode,
+    TextChangelogWriter,
     _process_commits,
+    parse_commit_subject,
+    intern_author,
+    intern_authors,
     _get_remote_uri_safe,
     commit_pattern,
     changelog,
 )
 from rich.console import Console
 from rich.text import Text
+from tgit.gitlog import CommitAuthor, CommitRecord
+from tgit.tags import TagIndex, TagInfo, semver_key
+
+
+def _record(subject, co_authors=()):
+    return CommitRecord(
+        hexsha="abc1234567890",
+        short_hash="abc1234",
+        parents=(),
+        author=CommitAuthor("John Doe", "john@example.com"),
+        committed_datetime=datetime(2024, 1, 1, tzinfo=UTC),
+        subject=subject,
+        co_authors=co_authors,
+    )
+
+
+def _tag_index(*tags):
+    """Build a TagIndex from (name, sha, committed_datetime) tuples."""
+    return TagIndex([TagInfo(name, sha, date, None, semver_key(name)) for name, sha, date in tags])
 
 
 class TestVersionSegment:
@@ -136,25 +179,24 @@ class TestAuthor:
         author = Author(name="John Doe", email="john@example.com")
         assert str(author) == "John Doe <john@example.com>"
 
+    def test_intern_authors_shares_instances(self):
+        """Test commits by the same people share one tuple of authors."""
+        first = intern_authors((("John Doe", "john@example.com"), ("Jane", "jane@example.com")))
+        second = intern_authors((CommitAuthor("John Doe", "john@example.com"), CommitAuthor("Jane", "jane@example.com")))
+
+        assert first is second
+        assert first[0] is intern_author("John Doe", "john@example.com")
+        assert first == (Author("John Doe", "john@example.com"), Author("Jane", "jane@example.com"))
+
 
 class TestTGITCommit:
     """Test TGITCommit class."""
 
     def test_tgit_commit_creation(self):
         """Test creating TGITCommit instance."""
-        mock_repo = Mock()
-        mock_repo.git.rev_parse.return_value = "abc1234"
-
-        mock_commit = Mock()
-        mock_commit.author.name = "John Doe"
-        mock_commit.author.email = "john@example.com"
-        mock_commit.committed_datetime = datetime.now(UTC)
-        mock_commit.message = "feat: add new feature"
-        mock_commit.hexsha = "abc1234567890"
-
         message_dict = {"emoji": "✨", "type": "feat", "scope": "auth", "description": "add new feature", "breaking": None}
 
-        tgit_commit = TGITCommit(mock_repo, mock_commit, message_dict)
+        tgit_commit = TGITCommit.from_record(_record("✨ feat(auth): add new feature"), message_dict)
 
         assert tgit_commit.type == "feat"
         assert tgit_commit.scope == "auth"
@@ -165,21 +207,20 @@ class TestTGITCommit:
         assert len(tgit_commit.authors) == 1
         assert tgit_commit.authors[0].name == "John Doe"
 
-    def test_tgit_commit_with_co_authors(self):
-        """Test TGITCommit with co-authors."""
-        mock_repo = Mock()
-        mock_repo.git.rev_parse.return_value = "abc1234"
+    def test_tgit_commit_is_slotted(self):
+        """Test TGITCommit has no per-instance __dict__ and shares authors between records."""
+        first = TGITCommit.from_record(_record("feat: a"), {"type": "feat", "description": "a"})
+        second = TGITCommit.from_record(_record("fix: b"), {"type": "fix", "description": "b"})
 
-        mock_commit = Mock()
-        mock_commit.author.name = "John Doe"
-        mock_commit.author.email = "john@example.com"
-        mock_commit.committed_datetime = datetime.now(UTC)
-        mock_commit.message = "feat: add new feature\n\nCo-authored-by: Jane Smith <jane@example.com>"
-        mock_commit.hexsha = "abc1234567890"
+        assert not hasattr(first, "__dict__")
+        assert first.authors is second.authors
 
+    def test_tgit_commit_with_co_authors(self):
+        """Test TGITCommit with co-authors."""
+        record = _record("feat: add new feature", co_authors=(CommitAuthor("Jane Smith", "jane@example.com"),))
         message_dict = {"type": "feat", "description": "add new feature", "breaking": None}
 
-        tgit_commit = TGITCommit(mock_repo, mock_commit, message_dict)
+        tgit_commit = TGITCommit.from_record(record, message_dict)
 
         assert len(tgit_commit.authors) == 2
         assert tgit_commit.authors[0].name == "John Doe"
@@ -187,37 +228,18 @@ class TestTGITCommit:
 
     def test_tgit_commit_breaking_change(self):
         """Test TGITCommit with breaking change."""
-        mock_repo = Mock()
-        mock_repo.git.rev_parse.return_value = "abc1234"
-
-        mock_commit = Mock()
-        mock_commit.author.name = "John Doe"
-        mock_commit.author.email = "john@example.com"
-        mock_commit.committed_datetime = datetime.now(UTC)
-        mock_commit.message = "feat!: add breaking change"
-        mock_commit.hexsha = "abc1234567890"
-
         message_dict = {"type": "feat", "description": "add breaking change", "breaking": "!"}
 
-        tgit_commit = TGITCommit(mock_repo, mock_commit, message_dict)
+        tgit_commit = TGITCommit.from_record(_record("feat!: add breaking change"), message_dict)
 
         assert tgit_commit.breaking is True
 
     def test_tgit_commit_str(self):
         """Test TGITCommit string representation."""
-        mock_repo = Mock()
-        mock_repo.git.rev_parse.return_value = "abc1234"
-
-        mock_commit = Mock()
-        mock_commit.author.name = "John Doe"
-        mock_commit.author.email = "john@example.com"
-        mock_commit.committed_datetime = datetime(2023, 1, 1, 12, 0, 0, tzinfo=UTC)
-        mock_commit.message = "feat: add new feature"
-        mock_commit.hexsha = "abc1234567890"
-
+        authors = intern_authors((("John Doe", "john@example.com"),))
         message_dict = {"type": "feat", "description": "add new feature", "breaking": None}
 
-        tgit_commit = TGITCommit(mock_repo, mock_commit, message_dict)
+        tgit_commit = TGITCommit("abc1234", datetime(2023, 1, 1, 12, 0, 0, tzinfo=UTC), authors, message_dict)
         str_repr = str(tgit_commit)
 
         assert "Hash: abc1234" in str_repr
@@ -226,41 +248,25 @@ class TestTGITCommit:
         assert "2023-01-01 12:00:00" in str_repr
         assert "John Doe <john@example.com>" in str_repr
 
-    def test_tgit_commit_with_bytes_message(self):
-        """Test TGITCommit with bytes commit message."""
-        mock_repo = Mock()
-        mock_repo.git.rev_parse.return_value = "abc1234"
-
-        mock_commit = Mock()
-        mock_commit.author.name = "John Doe"
-        mock_commit.author.email = "john@example.com"
-        mock_commit.committed_datetime = datetime(2023, 1, 1, 12, 0, 0, tzinfo=UTC)
-        mock_commit.message = b"feat: add new feature"  # bytes message
-        mock_commit.hexsha = "abc1234567890"
-
-        message_dict = {"emoji": "✨", "type": "feat", "scope": None, "description": "add new feature", "breaking": None}
-
-        tgit_commit = TGITCommit(mock_repo, mock_commit, message_dict)
-        assert tgit_commit.type == "feat"
-        assert tgit_commit.description == "add new feature"
 
-    def test_tgit_commit_with_non_string_message(self):
-        """Test TGITCommit with non-string, non-bytes commit message."""
-        mock_repo = Mock()
-        mock_repo.git.rev_parse.return_value = "abc1234"
+class TestGetCommitsRealRepo:
+    """Test get_commits against a real repository."""
 
-        mock_commit = Mock()
-        mock_commit.author.name = "John Doe"
-        mock_commit.author.email = "john@example.com"
-        mock_commit.committed_datetime = datetime(2023, 1, 1, 12, 0, 0, tzinfo=UTC)
-        mock_commit.message = 12345  # Non-string, non-bytes message
-        mock_commit.hexsha = "abc1234567890"
+    def test_get_commits_does_not_fork_per_commit(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        for i in range(5):
+            (repo_path / "test.txt").write_text(f"content {i}")
+            repo.index.add(["test.txt"])
+            repo.index.commit(f"feat: change {i}")
+        first = repo.git.rev_list("--max-parents=0", "HEAD")
 
-        message_dict = {"emoji": "✨", "type": "feat", "scope": None, "description": "add new feature", "breaking": None}
+        real_execute = git.cmd.Git.execute
+        with patch.object(git.cmd.Git, "execute", autospec=True, side_effect=real_execute) as mock_execute:
+            commits = get_commits(repo, first, "HEAD")
 
-        tgit_commit = TGITCommit(mock_repo, mock_commit, message_dict)
-        assert tgit_commit.type == "feat"
-        assert tgit_commit.description == "add new feature"
+        assert not any("rev-parse" in call.args[1] for call in mock_execute.call_args_list)
+        assert [c.description for c in commits] == [f"change {i}" for i in reversed(range(5))]
+        assert commits[0].hash == repo.git.rev_parse("HEAD", short=7)
 
 
 class TestChangelogArgs:
@@ -279,32 +285,26 @@ class TestChangelogArgs:
 class TestGitTagFunctions:
     """Test Git tag related functions."""
 
-    def test_get_latest_git_tag(self):
+    @patch("tgit.changelog.get_tag_index")
+    def test_get_latest_git_tag(self, mock_get_tag_index):
         """Test get_latest_git_tag function."""
         mock_repo = Mock()
-        mock_tag1 = Mock()
-        mock_tag1.name = "v1.0.0"
-        mock_tag1.commit.committed_datetime = datetime(2023, 1, 1, tzinfo=UTC)
-        mock_tag2 = Mock()
-        mock_tag2.name = "v1.1.0"
-        mock_tag2.commit.committed_datetime = datetime(2023, 2, 1, tzinfo=UTC)
-
-        mock_repo.tags = [mock_tag1, mock_tag2]
+        mock_get_tag_index.return_value = _tag_index(
+            ("v1.1.0", "def456", datetime(2023, 2, 1, tzinfo=UTC)),
+            ("v1.0.0", "abc123", datetime(2023, 1, 1, tzinfo=UTC)),
+        )
 
         result = get_latest_git_tag(mock_repo)
         assert result == "v1.1.0"
 
-    def test_get_tag_by_idx(self):
+    @patch("tgit.changelog.get_tag_index")
+    def test_get_tag_by_idx(self, mock_get_tag_index):
         """Test get_tag_by_idx function."""
         mock_repo = Mock()
-        mock_tag1 = Mock()
-        mock_tag1.name = "v1.0.0"
-        mock_tag1.commit.committed_datetime = datetime(2023, 1, 1, tzinfo=UTC)
-        mock_tag2 = Mock()
-        mock_tag2.name = "v1.1.0"
-        mock_tag2.commit.committed_datetime = datetime(2023, 2, 1, tzinfo=UTC)
-
-        mock_repo.tags = [mock_tag1, mock_tag2]
+        mock_get_tag_index.return_value = _tag_index(
+            ("v1.0.0", "abc123", datetime(2023, 1, 1, tzinfo=UTC)),
+            ("v1.1.0", "def456", datetime(2023, 2, 1, tzinfo=UTC)),
+        )
 
         result = get_tag_by_idx(mock_repo, 0)
         assert result == "v1.0.0"
@@ -312,18 +312,20 @@ class TestGitTagFunctions:
         result = get_tag_by_idx(mock_repo, -1)
         assert result == "v1.1.0"
 
-    def test_get_tag_by_idx_no_tags(self):
+    @patch("tgit.changelog.get_tag_index")
+    def test_get_tag_by_idx_no_tags(self, mock_get_tag_index):
         """Test get_tag_by_idx with no tags."""
         mock_repo = Mock()
-        mock_repo.tags = []
+        mock_get_tag_index.return_value = _tag_index()
 
         result = get_tag_by_idx(mock_repo, 0)
         assert result is None
 
-    def test_get_tag_by_idx_exception(self):
+    @patch("tgit.changelog.get_tag_index")
+    def test_get_tag_by_idx_exception(self, mock_get_tag_index):
         """Test get_tag_by_idx with exception."""
         mock_repo = Mock()
-        mock_repo.tags = Mock(side_effect=Exception("Git error"))
+        mock_get_tag_index.side_effect = Exception("Git error")
 
         with patch("tgit.changelog.logger") as mock_logger:
             result = get_tag_by_idx(mock_repo, 0)
@@ -333,32 +335,52 @@ class TestGitTagFunctions:
     def test_get_first_commit_hash(self):
         """Test get_first_commit_hash function."""
         mock_repo = Mock()
-        mock_commit1 = Mock()
-        mock_commit1.hexsha = "abc123"
-        mock_commit1.parents = []
-        mock_commit2 = Mock()
-        mock_commit2.hexsha = "def456"
-        mock_commit2.parents = [mock_commit1]
-
-        mock_repo.iter_commits.return_value = [mock_commit2, mock_commit1]
+        mock_repo.git.log.return_value = "1700000000 abc123\n"
 
         result = get_first_commit_hash(mock_repo)
         assert result == "abc123"
+        mock_repo.git.log.assert_called_once_with("--max-parents=0", "--format=%ct %H", "HEAD")
+
+    def test_get_first_commit_hash_multiple_roots(self):
+        """Test get_first_commit_hash picks the oldest root, breaking ties by hash."""
+        mock_repo = Mock()
+        mock_repo.git.log.return_value = "1700000500 fff000\n1700000000 bbb111\n1700000000 aaa222\n"
 
-    def test_get_commit_hash_from_tag(self):
+        assert get_first_commit_hash(mock_repo) == "aaa222"
+        assert get_root_commits(mock_repo) == ["aaa222", "bbb111", "fff000"]
+        mock_repo.git.log.assert_called_once()
+
+    def test_get_first_commit_hash_empty_repo(self):
+        """Test get_first_commit_hash when HEAD does not exist yet."""
+        mock_repo = Mock()
+        mock_repo.git.log.side_effect = git.GitCommandError("log", 128)
+
+        assert get_first_commit_hash(mock_repo) == ""
+
+    def test_get_first_commit_hash_real_repo(self, temp_git_repo):
+        """Test get_first_commit_hash against a real repository."""
+        repo_path, repo = temp_git_repo
+        root = repo.head.commit.hexsha
+        (repo_path / "test.txt").write_text("more")
+        repo.index.add(["test.txt"])
+        repo.index.commit("feat: more")
+
+        assert get_first_commit_hash(repo) == root
+
+    @patch("tgit.changelog.get_tag_index")
+    def test_get_commit_hash_from_tag(self, mock_get_tag_index):
         """Test get_commit_hash_from_tag function."""
         mock_repo = Mock()
-        mock_tag = Mock()
-        mock_tag.commit.hexsha = "abc123456"
-        mock_repo.tags = {"v1.0.0": mock_tag}
+        mock_get_tag_index.return_value = _tag_index(("v1.0.0", "abc123456", datetime(2023, 1, 1, tzinfo=UTC)))
 
         result = get_commit_hash_from_tag(mock_repo, "v1.0.0")
         assert result == "abc123456"
 
-    def test_get_commit_hash_from_tag_not_found(self):
+    @patch("tgit.changelog.get_tag_index")
+    def test_get_commit_hash_from_tag_not_found(self, mock_get_tag_index):
         """Test get_commit_hash_from_tag with tag not found."""
         mock_repo = Mock()
-        mock_repo.tags = {}
+        mock_get_tag_index.return_value = _tag_index()
 
         with patch("tgit.changelog.logger") as mock_logger:
             result = get_commit_hash_from_tag(mock_repo, "v1.0.0")
@@ -550,36 +572,58 @@ class TestCommitPattern:
 class TestGetCommits:
     """Test get_commits function."""
 
-    @patch("tgit.changelog.commit_pattern")
-    def test_get_commits(self, mock_pattern):
+    @patch("tgit.changelog.iter_commit_records")
+    def test_get_commits(self, mock_iter_records):
         """Test get_commits function."""
         mock_repo = Mock()
-        mock_commit = Mock()
-        mock_commit.message = "feat: add new feature"
-        mock_repo.iter_commits.return_value = [mock_commit]
+        record = _record("feat(cli): add new feature", co_authors=(CommitAuthor("Jane", "jane@example.com"),))
+        mock_iter_records.return_value = iter([record])
 
-        mock_match = Mock()
-        mock_match.groupdict.return_value = {"type": "feat", "description": "add new feature", "scope": None, "breaking": None}
-        mock_pattern.match.return_value = mock_match
-
-        with patch("tgit.changelog.TGITCommit") as mock_tgit_commit:
-            mock_tgit_commit.return_value = "mock_commit"
-            result = get_commits(mock_repo, "from_hash", "to_hash")
-
-            assert result == ["mock_commit"]
-            mock_repo.iter_commits.assert_called_once_with("from_hash...to_hash")
+        result = get_commits(mock_repo, "from_hash", "to_hash")
 
-    def test_get_commits_no_match(self):
+        mock_iter_records.assert_called_once_with(mock_repo, "to_hash", "^from_hash", name_only=False)
+        assert [c.to_dict() for c in result] == [
+            {
+                "hash": "abc1234",
+                "type": "feat",
+                "scope": "cli",
+                "description": "add new feature",
+                "breaking": False,
+                "emoji": None,
+                "date": record.committed_datetime.isoformat(),
+                "authors": [{"name": "John Doe", "email": "john@example.com"}, {"name": "Jane", "email": "jane@example.com"}],
+            },
+        ]
+
+    @patch("tgit.changelog.iter_commit_records")
+    def test_get_commits_no_match(self, mock_iter_records):
         """Test get_commits with no matching commits."""
         mock_repo = Mock()
-        mock_commit = Mock()
-        mock_commit.message = "invalid commit message"
-        mock_repo.iter_commits.return_value = [mock_commit]
+        mock_iter_records.return_value = iter([_record("invalid commit message"), _record("Merge branch 'main': sync")])
 
         result = get_commits(mock_repo, "from_hash", "to_hash")
         assert result == []
 
 
+class TestParseCommitSubject:
+    """Test parse_commit_subject function."""
+
+    def test_matches_commit_pattern(self):
+        """The fast path agrees with commit_pattern on subjects."""
+        subjects = ["feat: a", "fix(core)!: b", ":sparkles: feat(ui): c", "✨ docs: d", "WIP", "Update README.md", "feat:no space"]
+
+        for subject in subjects:
+            expected = m.groupdict() if (m := commit_pattern.match(subject)) else None
+            assert parse_commit_subject(subject) == expected
+
+    def test_skips_regex_without_separator(self):
+        """Subjects without ': ' never reach the regex."""
+        with patch("tgit.changelog.commit_pattern") as mock_pattern:
+            assert parse_commit_subject("Merge pull request #1 from x/y") is None
+
+        mock_pattern.match.assert_not_called()
+
+
 class TestGroupCommitsByType:
     """Test group_commits_by_type function."""
 
@@ -700,26 +744,66 @@ class TestExtractLatestTagFromChangelog:
 class TestWriteChangelogPrepend:
     """Test write_changelog_prepend function."""
 
-    def test_write_changelog_prepend_existing_file(self):
+    def test_write_changelog_prepend_existing_file(self, tmp_path):
         """Test write_changelog_prepend with existing file."""
-        old_content = "# Changelog\n\n## v1.0.0\n\n- Initial release"
-        new_content = "## v1.1.0\n\n- New feature"
+        path = tmp_path / "CHANGELOG.md"
+        path.write_text("# Changelog\n\n## v1.0.0\n\n- Initial release")
+        new_content = "## v1.1.0\n\n- New feature\n"
 
-        with patch("pathlib.Path.open", mock_open(read_data=old_content)) as mock_file, patch("pathlib.Path.exists", return_value=True):
-            write_changelog_prepend("CHANGELOG.md", new_content)
+        write_changelog_prepend(str(path), new_content)
 
-            # Check that file was opened for reading and writing
-            assert mock_file.call_count == 2
+        assert path.read_text() == "## v1.1.0\n\n- New feature\n\n# Changelog\n\n## v1.0.0\n\n- Initial release"
+        assert [p.name for p in tmp_path.iterdir()] == ["CHANGELOG.md"]
 
-    def test_write_changelog_prepend_new_file(self):
+    def test_write_changelog_prepend_new_file(self, tmp_path):
         """Test write_changelog_prepend with new file."""
-        new_content = "## v1.1.0\n\n- New feature"
+        path = tmp_path / "CHANGELOG.md"
 
-        with patch("pathlib.Path.open", mock_open()) as mock_file, patch("pathlib.Path.exists", return_value=False):
-            write_changelog_prepend("CHANGELOG.md", new_content)
+        write_changelog_prepend(str(path), "\n## v1.1.0\n\n- New feature\n\n")
 
-            # Check that file was opened for writing
-            mock_file.assert_called_once()
+        assert path.read_text() == "## v1.1.0\n\n- New feature\n"
+
+    def test_write_changelog_prepend_copies_in_blocks(self, tmp_path):
+        """The old file is copied byte for byte in blocks, keeping its mode."""
+        path = tmp_path / "CHANGELOG.md"
+        old_content = "".join(f"## v0.{i}.0\n\n- 变更 {i}\n\n" for i in range(500)).encode()
+        path.write_bytes(old_content)
+        path.chmod(0o640)
+
+        with patch("tgit.changelog.PREPEND_COPY_CHUNK_SIZE", 64):
+            write_changelog_prepend(str(path), "## v1.0.0")
+
+        assert path.read_bytes() == b"## v1.0.0\n\n" + old_content
+        assert path.stat().st_mode & 0o777 == 0o640
+
+    def test_write_changelog_prepend_keeps_original_on_failure(self, tmp_path):
+        """An interrupted prepend leaves the old file and no temp file behind."""
+        path = tmp_path / "CHANGELOG.md"
+        path.write_text("## v1\n")
+
+        def chunks():
+            yield "## v2\n\n"
+            raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            write_changelog(chunks(), [PrependChangelogWriter(str(path))])
+
+        assert path.read_text() == "## v1\n"
+        assert [p.name for p in tmp_path.iterdir()] == ["CHANGELOG.md"]
+
+    def test_write_changelog_prepend_new_file_keeps_partial_output_on_failure(self, tmp_path):
+        """An interrupted run into a new file keeps what was written and re-raises the original error."""
+        path = tmp_path / "CHANGELOG.md"
+
+        def chunks():
+            yield "## v2\n\n"
+            raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            write_changelog(chunks(), [PrependChangelogWriter(str(path))])
+
+        assert path.read_text() == "## v2\n"
+        assert [p.name for p in tmp_path.iterdir()] == ["CHANGELOG.md"]
 
 
 class TestPrintAndWriteChangelog:
@@ -758,15 +842,16 @@ class TestPrintAndWriteChangelog:
 
     @patch("tgit.changelog.console")
     @patch("tgit.changelog.Markdown")
-    @patch("tgit.changelog.write_changelog_prepend")
-    def test_print_and_write_changelog_prepend(self, mock_prepend, mock_markdown, mock_console):
+    def test_print_and_write_changelog_prepend(self, mock_markdown, mock_console, tmp_path):
         """Test print_and_write_changelog with prepend."""
+        path = tmp_path / "CHANGELOG.md"
+        path.write_text("## v1.0.0\n")
         changelog = "## v1.1.0\n\n- New feature"
 
         with patch("tgit.changelog.print"):
-            print_and_write_changelog(changelog, "CHANGELOG.md", prepend=True)
+            print_and_write_changelog(changelog, str(path), prepend=True)
 
-            mock_prepend.assert_called_once_with("CHANGELOG.md", changelog)
+        assert path.read_text() == "## v1.1.0\n\n- New feature\n\n## v1.0.0\n"
 
 
 class TestUtilityFunctions:
@@ -817,20 +902,9 @@ class TestUtilityFunctions:
 
     def test_process_commits(self):
         """Test _process_commits function."""
-        mock_repo = Mock()
-        mock_commit = Mock()
-        mock_commit.message = "feat: add new feature"
-
-        with patch("tgit.changelog.commit_pattern") as mock_pattern:
-            mock_match = Mock()
-            mock_match.groupdict.return_value = {"type": "feat", "description": "add new feature"}
-            mock_pattern.match.return_value = mock_match
+        result = _process_commits([_record("feat: add new feature"), _record("not conventional")])
 
-            with patch("tgit.changelog.TGITCommit") as mock_tgit_commit:
-                mock_tgit_commit.return_value = "mock_commit"
-
-                result = _process_commits(mock_repo, [mock_commit])
-                assert result == ["mock_commit"]
+        assert [(c.type, c.description, c.hash) for c in result] == [("feat", "add new feature", "abc1234")]
 
 
 class TestChangelogFunction:
@@ -878,21 +952,66 @@ class TestChangelogFunction:
         assert args.verbose == 2
         assert args.output == "custom.md"
 
+    @patch("tgit.changelog.handle_changelog")
+    def test_changelog_function_with_jobs_and_no_cache(self, mock_handle):
+        """Test changelog function with --jobs and --no-cache."""
+        runner = CliRunner()
+        result = runner.invoke(changelog, [".", "--jobs", "4", "--no-cache"])
+
+        assert result.exit_code == 0
+        args = mock_handle.call_args[0][0]
+        assert args.jobs == 4
+        assert args.no_cache is True
+
+    @patch("tgit.changelog.handle_changelog")
+    def test_changelog_function_with_render(self, mock_handle):
+        """Test changelog function with --render."""
+        result = CliRunner().invoke(changelog, [".", "--render", "plain"])
+
+        assert result.exit_code == 0
+        assert mock_handle.call_args[0][0].render == "plain"
+
+    @pytest.mark.parametrize("jobs", ["1", "2"])
+    def test_changelog_function_stdout_is_only_markdown(self, temp_git_repo, jobs):
+        """Test the progress display stays out of the changelog written to stdout."""
+        repo_path, repo = temp_git_repo
+        _build_merge_history(repo_path, repo)
+
+        result = CliRunner().invoke(changelog, [str(repo_path), "--render", "plain", "--no-cache", "--jobs", jobs])
+
+        assert result.exit_code == 0
+        markdown = "".join(iter_changelogs_from_segments(repo, prepare_changelog_segments(repo)))
+        assert result.stdout == markdown.strip("\n") + "\n"
+        assert result.stdout.startswith("## v0.3.0")
+
+    def test_changelog_function_rejects_unknown_render(self):
+        """Test changelog function rejects an unknown --render mode."""
+        result = CliRunner().invoke(changelog, [".", "--render", "html"])
+
+        assert result.exit_code == 2
+
+    def test_changelog_function_rejects_zero_jobs(self):
+        """Test changelog function rejects --jobs 0."""
+        result = CliRunner().invoke(changelog, [".", "--jobs", "0"])
+
+        assert result.exit_code == 2
+
 
 class TestHandleChangelog:
     """Test handle_changelog function."""
 
     @patch("tgit.changelog.git.Repo")
     @patch("tgit.changelog.prepare_changelog_segments")
-    @patch("tgit.changelog._generate_changelogs_from_segments")
+    @patch("tgit.changelog.iter_changelogs_from_segments")
     @patch("tgit.changelog.print_and_write_changelog")
-    def test_handle_changelog_basic(self, mock_print, mock_generate, mock_prepare, mock_repo):
+    @patch("tgit.changelog._open_changelog_cache")
+    def test_handle_changelog_basic(self, mock_open_cache, mock_print, mock_generate, mock_prepare, mock_repo):
         """Test handle_changelog basic functionality."""
         mock_repo_instance = Mock()
         mock_repo.return_value = mock_repo_instance
 
         mock_prepare.return_value = ["segment1", "segment2"]
-        mock_generate.return_value = "generated changelog"
+        mock_generate.return_value = iter(["generated changelog"])
 
         args = ChangelogArgs(path=".", from_raw=None, to_raw=None, verbose=0, output=None)
 
@@ -900,22 +1019,25 @@ class TestHandleChangelog:
 
         mock_repo.assert_called_once_with(".")
         mock_prepare.assert_called_once_with(mock_repo_instance, None, None)
-        mock_generate.assert_called_once_with(mock_repo_instance, ["segment1", "segment2"])
-        mock_print.assert_called_once_with("generated changelog", None, prepend=False)
+        mock_generate.assert_called_once_with(
+            mock_repo_instance, ["segment1", "segment2"], cache=mock_open_cache.return_value, jobs=1, index=None, traversal="all"
+        )
+        mock_print.assert_called_once_with(mock_generate.return_value, None, prepend=False, render=ANY)
 
     @patch("tgit.changelog.git.Repo")
     @patch("tgit.changelog.extract_latest_tag_from_changelog")
     @patch("tgit.changelog.prepare_changelog_segments")
-    @patch("tgit.changelog._generate_changelogs_from_segments")
+    @patch("tgit.changelog.iter_changelogs_from_segments")
     @patch("tgit.changelog.print_and_write_changelog")
-    def test_handle_changelog_with_existing_file(self, mock_print, mock_generate, mock_prepare, mock_extract, mock_repo):
+    @patch("tgit.changelog._open_changelog_cache")
+    def test_handle_changelog_with_existing_file(self, mock_open_cache, mock_print, mock_generate, mock_prepare, mock_extract, mock_repo):
         """Test handle_changelog with existing changelog file."""
         mock_repo_instance = Mock()
         mock_repo.return_value = mock_repo_instance
 
         mock_extract.return_value = "v1.0.0"
         mock_prepare.return_value = ["segment1"]
-        mock_generate.return_value = "generated changelog"
+        mock_generate.return_value = iter(["generated changelog"])
 
         args = ChangelogArgs(path=".", from_raw=None, to_raw=None, verbose=0, output="CHANGELOG.md")
 
@@ -924,27 +1046,30 @@ class TestHandleChangelog:
 
             mock_extract.assert_called_once_with("CHANGELOG.md")
             mock_prepare.assert_called_once_with(mock_repo_instance, "v1.0.0", None)
-            mock_print.assert_called_once_with("generated changelog", "CHANGELOG.md", prepend=True)
+            mock_print.assert_called_once_with(mock_generate.return_value, "CHANGELOG.md", prepend=True, render=ANY)
 
     @patch("tgit.changelog.git.Repo")
     @patch("tgit.changelog._get_range_segments")
-    @patch("tgit.changelog._generate_changelogs_from_segments")
+    @patch("tgit.changelog.iter_changelogs_from_segments")
     @patch("tgit.changelog.print_and_write_changelog")
-    def test_handle_changelog_with_range(self, mock_print, mock_generate, mock_get_range, mock_repo):
+    @patch("tgit.changelog._open_changelog_cache")
+    def test_handle_changelog_with_range(self, mock_open_cache, mock_print, mock_generate, mock_get_range, mock_repo):
         """Test handle_changelog with specified range."""
         mock_repo_instance = Mock()
         mock_repo.return_value = mock_repo_instance
 
         mock_get_range.return_value = ["segment1"]
-        mock_generate.return_value = "generated changelog"
+        mock_generate.return_value = iter(["generated changelog"])
 
         args = ChangelogArgs(path=".", from_raw="v1.0.0", to_raw="v1.1.0", verbose=0, output=None)
 
         handle_changelog(args)
 
         mock_get_range.assert_called_once_with(mock_repo_instance, "v1.0.0", "v1.1.0")
-        mock_generate.assert_called_once_with(mock_repo_instance, ["segment1"])
-        mock_print.assert_called_once_with("generated changelog", None, prepend=False)
+        mock_generate.assert_called_once_with(
+            mock_repo_instance, ["segment1"], cache=mock_open_cache.return_value, jobs=1, index=None, traversal="all"
+        )
+        mock_print.assert_called_once_with(mock_generate.return_value, None, prepend=False, render=ANY)
 
     @patch("tgit.changelog.git.Repo")
     @patch("tgit.changelog.extract_latest_tag_from_changelog")
@@ -991,12 +1116,13 @@ class TestHandleChangelog:
 class TestPrepareChangelogSegments:
     """Test prepare_changelog_segments function."""
 
+    @patch("tgit.changelog.get_tag_index")
     @patch("tgit.changelog.get_latest_git_tag")
     @patch("tgit.changelog.get_first_commit_hash")
-    def test_prepare_changelog_segments_no_tags(self, mock_first_commit, mock_get_latest_tag):
+    def test_prepare_changelog_segments_no_tags(self, mock_first_commit, mock_get_latest_tag, mock_get_tag_index):
         """Test prepare_changelog_segments when repository has no tags."""
         mock_repo = Mock()
-        mock_repo.tags = []
+        mock_get_tag_index.return_value = _tag_index()
         mock_first_commit.return_value = "abc123"
         mock_get_latest_tag.return_value = None
 
@@ -1006,24 +1132,17 @@ class TestPrepareChangelogSegments:
             assert result == []
             mock_print.assert_called_once_with("[yellow]No tags found in the repository.[/yellow]")
 
+    @patch("tgit.changelog.get_tag_index")
     @patch("tgit.changelog.get_latest_git_tag")
     @patch("tgit.changelog.get_first_commit_hash")
-    def test_prepare_changelog_segments_with_tags(self, mock_first_commit, mock_get_latest_tag):
+    def test_prepare_changelog_segments_with_tags(self, mock_first_commit, mock_get_latest_tag, mock_get_tag_index):
         """Test prepare_changelog_segments with tags in repository."""
         mock_repo = Mock()
 
-        # Create mock tags
-        mock_tag1 = Mock()
-        mock_tag1.name = "v1.0.0"
-        mock_tag1.commit.hexsha = "def456"
-        mock_tag1.commit.committed_datetime = datetime(2023, 1, 1, tzinfo=UTC)
-
-        mock_tag2 = Mock()
-        mock_tag2.name = "v2.0.0"
-        mock_tag2.commit.hexsha = "ghi789"
-        mock_tag2.commit.committed_datetime = datetime(2023, 2, 1, tzinfo=UTC)
-
-        mock_repo.tags = [mock_tag1, mock_tag2]
+        mock_get_tag_index.return_value = _tag_index(
+            ("v1.0.0", "def456", datetime(2023, 1, 1, tzinfo=UTC)),
+            ("v2.0.0", "ghi789", datetime(2023, 2, 1, tzinfo=UTC)),
+        )
         mock_first_commit.return_value = "abc123"
         mock_get_latest_tag.return_value = "v2.0.0"
 
@@ -1032,18 +1151,14 @@ class TestPrepareChangelogSegments:
         assert len(result) >= 1
         # Should have version segments created
 
+    @patch("tgit.changelog.get_tag_index")
     @patch("tgit.changelog.get_latest_git_tag")
     @patch("tgit.changelog.get_first_commit_hash")
-    def test_prepare_changelog_segments_with_current_tag(self, mock_first_commit, mock_get_latest_tag):
+    def test_prepare_changelog_segments_with_current_tag(self, mock_first_commit, mock_get_latest_tag, mock_get_tag_index):
         """Test prepare_changelog_segments with current tag specified."""
         mock_repo = Mock()
 
-        mock_tag1 = Mock()
-        mock_tag1.name = "v1.0.0"
-        mock_tag1.commit.hexsha = "def456"
-        mock_tag1.commit.committed_datetime = datetime(2023, 1, 1, tzinfo=UTC)
-
-        mock_repo.tags = [mock_tag1]
+        mock_get_tag_index.return_value = _tag_index(("v1.0.0", "def456", datetime(2023, 1, 1, tzinfo=UTC)))
         mock_first_commit.return_value = "abc123"
         mock_get_latest_tag.return_value = "v1.0.0"
 
@@ -1072,25 +1187,29 @@ class TestRangeSegments:
         assert len(result) >= 0
 
 
-class TestGenerateChangelogsFromSegments:
-    """Test _generate_changelogs_from_segments function."""
+class TestIterChangelogsFromSegments:
+    """Test iter_changelogs_from_segments function."""
 
-    def test_generate_changelogs_from_segments_empty(self):
-        """Test _generate_changelogs_from_segments with empty segments."""
+    def test_iter_changelogs_from_segments_empty(self):
+        """Test iter_changelogs_from_segments with empty segments."""
         mock_repo = Mock()
 
-        result = _generate_changelogs_from_segments(mock_repo, [])
+        result = "".join(iter_changelogs_from_segments(mock_repo, []))
 
         assert result == ""
 
+    @patch("tgit.changelog.segment_rev_args", return_value=("def456", "^abc123"))
     @patch("tgit.changelog._process_commits")
     @patch("tgit.changelog.group_commits_by_type")
     @patch("tgit.changelog.generate_changelog")
     @patch("tgit.changelog._get_remote_uri_safe")
-    def test_generate_changelogs_from_segments_with_segments(self, mock_uri_safe, mock_generate, mock_group, mock_process):
-        """Test _generate_changelogs_from_segments with actual segments."""
+    @patch("tgit.changelog.iter_commit_records")
+    def test_iter_changelogs_from_segments_with_segments(
+        self, mock_iter_records, mock_uri_safe, mock_generate, mock_group, mock_process, mock_rev_args
+    ):
+        """Test iter_changelogs_from_segments with actual segments."""
         mock_repo = Mock()
-        mock_repo.iter_commits.return_value = [Mock(), Mock()]
+        mock_iter_records.return_value = iter([Mock(), Mock()])
 
         mock_process.return_value = [Mock(), Mock()]
         mock_group.return_value = {"feat": [Mock()]}
@@ -1099,11 +1218,392 @@ class TestGenerateChangelogsFromSegments:
 
         segment = VersionSegment(from_hash="abc123", to_hash="def456", from_name="v1.0.0", to_name="v1.1.0")
 
-        result = _generate_changelogs_from_segments(mock_repo, [segment])
+        result = "".join(iter_changelogs_from_segments(mock_repo, [segment]))
 
         assert "v1.1.0" in result
 
 
+def _commit_file(repo, repo_path, message):
+    (repo_path / "test.txt").write_text(message)
+    repo.index.add(["test.txt"])
+    return repo.index.commit(message)
+
+
+def _build_merge_history(repo_path, repo, merge_message="Merge branch 'side'"):
+    """v0.1.0 -> v0.2.0 contains a side branch merged with `merge_message`."""
+    _commit_file(repo, repo_path, "chore: init")
+    _commit_file(repo, repo_path, "feat: one")
+    repo.create_tag("v0.1.0")
+    base = _commit_file(repo, repo_path, "feat: two")
+    side = repo.create_head("side", base)
+    main = repo.active_branch
+    side.checkout()
+    (repo_path / "side.txt").write_text("side")
+    repo.index.add(["side.txt"])
+    side_commit = repo.index.commit("fix: side")
+    main.checkout()
+    main_commit = _commit_file(repo, repo_path, "feat: three")
+    repo.index.commit(merge_message, parent_commits=(main_commit, side_commit))
+    repo.head.reset(index=True, working_tree=True)
+    repo.create_tag("v0.2.0")
+    _commit_file(repo, repo_path, "fix: four")
+    repo.create_tag("v0.3.0")
+    _commit_file(repo, repo_path, "feat: unreleased")
+
+
+def _build_releases(repo_path, repo):
+    """Four tagged releases of three commits each on a straight line."""
+    for release in range(4):
+        for idx in range(3):
+            _commit_file(repo, repo_path, f"feat: {release}.{idx}")
+        repo.create_tag(f"v0.{release}.0")
+
+
+def _counting_walk(walked):
+    """A stand-in for iter_traversal_records that records every commit as git hands it over."""
+
+    def walk(*args, **kwargs):
+        for record in iter_traversal_records(*args, **kwargs):
+            walked.append(record.hexsha)
+            yield record
+
+    return walk
+
+
+class TestBucketRecordsBySegment:
+    """Test the single-pass segment walk against a real repository."""
+
+    def _build_history(self, repo_path, repo):
+        _build_merge_history(repo_path, repo)
+
+    def test_matches_per_segment_walk(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        self._build_history(repo_path, repo)
+        segments = prepare_changelog_segments(repo, current_tag="v0.4.0")
+
+        buckets = list(bucket_records_by_segment(repo, segments))
+
+        expected = [set(repo.git.rev_list(*segment_rev_args(repo, seg)).split()) for seg in segments]
+        assert [{r.hexsha for r in bucket} for bucket in buckets] == expected
+        assert [r.subject for r in buckets[0]] == ["feat: unreleased"]
+
+    def test_yields_each_segment_before_the_walk_ends(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        _build_releases(repo_path, repo)
+        segments = prepare_changelog_segments(repo)
+        walked = []
+
+        with patch("tgit.changelog.iter_traversal_records", side_effect=_counting_walk(walked)):
+            buckets = bucket_records_by_segment(repo, segments)
+            first = next(buckets)
+            walked_for_first = len(walked)
+            rest = list(buckets)
+
+        assert [r.subject for r in first] == ["feat: 3.2", "feat: 3.1", "feat: 3.0"]
+        # 最新分段在遍历到下一个分段的 tip 时就已产出
+        assert walked_for_first == 4
+        assert [len(bucket) for bucket in rest] == [3, 3, 3]
+        assert len(walked) == 12
+
+    def test_serial_changelog_streams_with_the_walk(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        _build_releases(repo_path, repo)
+        segments = prepare_changelog_segments(repo)
+        walked = []
+
+        with patch("tgit.changelog.iter_traversal_records", side_effect=_counting_walk(walked)):
+            chunks = iter_changelogs_from_segments(repo, segments)
+            first = next(chunks)
+            walked_for_first = len(walked)
+            chunks.close()
+
+        assert first.startswith("## v0.3.0")
+        assert walked_for_first < 12
+
+    def test_runs_one_git_log(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        self._build_history(repo_path, repo)
+        segments = prepare_changelog_segments(repo)
+
+        real_execute = git.cmd.Git.execute
+        with patch.object(git.cmd.Git, "execute", autospec=True, side_effect=real_execute) as mock_execute:
+            result = "".join(iter_changelogs_from_segments(repo, segments))
+
+        log_calls = [call for call in mock_execute.call_args_list if "log" in call.args[1]]
+        assert len(log_calls) == 1
+        assert result.index("## v0.3.0") < result.index("## v0.2.0") < result.index("## v0.1.0")
+        assert "side" in result.split("## v0.1.0")[0].split("## v0.2.0")[1]
+
+
+class TestTraversal:
+    """Test first-parent and merges-as-entries traversal."""
+
+    MERGE_MESSAGE = "Merge pull request #7 from someone/side\n\nfeat(ui): side widget\n\nLonger description."
+
+    def _descriptions(self, repo, traversal):
+        from_hash, to_hash = repo.git.rev_parse("v0.1.0", "v0.2.0").split()
+        return sorted(c.description for c in get_commits(repo, from_hash, to_hash, traversal))
+
+    def test_get_commits_by_traversal(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        _build_merge_history(repo_path, repo, self.MERGE_MESSAGE)
+
+        assert self._descriptions(repo, "all") == ["side", "three", "two"]
+        assert self._descriptions(repo, "first-parent") == ["three", "two"]
+        assert self._descriptions(repo, "merges") == ["side widget", "three", "two"]
+
+    def test_segments_by_traversal(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        _build_merge_history(repo_path, repo, self.MERGE_MESSAGE)
+        segments = prepare_changelog_segments(repo)
+
+        first_parent = "".join(iter_changelogs_from_segments(repo, segments, traversal="first-parent"))
+        merges = "".join(iter_changelogs_from_segments(repo, segments, traversal="merges"))
+        parallel = "".join(iter_changelogs_from_segments(repo, segments, jobs=2, traversal="merges"))
+
+        assert "side" not in first_parent
+        assert "side widget" in merges
+        assert "- side\n" not in merges
+        assert parallel == merges
+
+    def test_first_parent_walk_skips_merge_bases(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        _build_merge_history(repo_path, repo, self.MERGE_MESSAGE)
+
+        real_execute = git.cmd.Git.execute
+        with patch.object(git.cmd.Git, "execute", autospec=True, side_effect=real_execute) as mock_execute:
+            get_commits(repo, "v0.1.0", "v0.2.0", "first-parent")
+
+        log_call = next(call.args[1] for call in mock_execute.call_args_list if "log" in call.args[1])
+        assert "--first-parent" in log_call
+        assert "--exclude-first-parent-only" in log_call
+        assert log_call[-3:] == ["v0.2.0", "^v0.1.0", "--"]
+
+    @patch("tgit.changelog.handle_changelog")
+    def test_cli_flags(self, mock_handle):
+        runner = CliRunner()
+
+        runner.invoke(changelog, ["."])
+        runner.invoke(changelog, [".", "--first-parent"])
+        runner.invoke(changelog, [".", "--merges-as-entries"])
+
+        assert [call.args[0].traversal for call in mock_handle.call_args_list] == ["all", "first-parent", "merges"]
+
+
+class TestMachineReadableOutput:
+    """Test --format ndjson and json."""
+
+    def _args(self, repo_path, output_format, output=None, **kwargs):
+        return ChangelogArgs(
+            from_raw=None, to_raw=None, verbose=0, path=str(repo_path), output=output, output_format=output_format, **kwargs
+        )
+
+    def test_ndjson_records(self, temp_git_repo, capsys):
+        repo_path, repo = temp_git_repo
+        _build_merge_history(repo_path, repo)
+
+        with patch("tgit.changelog.generate_changelog") as mock_generate:
+            handle_changelog(self._args(repo_path, "ndjson"), current_tag="v0.4.0")
+
+        mock_generate.assert_not_called()
+        records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        segments = [r for r in records if r["record"] == "segment"]
+        assert [s["segment"] for s in segments] == ["v0.4.0", "v0.3.0", "v0.2.0", "v0.1.0"]
+        assert segments[2]["commits"] == 3
+        side = next(r for r in records if r.get("description") == "side")
+        assert side["segment"] == "v0.2.0"
+        assert side["type"] == "fix"
+        assert side["breaking"] is False
+        assert side["authors"] == [{"name": "Test User", "email": "test@example.com"}]
+        assert side["hash"] == repo.git.rev_parse("side", short=7)
+
+    def test_ndjson_streams_with_the_walk(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        _build_releases(repo_path, repo)
+        segments = prepare_changelog_segments(repo)
+        walked = []
+
+        with patch("tgit.changelog.iter_traversal_records", side_effect=_counting_walk(walked)):
+            chunks = iter_ndjson_changelog(iter_segment_commits(repo, segments))
+            first_line = next(chunks).splitlines()[0]
+            walked_for_first = len(walked)
+            chunks.close()
+
+        assert json.loads(first_line)["segment"] == "v0.3.0"
+        assert walked_for_first < 12
+
+    def test_json_to_file(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        _build_merge_history(repo_path, repo)
+        output = repo_path / "changelog.json"
+
+        handle_changelog(self._args(repo_path, "json", output=str(output), traversal="first-parent"))
+
+        versions = json.loads(output.read_text())
+        assert [v["segment"] for v in versions] == ["v0.3.0", "v0.2.0", "v0.1.0"]
+        assert sorted(c["description"] for c in versions[1]["commits"]) == ["three", "two"]
+
+    def test_json_without_tags(self, temp_git_repo, capsys):
+        repo_path, _ = temp_git_repo
+
+        handle_changelog(self._args(repo_path, "json"))
+
+        assert json.loads(capsys.readouterr().out) == []
+
+    @patch("tgit.changelog.handle_changelog")
+    def test_cli_flag(self, mock_handle):
+        runner = CliRunner()
+
+        runner.invoke(changelog, ["."])
+        runner.invoke(changelog, [".", "--format", "ndjson"])
+
+        assert [call.args[0].output_format for call in mock_handle.call_args_list] == ["markdown", "ndjson"]
+
+
+class TestParallelSegments:
+    """Test generating segments in a worker pool."""
+
+    @pytest.mark.parametrize("traversal", TRAVERSALS)
+    def test_parallel_matches_serial(self, temp_git_repo, traversal):
+        repo_path, repo = temp_git_repo
+        _build_merge_history(repo_path, repo)
+        segments = prepare_changelog_segments(repo, current_tag="v0.4.0")
+
+        serial = "".join(iter_changelogs_from_segments(repo, segments, traversal=traversal))
+        parallel = "".join(iter_changelogs_from_segments(repo, segments, jobs=3, traversal=traversal))
+
+        assert parallel == serial
+
+    def test_parallel_yields_in_release_order(self):
+        segments = [VersionSegment(f"h{i}", f"h{i + 1}", f"v{i}", f"v{i + 1}") for i in reversed(range(6))]
+
+        def slow_first(segment, tgit_commits, remote_uri, cache):
+            # The newest segment finishes last, yet must still come out first.
+            time.sleep(0.05 if segment is segments[0] else 0)
+            return f"## {segment.to_name}\n", 1
+
+        with (
+            patch("tgit.changelog._render_segment", side_effect=slow_first),
+            patch("tgit.changelog.iter_commit_records"),
+            patch("tgit.changelog.segment_rev_args", return_value=()),
+            patch("tgit.changelog._process_commits", return_value=[]),
+            patch("tgit.changelog._get_remote_uri_safe", return_value=None),
+        ):
+            chunks = list(iter_changelogs_from_segments(Mock(), segments, jobs=4))
+
+        assert chunks == [f"## v{i + 1}\n" for i in reversed(range(6))]
+
+
+class TestChangelogWriters:
+    """Test the streaming changelog writers."""
+
+    def test_writer_base_is_abstract(self):
+        with pytest.raises(TypeError):
+            ChangelogWriter()  # type: ignore[abstract]
+
+    def test_file_writer_matches_writing_at_once(self, tmp_path):
+        chunks = ["\n## v2\n\n- a\n\n", "\n", "## v1\n\n- b\n\n"]
+
+        assert write_changelog(iter(chunks), [FileChangelogWriter(str(tmp_path / "CHANGELOG.md"))])
+
+        assert (tmp_path / "CHANGELOG.md").read_text() == "".join(chunks).strip("\n") + "\n"
+
+    def test_empty_output_creates_no_file(self, tmp_path):
+        assert not write_changelog(iter(["\n", ""]), [FileChangelogWriter(str(tmp_path / "CHANGELOG.md"))])
+
+        assert not (tmp_path / "CHANGELOG.md").exists()
+
+    def test_sections_are_written_before_generation_finishes(self, tmp_path):
+        path = tmp_path / "CHANGELOG.md"
+
+        def chunks():
+            yield "## v2\n\n"
+            assert path.read_text() == "## v2"
+            yield "## v1\n\n"
+
+        write_changelog(chunks(), [FileChangelogWriter(str(path))])
+
+        assert path.read_text() == "## v2\n\n## v1\n"
+
+    def test_text_writer_to_stream(self):
+        stream = io.StringIO()
+
+        write_changelog(iter(["## v2\n\n", "## v1\n\n"]), [TextChangelogWriter(stream)])
+
+        assert stream.getvalue() == "## v2\n\n## v1\n"
+
+    def test_prepend_writer_writes_once_complete(self, tmp_path):
+        path = tmp_path / "CHANGELOG.md"
+        path.write_text("## v1\n")
+
+        def chunks():
+            yield "## v3\n\n"
+            assert path.read_text() == "## v1\n"
+            yield "## v2\n\n"
+
+        write_changelog(chunks(), [PrependChangelogWriter(str(path))])
+
+        assert path.read_text() == "## v3\n\n## v2\n\n## v1\n"
+
+    @patch("tgit.changelog.console")
+    @patch("tgit.changelog.Markdown")
+    def test_console_writer_renders_each_chunk(self, mock_markdown, mock_console):
+        with patch("tgit.changelog.print"):
+            write_changelog(iter(["## v2\n\n- a\n\n", "## v1\n\n"]), [ConsoleChangelogWriter("CHANGELOG.md")])
+
+        assert [c.args[0] for c in mock_markdown.call_args_list] == ["## v2\n\n- a", "## v1"]
+        mock_console.print.assert_any_call("[dim]It is saved to CHANGELOG.md[/dim]")
+
+    def test_plain_writer_prints_raw_markdown(self, capsys):
+        with patch("tgit.changelog.Markdown") as mock_markdown:
+            print_and_write_changelog(iter(["\n## v2\n\n- a\n\n", "## v1\n\n"]), render="plain")
+
+        assert capsys.readouterr().out == "## v2\n\n- a\n\n## v1\n"
+        mock_markdown.assert_not_called()
+
+    @patch("tgit.changelog.console")
+    def test_render_none_only_writes_the_file(self, mock_console, tmp_path, capsys):
+        path = tmp_path / "CHANGELOG.md"
+
+        print_and_write_changelog(iter(["## v2\n\n"]), str(path), render="none")
+
+        assert path.read_text() == "## v2\n"
+        assert capsys.readouterr().out == ""
+        mock_console.print.assert_not_called()
+
+    @pytest.mark.parametrize(
+        ("render", "isatty", "output_path", "expected"),
+        [
+            ("plain", True, None, "plain"),
+            (None, True, "CHANGELOG.md", "rich"),
+            (None, False, "CHANGELOG.md", "none"),
+            (None, False, None, "plain"),
+        ],
+    )
+    def test_resolve_render_mode(self, render, isatty, output_path, expected):
+        with patch("tgit.changelog.sys.stdout") as mock_stdout:
+            mock_stdout.isatty.return_value = isatty
+            assert resolve_render_mode(render, output_path) == expected
+
+    def test_writers_are_closed_when_generation_fails(self, tmp_path):
+        path = tmp_path / "CHANGELOG.md"
+
+        def chunks():
+            yield "## v2\n\n"
+            raise RuntimeError
+
+        with pytest.raises(RuntimeError):
+            write_changelog(chunks(), [FileChangelogWriter(str(path))])
+
+        assert path.read_text() == "## v2\n"
+
+    def test_generate_changelog_joins_lines(self):
+        lines = list(iter_changelog_lines({}, "v1", "v2"))
+
+        assert all(line.endswith("\n") for line in lines)
+        assert generate_changelog({}, "v1", "v2") == "".join(lines)
+
+
 class TestGetRemoteUriSafe:
     """Test _get_remote_uri_safe function."""
 
@@ -1156,28 +1656,6 @@ class TestGetChangelogByRange:
 class TestChangelogErrorHandling:
     """Test error handling in changelog functions."""
 
-    def test_tgit_commit_with_bytes_message_encoding_error(self):
-        """Test TGITCommit with bytes message that has encoding issues."""
-        mock_repo = Mock()
-        mock_repo.git.rev_parse.return_value = "abc1234"
-
-        mock_commit = Mock()
-        mock_commit.message = "feat: test message"  # Use valid UTF-8 string since bytes handling is in get_commits
-        mock_commit.author.name = "Test Author"
-        mock_commit.author.email = "test@example.com"
-        mock_commit.committed_datetime = Mock()
-        mock_commit.hexsha = "abcdef123456"
-
-        message_dict = {"emoji": "✨", "type": "feat", "scope": None, "description": "test message", "breaking": None}
-
-        # This should handle the commit creation properly
-        tgit_commit = TGITCommit(mock_repo, mock_commit, message_dict)
-
-        # Should not raise an exception and should have the correct properties
-        assert tgit_commit.type == "feat"
-        assert tgit_commit.description == "test message"
-        assert tgit_commit.breaking is False
-
     def test_get_remote_uri_safe_basic(self):
         """Test _get_remote_uri_safe basic functionality."""
         mock_repo = Mock()
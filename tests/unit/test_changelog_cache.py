@@ -0,0 +1,157 @@
+"""Tests for the on-disk changelog segment cache."""
+
+from unittest.mock import patch
+
+import git
+
+from tgit.changelog import (
+    VersionSegment,
+    _open_changelog_cache,
+    iter_changelogs_from_segments,
+    prepare_changelog_segments,
+)
+from tgit.changelog_cache import ChangelogCache
+from tgit.repo_cache import clear_repo_cache
+
+SHA_A = "a" * 40
+SHA_B = "b" * 40
+SHA_C = "c" * 40
+
+
+def _segment(from_hash=SHA_A, to_hash=SHA_B, from_name="v1.0.0", to_name="v1.1.0"):
+    return VersionSegment(from_hash=from_hash, to_hash=to_hash, from_name=from_name, to_name=to_name)
+
+
+class TestChangelogCache:
+    def test_round_trip(self, tmp_path):
+        cache = ChangelogCache(tmp_path / "cache" / "changelog", template_version=1)
+
+        assert cache.get(_segment(), "github.com/u/r") is None
+        cache.put(_segment(), "github.com/u/r", "## v1.1.0\n", {"feat": [{"hash": "abc1234"}]})
+
+        assert cache.get(_segment(), "github.com/u/r") == "## v1.1.0\n"
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert (tmp_path / "cache" / ".gitignore").read_text() == "*\n"
+
+    def test_key_covers_names_remote_and_template(self, tmp_path):
+        cache = ChangelogCache(tmp_path, template_version=1)
+        cache.put(_segment(), None, "## v1.1.0\n", {})
+
+        assert cache.get(_segment(to_name="release-1.1"), None) is None
+        assert cache.get(_segment(), "github.com/u/r") is None
+        assert ChangelogCache(tmp_path, template_version=2).get(_segment(), None) is None
+        assert ChangelogCache(tmp_path, template_version=1, traversal="first-parent").get(_segment(), None) is None
+
+    def test_moving_refs_are_not_cached(self, tmp_path):
+        cache = ChangelogCache(tmp_path, template_version=1)
+        head_segment = _segment(to_hash="HEAD", to_name="v1.2.0")
+
+        cache.put(head_segment, None, "## v1.2.0\n", {})
+
+        assert cache.get(head_segment, None) is None
+        assert (cache.hits, cache.misses) == (0, 0)
+        assert list(tmp_path.glob("*.json")) == []
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        cache = ChangelogCache(tmp_path, template_version=1)
+        cache.put(_segment(), None, "## v1.1.0\n", {})
+        next(tmp_path.glob("*.json")).write_text("{not json")
+
+        assert cache.get(_segment(), None) is None
+        assert cache.misses == 1
+
+    def test_prune_removes_entries_for_moved_tags_and_old_templates(self, tmp_path):
+        ChangelogCache(tmp_path, template_version=0).put(_segment(), None, "old", {})
+        cache = ChangelogCache(tmp_path, template_version=1)
+        cache.put(_segment(), None, "kept", {})
+        cache.put(_segment(from_hash=SHA_B, to_hash=SHA_C), None, "moved", {})
+
+        assert cache.prune({SHA_A, SHA_B}) == 2
+
+        assert cache.get(_segment(), None) == "kept"
+        assert cache.get(_segment(from_hash=SHA_B, to_hash=SHA_C), None) is None
+
+
+class TestChangelogCacheRealRepo:
+    @staticmethod
+    def _commit(repo, repo_path, message):
+        (repo_path / "test.txt").write_text(message)
+        repo.index.add(["test.txt"])
+        return repo.index.commit(message)
+
+    def _build_history(self, repo_path, repo, releases):
+        for i in range(releases):
+            self._commit(repo, repo_path, f"feat: feature {i}")
+            repo.create_tag(f"v0.{i + 1}.0")
+        self._commit(repo, repo_path, "fix: unreleased")
+
+    def _generate(self, repo):
+        segments = prepare_changelog_segments(repo, current_tag="v9.0.0")
+        cache = _open_changelog_cache(repo)
+        real_execute = git.cmd.Git.execute
+        with patch.object(git.cmd.Git, "execute", autospec=True, side_effect=real_execute) as mock_execute:
+            result = "".join(iter_changelogs_from_segments(repo, segments, cache=cache))
+        log_calls = [call.args[1] for call in mock_execute.call_args_list if "log" in call.args[1]]
+        return result, cache, log_calls
+
+    def test_second_run_only_walks_unreleased_segment(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        self._build_history(repo_path, repo, releases=4)
+
+        first, first_cache, _ = self._generate(repo)
+        second, second_cache, log_calls = self._generate(repo)
+
+        assert second == first
+        assert (first_cache.hits, first_cache.misses) == (0, 4)
+        assert (second_cache.hits, second_cache.misses) == (4, 0)
+        assert len(log_calls) == 1
+        assert log_calls[0][-1] == "--"
+        assert "HEAD" in log_calls[0]
+        assert ".tgit" not in repo.git.status("--porcelain")
+
+    def test_moved_tag_invalidates_entry(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        self._build_history(repo_path, repo, releases=3)
+        self._generate(repo)
+
+        repo.delete_tag("v0.3.0")
+        repo.create_tag("v0.3.0", ref="HEAD")
+        clear_repo_cache(repo)
+        result, cache, _ = self._generate(repo)
+
+        assert (cache.hits, cache.misses) == (2, 1)
+        assert "unreleased" in result.split("## v0.3.0")[1].split("## v0.2.0")[0]
+
+    def test_divergent_release_branch_lists_hotfix_once(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        dates = iter(f"2024-01-0{day}T12:00:00" for day in range(1, 10))
+
+        def commit(message):
+            (repo_path / "test.txt").write_text(message)
+            repo.index.add(["test.txt"])
+            date = next(dates)
+            return repo.index.commit(message, author_date=date, commit_date=date)
+
+        release = commit("feat: first release")
+        repo.create_tag("v1.0.0")
+        main = repo.active_branch
+        repo.create_head("release-1.0", release).checkout()
+        commit("fix: hotfix")
+        repo.create_tag("v1.0.1")
+        main.checkout()
+        commit("feat: next feature")
+        repo.create_tag("v1.1.0")
+
+        segments = prepare_changelog_segments(repo)
+        serial = "".join(iter_changelogs_from_segments(repo, segments))
+        parallel = "".join(iter_changelogs_from_segments(repo, segments, jobs=2))
+        cache = _open_changelog_cache(repo)
+        warm = "".join(iter_changelogs_from_segments(repo, segments, cache=cache))
+
+        assert serial.count("hotfix") == 1
+        assert "hotfix" in serial.split("## v1.0.1")[1].split("## v1.0.0")[0]
+        assert parallel == warm == serial
+        # 单独重新生成任意一个过期分段，结果也必须与整体遍历一致
+        for entry in sorted(cache.directory.glob("*.json")):
+            entry.unlink()
+            assert "".join(iter_changelogs_from_segments(repo, segments, cache=_open_changelog_cache(repo))) == serial
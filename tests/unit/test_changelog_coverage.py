@@ -1,3 +1,4 @@
+from datetime import UTC, datetime
 from unittest.mock import Mock, patch
 
 import pytest
@@ -6,59 +7,50 @@ from tgit.changelog import (
     get_commits,
     prepare_changelog_segments,
 )
+from tgit.gitlog import CommitAuthor, CommitRecord
+from tgit.tags import TagIndex, TagInfo, semver_key
 
 
 class TestChangelogCoverage:
     """Additional tests to increase coverage for changelog.py."""
 
-    @patch("tgit.changelog.commit_pattern")
-    def test_get_commits_bytes_message(self, mock_pattern):
-        """Test get_commits with bytes message."""
+    @patch("tgit.changelog.iter_commit_records")
+    def test_get_commits_multiline_subject(self, mock_iter_records):
+        """Test get_commits with a subject git folded from several lines."""
         repo = Mock()
-        commit = Mock()
-        commit.message = b"feat: bytes message"
-        repo.iter_commits.return_value = [commit]
-        
-        mock_pattern.match.return_value = None  # Just to avoid further processing
-        
-        get_commits(repo, "HEAD~1", "HEAD")
-        
-        # Verify message was decoded
-        # Since we mocked match to return None, we can't verify the result list,
-        # but we can verify that no error occurred during decoding.
+        record = CommitRecord(
+            "abc1234567890", "abc1234", (), CommitAuthor("A", "a@example.com"), datetime(2024, 1, 1, tzinfo=UTC), "fix: one two"
+        )
+        mock_iter_records.return_value = iter([record])
 
-    @patch("tgit.changelog.commit_pattern")
-    def test_get_commits_non_string_message(self, mock_pattern):
-        """Test get_commits with non-string message."""
+        assert [c.description for c in get_commits(repo, "HEAD~1", "HEAD")] == ["one two"]
+
+    @patch("tgit.changelog.iter_commit_records")
+    def test_get_commits_empty_subject(self, mock_iter_records):
+        """Test get_commits with an empty subject."""
         repo = Mock()
-        commit = Mock()
-        commit.message = 12345
-        repo.iter_commits.return_value = [commit]
-        
-        mock_pattern.match.return_value = None
-        
-        get_commits(repo, "HEAD~1", "HEAD")
+        record = CommitRecord("abc1234567890", "abc1234", (), CommitAuthor("A", "a@example.com"), datetime(2024, 1, 1, tzinfo=UTC), "")
+        mock_iter_records.return_value = iter([record])
+
+        assert get_commits(repo, "HEAD~1", "HEAD") == []
 
     def test_prepare_changelog_segments_with_latest_tag_in_file(self):
         """Test prepare_changelog_segments with latest_tag_in_file."""
         repo = Mock()
-        tag1 = Mock()
-        tag1.name = "v1.0.0"
-        tag1.commit.hexsha = "hash1"
-        tag1.commit.committed_datetime = 1000
-        
-        tag2 = Mock()
-        tag2.name = "v1.1.0"
-        tag2.commit.hexsha = "hash2"
-        tag2.commit.committed_datetime = 2000
-        
-        repo.tags = [tag1, tag2]
-        repo.iter_commits.return_value = [Mock(hexsha="init")]
-        
+        tag_index = TagIndex(
+            [
+                TagInfo("v1.0.0", "hash1", datetime(2023, 1, 1, tzinfo=UTC), None, semver_key("v1.0.0")),
+                TagInfo("v1.1.0", "hash2", datetime(2023, 2, 1, tzinfo=UTC), None, semver_key("v1.1.0")),
+            ]
+        )
+
         # Mock get_first_commit_hash
-        with patch("tgit.changelog.get_first_commit_hash", return_value="init"):
+        with (
+            patch("tgit.changelog.get_tag_index", return_value=tag_index),
+            patch("tgit.changelog.get_first_commit_hash", return_value="init"),
+        ):
             segments = prepare_changelog_segments(repo, latest_tag_in_file="v1.0.0")
-            
+
             assert len(segments) == 1
             assert segments[0].from_name == "v1.0.0"
             assert segments[0].to_name == "v1.1.0"
@@ -70,9 +62,9 @@ class TestChangelogCoverage:
         """Test get_changelog_by_range when remote is missing."""
         repo = Mock()
         repo.remote.side_effect = ValueError("No remote")
-        
+
         with pytest.warns(UserWarning, match="Origin not found"):
             get_changelog_by_range(repo, "HEAD~1", "HEAD")
-            
+
         mock_gen.assert_called_once()
         assert mock_gen.call_args[0][3] is None  # remote_uri should be None
@@ -1,10 +1,55 @@
+import json
+import subprocess
+import sys
+
 import pytest
 from unittest.mock import MagicMock, patch
 import click
 import threading
 from click.testing import CliRunner
 
-from tgit.cli import app, set_process_title, set_terminal_title, version_callback
+from tgit.add import add
+from tgit.cli import LAZY_SUBCOMMANDS, LazyGroup, app, set_process_title, set_terminal_title, version_callback
+
+HEAVY_MODULES = [
+    "git",
+    "openai",
+    "jinja2",
+    "pydantic",
+    "questionary",
+    "prompt_toolkit",
+    "rich.markdown",
+    "tgit.shared",
+    "tgit.commit",
+    "tgit.changelog",
+    "tgit.version",
+    "tgit.settings",
+]
+
+IMPORT_PROBE = """
+import json
+import sys
+
+from tgit.cli import app
+
+try:
+    app(sys.argv[1:])
+except SystemExit:
+    pass
+sys.stdout.flush()
+sys.stderr.write(json.dumps(sorted(sys.modules)))
+"""
+
+
+def _modules_loaded_by(args, cwd):
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", IMPORT_PROBE, *args],
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+        check=True,
+    )
+    return set(json.loads(result.stderr.strip().splitlines()[-1]))
 
 
 class TestCLI:
@@ -19,9 +64,28 @@ class TestCLI:
 
     def test_commands_registered(self):
         """Test that all expected commands are registered"""
-        # Just verify the app object exists and has the right type
-        # since the command registration details may vary by Click version
-        assert isinstance(app, click.Group)
+        assert isinstance(app, LazyGroup)
+        ctx = click.Context(app)
+        assert app.list_commands(ctx) == ["add", "changelog", "commit", "daemon", "settings", "version"]
+
+    def test_lazy_command_resolves_on_demand(self):
+        """Test that lazy subcommands resolve to their click commands"""
+        ctx = click.Context(app)
+        assert app.get_command(ctx, "add") is add
+        assert app.get_command(ctx, "missing") is None
+
+    def test_lazy_command_must_be_click_command(self):
+        """Test that a lazy entry pointing at a non-command is rejected"""
+        group = LazyGroup(name="demo", lazy_subcommands={"bad": "tgit.constants:DEFAULT_MODEL"})
+
+        with pytest.raises(TypeError):
+            group.get_command(click.Context(group), "bad")
+
+    def test_lazy_subcommands_point_at_commands(self):
+        """Test that every lazy entry resolves to a click command"""
+        ctx = click.Context(app)
+        for name in LAZY_SUBCOMMANDS:
+            assert isinstance(app.get_command(ctx, name), click.Command)
 
     @patch("tgit.cli.importlib.metadata.version")
     @patch("tgit.cli.console.print")
@@ -52,22 +116,17 @@ class TestCLI:
         mock_print.assert_not_called()
         mock_ctx.exit.assert_not_called()
 
-    @patch("tgit.cli.threading.Thread")
     @patch("tgit.cli.set_process_title")
     @patch("tgit.cli.set_terminal_title")
-    def test_app_starts_openai_import_thread(self, mock_set_terminal_title, mock_set_process_title, mock_thread):
-        """Test that app starts a thread for OpenAI import"""
-        mock_thread_instance = MagicMock()
-        mock_thread.return_value = mock_thread_instance
+    def test_app_callback_does_not_start_threads(self, mock_set_terminal_title, mock_set_process_title):
+        """Test that the app callback only sets titles and leaves AI warm-up to the commit path"""
+        threads_before = threading.active_count()
 
-        # Directly call the app function to test the callback
         app.callback()
 
         mock_set_process_title.assert_called_once_with("tgit")
         mock_set_terminal_title.assert_called_once_with("tgit")
-        # The app should run the callback and start the thread
-        mock_thread.assert_called_once()
-        mock_thread_instance.start.assert_called_once()
+        assert threading.active_count() == threads_before
 
     def test_openai_import_function(self):
         """Test that the OpenAI import function works without raising exceptions"""
@@ -127,6 +186,25 @@ class TestCLI:
         mock_flush.assert_not_called()
 
 
+class TestStartupImports:
+    """Lightweight invocations must not import the heavy command modules."""
+
+    def test_version_flag_skips_heavy_modules(self, tmp_path):
+        loaded = _modules_loaded_by(["--version"], tmp_path)
+
+        assert "tgit.cli" in loaded
+        assert not loaded.intersection(HEAVY_MODULES)
+
+    def test_add_skips_heavy_modules(self, temp_git_repo):
+        repo_path, _ = temp_git_repo
+        (repo_path / "new.txt").write_text("content")
+
+        loaded = _modules_loaded_by(["add", "new.txt"], repo_path)
+
+        assert "tgit.add" in loaded
+        assert not loaded.intersection(HEAVY_MODULES)
+
+
 class TestOpenAIDependencyHandling:
     """Test OpenAI dependency handling in CLI."""
 
@@ -1,38 +1,52 @@
 """Tests for commit module."""
 
+import json
+import re
 import click
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, call, patch, MagicMock
 import git
+import openai
 from pathlib import Path
 import tempfile
+import threading
+from types import SimpleNamespace
 from click.testing import CliRunner
 
 from tgit.commit import (
+    AIClientWarmup,
     CommitArgs,
     CommitData,
     MAX_DIFF_SECTION_CHARS,
+    PRECONNECT_TIMEOUT_SECONDS,
     PotentialSecret,
     TRUNCATED_DIFF_HEAD_CHARS,
     TRUNCATED_DIFF_TAIL_CHARS,
     TemplateParams,
     _build_diff_for_ai,
+    _confirm_detected_secrets,
+    _get_ai_response,
+    _get_diff_token_budget,
+    _patch_limits,
     _get_changed_files_from_status_output,
     _has_staged_changes,
     _stage_all_changes_if_confirmed,
-    get_changed_files_from_status,
-    get_file_change_sizes,
-    get_filtered_diff_files,
     _import_openai,
     _check_openai_availability,
     _create_openai_client,
     _generate_commit_with_ai,
+    _preconnect_openai_client,
     _truncate_diff_section,
     get_ai_command,
     handle_commit,
     commit,
+    commit_type_list,
+    register_custom_commit_types,
     MAX_DIFF_LINES,
 )
+from tgit.shared import reload_settings
+from tgit.utils import type_emojis
+from tgit.staged import StagedChanges, StagedFile, read_staged_changes
 
 
 class TestCommitArgs:
@@ -63,6 +77,37 @@ class TestTemplateParams:
         assert params.specified_type is None
 
 
+class TestRegisterCustomCommitTypes:
+    """Test registering the custom commit types of the current directory."""
+
+    @pytest.fixture(autouse=True)
+    def _restore_settings(self):
+        yield
+        reload_settings()
+        register_custom_commit_types()
+
+    @staticmethod
+    def _enter_repo(path, monkeypatch, types):
+        (path / ".tgit").mkdir(parents=True)
+        (path / ".tgit" / "settings.json").write_text(json.dumps({"commit": {"types": types}}))
+        monkeypatch.chdir(path)
+        reload_settings()
+        register_custom_commit_types()
+
+    def test_types_of_previous_directory_are_dropped(self, tmp_path, monkeypatch):
+        self._enter_repo(tmp_path / "first", monkeypatch, [{"type": "feat", "emoji": ":rocket:"}, {"type": "deploy", "emoji": ":ship:"}])
+        assert type_emojis["feat"] == ":rocket:"
+        assert "deploy" in commit_type_list
+
+        self._enter_repo(tmp_path / "second", monkeypatch, [{"type": "build", "emoji": ":package:"}])
+
+        assert type_emojis["feat"] == ":sparkles:"
+        assert "deploy" not in type_emojis
+        assert "deploy" not in commit_type_list
+        assert type_emojis["build"] == ":package:"
+        assert commit_type_list.count("build") == 1
+
+
 class TestCommitData:
     """Test CommitData Pydantic model."""
 
@@ -88,125 +133,10 @@ class TestCommitData:
         assert data.secrets[0].level == "error"
 
 
-class TestGetChangedFilesFromStatus:
-    """Test get_changed_files_from_status function."""
-
-    def test_get_changed_files_modified_files(self):
-        """Test getting changed files with modified files."""
-        mock_repo = Mock()
-        mock_repo.git.diff.return_value = "M\tsrc/file1.py\nA\tsrc/file2.py\nD\tsrc/file3.py"
-
-        result = get_changed_files_from_status(mock_repo)
-
-        assert result == {"src/file1.py", "src/file2.py", "src/file3.py"}
-        mock_repo.git.diff.assert_called_once_with("--cached", "--name-status", "-M")
-
-    def test_get_changed_files_renamed_files(self):
-        """Test getting changed files with renamed files."""
-        mock_repo = Mock()
-        mock_repo.git.diff.return_value = "R100\told_file.py\tnew_file.py\nM\tsrc/file1.py"
-
-        result = get_changed_files_from_status(mock_repo)
-
-        assert result == {"old_file.py", "new_file.py", "src/file1.py"}
-
-    def test_get_changed_files_empty_diff(self):
-        """Test getting changed files with empty diff."""
-        mock_repo = Mock()
-        mock_repo.git.diff.return_value = ""
-
-        result = get_changed_files_from_status(mock_repo)
-
-        assert result == set()
-
-    def test_get_changed_files_malformed_lines(self):
-        """Test handling malformed lines in diff output."""
-        mock_repo = Mock()
-        mock_repo.git.diff.return_value = "M\nincomplete_line\nA\tsrc/file.py"
-
-        result = get_changed_files_from_status(mock_repo)
-
-        assert result == {"src/file.py"}
-
-
-class TestGetFileChangeSizes:
-    """Test get_file_change_sizes function."""
-
-    def test_get_file_change_sizes_normal_files(self):
-        """Test getting file change sizes for normal files."""
-        mock_repo = Mock()
-        mock_repo.git.diff.return_value = "10\t5\tsrc/file1.py\n20\t0\tsrc/file2.py\n0\t15\tsrc/file3.py"
-
-        result = get_file_change_sizes(mock_repo)
-
-        expected = {"src/file1.py": 15, "src/file2.py": 20, "src/file3.py": 15}
-        assert result == expected
-        mock_repo.git.diff.assert_called_once_with("--cached", "--numstat", "-M")
-
-    def test_get_file_change_sizes_binary_files(self):
-        """Test getting file change sizes for binary files."""
-        mock_repo = Mock()
-        mock_repo.git.diff.return_value = "-\t-\timage.png\n5\t3\tsrc/file.py"
-
-        result = get_file_change_sizes(mock_repo)
-
-        expected = {"image.png": 0, "src/file.py": 8}
-        assert result == expected
-
-    def test_get_file_change_sizes_empty_diff(self):
-        """Test getting file change sizes with empty diff."""
-        mock_repo = Mock()
-        mock_repo.git.diff.return_value = ""
-
-        result = get_file_change_sizes(mock_repo)
-
-        assert result == {}
-
-    def test_get_file_change_sizes_malformed_lines(self):
-        """Test handling malformed lines in numstat output."""
-        mock_repo = Mock()
-        mock_repo.git.diff.return_value = "invalid_line\n10\t5\tsrc/file.py\nincomplete"
-
-        result = get_file_change_sizes(mock_repo)
-
-        assert result == {"src/file.py": 15}
-
-
-class TestGetFilteredDiffFiles:
-    """Test get_filtered_diff_files function."""
-
-    @patch("tgit.commit.get_changed_files_from_status")
-    def test_get_filtered_diff_files_normal_files(self, mock_get_files):
-        """Test filtering diff files with normal files."""
-        mock_get_files.return_value = {"src/file1.py", "src/file2.py", "package.lock"}
-
-        mock_repo = Mock()
-        files_to_include, lock_files = get_filtered_diff_files(mock_repo)
-
-        assert files_to_include == ["src/file1.py", "src/file2.py"]
-        assert lock_files == ["package.lock"]
-
-    @patch("tgit.commit.get_changed_files_from_status")
-    def test_get_filtered_diff_files_large_files(self, mock_get_files):
-        """Test keeping large files for later truncation."""
-        mock_get_files.return_value = {"src/small.py", "src/large.py"}
-
-        mock_repo = Mock()
-        files_to_include, lock_files = get_filtered_diff_files(mock_repo)
-
-        assert files_to_include == ["src/large.py", "src/small.py"]
-        assert lock_files == []
-
-    @patch("tgit.commit.get_changed_files_from_status")
-    def test_get_filtered_diff_files_no_size_info(self, mock_get_files):
-        """Test filtering files without size information."""
-        mock_get_files.return_value = {"src/file1.py", "src/file2.py"}
-
-        mock_repo = Mock()
-        files_to_include, lock_files = get_filtered_diff_files(mock_repo)
-
-        assert files_to_include == ["src/file1.py", "src/file2.py"]
-        assert lock_files == []
+def _staged(*paths):
+    return StagedChanges(
+        tuple(StagedFile(path, "M", added=1, deleted=0, patch=f"diff --git a/{path} b/{path}\n+change\n") for path in paths)
+    )
 
 
 class TestDiffTruncation:
@@ -214,16 +144,20 @@ class TestDiffTruncation:
 
     def test_truncate_diff_section_large_added_file(self):
         """Test truncating a large added-file diff section."""
-        diff_section = """diff --git a/src/new_file.py b/src/new_file.py
+        diff_section = (
+            """diff --git a/src/new_file.py b/src/new_file.py
 new file mode 100644
 index 0000000..1111111
 --- /dev/null
 +++ b/src/new_file.py
 @@ -0,0 +1,3 @@
 +start-line
-""" + ("x" * (MAX_DIFF_SECTION_CHARS + 100)) + """
+"""
+            + ("x" * (MAX_DIFF_SECTION_CHARS + 100))
+            + """
 +end-line
 """
+        )
 
         result = _truncate_diff_section(diff_section)
 
@@ -232,19 +166,10 @@ index 0000000..1111111
         assert "diff --git a/src/new_file.py b/src/new_file.py" in result
         assert "end-line" in result
 
-    @patch("tgit.commit.get_filtered_diff_files")
-    def test_build_diff_for_ai_truncates_large_added_file(self, mock_get_files):
+    def test_build_diff_for_ai_truncates_large_added_file(self):
         """Test building AI diff with a truncated large added file."""
-        mock_get_files.return_value = (["src/new_file.py"], ["pnpm-lock.yaml.lock"])
-        mock_repo = Mock()
-
-        with (
-            patch("tgit.commit.MAX_DIFF_SECTION_CHARS", 80),
-            patch("tgit.commit.MAX_DIFF_LINES", 10_000),
-            patch("tgit.commit.TRUNCATED_DIFF_HEAD_CHARS", 30),
-            patch("tgit.commit.TRUNCATED_DIFF_TAIL_CHARS", 25),
-        ):
-            mock_repo.git.diff.return_value = """diff --git a/src/new_file.py b/src/new_file.py
+        patch_text = (
+            """diff --git a/src/new_file.py b/src/new_file.py
 new file mode 100644
 index 0000000..1111111
 --- /dev/null
@@ -252,17 +177,75 @@ index 0000000..1111111
 @@ -0,0 +1,4 @@
 +alpha
 +beta
-+""" + ("x" * 120) + """
++"""
+            + ("x" * 120)
+            + """
 +omega
 """
+        )
+        staged = StagedChanges(
+            (StagedFile("src/new_file.py", "A", added=4, deleted=0, patch=patch_text), StagedFile("pnpm-lock.yaml.lock", "M"))
+        )
 
-            result = _build_diff_for_ai(mock_repo)
+        with (
+            patch("tgit.commit.MAX_DIFF_SECTION_CHARS", 80),
+            patch("tgit.commit.MAX_DIFF_LINES", 10_000),
+            patch("tgit.commit.TRUNCATED_DIFF_HEAD_CHARS", 30),
+            patch("tgit.commit.TRUNCATED_DIFF_TAIL_CHARS", 25),
+        ):
+            result = _build_diff_for_ai(staged)
 
         assert result is not None
         assert "[INFO] The following lock files were modified but are not included in the diff: pnpm-lock.yaml.lock" in result
         assert "[INFO] Middle of this file diff omitted:" in result
         assert "omega" in result
 
+    def test_streamed_truncation_matches_whole_diff(self, temp_git_repo):
+        """Test the bounded streamed patch renders exactly like truncating the whole diff."""
+        repo_path, repo = temp_git_repo
+        (repo_path / "big.txt").write_text("".join(f"line {i} " * 8 + "\n" for i in range(5_000)))
+        (repo_path / "test.txt").write_text("small change\n")
+        repo.index.add(["big.txt", "test.txt"])
+
+        whole = repo.git.diff("--cached", "-M", strip_newline_in_stdout=False)
+        expected = "".join(_truncate_diff_section(section) for section in re.split(r"(?m)^(?=diff --git )", whole) if section)
+        staged = read_staged_changes(repo, _patch_limits())
+
+        assert staged.files[0].patch_tail is not None
+        assert len(staged.files[0].patch) + len(staged.files[0].patch_tail) < len(whole) // 10
+        assert _build_diff_for_ai(staged) == expected
+
+    def test_build_diff_for_ai_fits_token_budget(self):
+        """Test the lock file notice is kept and the file diffs are degraded to fit the budget."""
+        files = []
+        for idx in range(200):
+            patch_text = f"diff --git a/src/m{idx}.py b/src/m{idx}.py\n@@ -1,40 +1,41 @@\n" + " context\n" * 40 + "+change\n"
+            files.append(StagedFile(f"src/m{idx}.py", "M", added=1, deleted=0, patch=patch_text))
+        staged = StagedChanges((*files, StagedFile("uv.lock", "M")))
+
+        result = _build_diff_for_ai(staged, 2_000)
+
+        assert result is not None
+        assert result.startswith("[INFO] The following lock files were modified but are not included in the diff: uv.lock")
+        assert len(result) <= 2_000 * 4
+        assert len(_build_diff_for_ai(staged) or "") > 10 * len(result)
+
+    @patch("tgit.commit.settings")
+    def test_diff_token_budget_resolution(self, mock_settings):
+        """Test per-model settings win over the global setting, which wins over the built-in budgets."""
+        mock_settings.diff_token_budgets = {"local-model": 4_000}
+        mock_settings.diff_token_budget = 0
+
+        assert _get_diff_token_budget("local-model") == 4_000
+        assert _get_diff_token_budget("gpt-5.4-nano") == 16_000
+        assert _get_diff_token_budget("gpt-5.1") == 48_000
+        assert _get_diff_token_budget("other-model") == 24_000
+
+        mock_settings.diff_token_budget = 8_000
+
+        assert _get_diff_token_budget("local-model") == 4_000
+        assert _get_diff_token_budget("gpt-5.4-nano") == 8_000
+
 
 class TestStageAllChanges:
     """Test staging all repository changes when nothing is staged."""
@@ -402,6 +385,119 @@ class TestCreateOpenAIClient:
         mock_openai.Client.assert_called_once_with(api_key="test-key", base_url="https://api.example.com")
 
 
+class TestAIClientWarmup:
+    """Test the background OpenAI client warm-up."""
+
+    @patch("tgit.commit._preconnect_openai_client")
+    @patch("tgit.commit._create_openai_client")
+    def test_warmup_builds_client_in_background(self, mock_create_client, mock_preconnect):
+        mock_client = Mock()
+        mock_create_client.return_value = mock_client
+
+        warmup = AIClientWarmup().start()
+
+        assert warmup.get_client() is mock_client
+        mock_create_client.assert_called_once()
+        mock_preconnect.assert_not_called()
+
+    @patch("tgit.commit._preconnect_openai_client")
+    @patch("tgit.commit._create_openai_client")
+    def test_warmup_preconnects_when_requested(self, mock_create_client, mock_preconnect):
+        mock_client = Mock()
+        mock_create_client.return_value = mock_client
+
+        warmup = AIClientWarmup(preconnect=True).start()
+
+        assert warmup.get_client() is mock_client
+        mock_preconnect.assert_called_once_with(mock_client)
+
+    @patch("tgit.commit._check_openai_availability")
+    @patch("tgit.commit._create_openai_client")
+    def test_warmup_failure_falls_back_to_foreground(self, mock_create_client, mock_check):
+        mock_client = Mock()
+        mock_create_client.side_effect = [RuntimeError("no api key"), mock_client]
+
+        warmup = AIClientWarmup().start()
+
+        assert warmup.get_client() is mock_client
+        assert mock_create_client.call_count == 2
+        mock_check.assert_called_once()
+
+    @patch("tgit.commit._create_openai_client")
+    def test_warmup_thread_is_daemon(self, mock_create_client):
+        building = threading.Event()
+        release = threading.Event()
+
+        def slow_client():
+            building.set()
+            release.wait(5)
+            return Mock()
+
+        mock_create_client.side_effect = slow_client
+        warmup = AIClientWarmup().start()
+        building.wait(5)
+        try:
+            threads = [thread for thread in threading.enumerate() if thread.name == "tgit-ai-warmup"]
+            assert threads
+            assert all(thread.daemon for thread in threads)
+        finally:
+            release.set()
+            warmup.get_client()
+
+    def test_preconnect_requests_base_url_without_retries(self):
+        mock_client = Mock()
+
+        _preconnect_openai_client(mock_client)
+
+        mock_client.with_options.assert_called_once_with(max_retries=0, timeout=PRECONNECT_TIMEOUT_SECONDS)
+        mock_client.with_options.return_value.get.assert_called_once_with("", cast_to=str)
+
+    def test_preconnect_ignores_api_errors(self):
+        mock_client = Mock()
+        mock_client.with_options.return_value.get.side_effect = openai.APIConnectionError(request=Mock())
+
+        _preconnect_openai_client(mock_client)
+
+        mock_client.with_options.return_value.get.assert_called_once()
+
+    @patch("tgit.commit._check_openai_availability")
+    @patch("tgit.commit._create_openai_client")
+    @patch("tgit.commit.console")
+    @patch("tgit.commit.commit_prompt_template")
+    @patch("tgit.commit.settings")
+    def test_generate_commit_with_ai_uses_warm_client(self, mock_settings, mock_template, mock_console, mock_create_client, mock_check):
+        mock_template.render.return_value = "system prompt"
+        mock_settings.model = "gpt-4"
+        mock_settings.reasoning_effort = ""
+        mock_settings.stream = False
+        warm_client = Mock()
+        warm_client.responses.parse.return_value.output_parsed = CommitData(type="feat", msg="add login")
+        warmup = Mock()
+        warmup.get_client.return_value = warm_client
+
+        result, _ = _generate_commit_with_ai("diff content", None, "main", warmup)
+
+        assert result is not None
+        assert result.msg == "add login"
+        mock_create_client.assert_not_called()
+        mock_check.assert_not_called()
+
+    @patch("tgit.commit.Path.cwd")
+    @patch("tgit.commit.git.Repo")
+    @patch("tgit.commit.read_staged_changes")
+    @patch("tgit.commit._build_diff_for_ai")
+    @patch("tgit.commit._start_ai_warmup")
+    def test_get_ai_command_starts_warmup_before_diff(self, mock_start, mock_build_diff, mock_read_staged, mock_repo, mock_cwd):
+        mock_cwd.return_value = Path(tempfile.gettempdir())
+        calls = []
+        mock_start.side_effect = lambda: calls.append("warmup")
+        mock_read_staged.side_effect = lambda *_args: calls.append("diff") or _staged("src/file.py")
+        mock_build_diff.return_value = None
+
+        assert get_ai_command() is None
+        assert calls == ["warmup", "diff"]
+
+
 class TestGenerateCommitWithAI:
     """Test AI commit generation."""
 
@@ -417,6 +513,7 @@ class TestGenerateCommitWithAI:
         mock_template.render.return_value = "system prompt"
         mock_settings.model = "gpt-4"
         mock_settings.reasoning_effort = ""
+        mock_settings.stream = False
 
         # Mock the response
         mock_response = Mock()
@@ -424,9 +521,10 @@ class TestGenerateCommitWithAI:
         mock_response.output_parsed = mock_commit_data
         mock_client.responses.parse.return_value = mock_response
 
-        result = _generate_commit_with_ai("diff content", "feat", "main")
+        result, secrets_listed = _generate_commit_with_ai("diff content", "feat", "main")
 
         assert result == mock_commit_data
+        assert secrets_listed is False
         mock_check.assert_called_once()
         mock_create_client.assert_called_once()
         mock_client.responses.parse.assert_called_once()
@@ -458,13 +556,14 @@ class TestGenerateCommitWithAI:
         mock_template.render.return_value = "system prompt"
         mock_settings.model = "o1-mini"
         mock_settings.reasoning_effort = ""
+        mock_settings.stream = False
 
         mock_response = Mock()
         mock_commit_data = CommitData(type="fix", scope=None, msg="correct bug", is_breaking=False, secrets=[])
         mock_response.output_parsed = mock_commit_data
         mock_client.responses.parse.return_value = mock_response
 
-        result = _generate_commit_with_ai("diff content", None, "main")
+        result, _ = _generate_commit_with_ai("diff content", None, "main")
 
         assert result == mock_commit_data
         mock_check.assert_called_once()
@@ -486,13 +585,14 @@ class TestGenerateCommitWithAI:
         mock_template.render.return_value = "system prompt"
         mock_settings.model = "gpt-5.4-mini"
         mock_settings.reasoning_effort = ""
+        mock_settings.stream = False
 
         mock_response = Mock()
         mock_commit_data = CommitData(type="fix", scope=None, msg="correct bug", is_breaking=False, secrets=[])
         mock_response.output_parsed = mock_commit_data
         mock_client.responses.parse.return_value = mock_response
 
-        result = _generate_commit_with_ai("diff content", None, "main")
+        result, _ = _generate_commit_with_ai("diff content", None, "main")
 
         assert result == mock_commit_data
         mock_check.assert_called_once()
@@ -514,13 +614,14 @@ class TestGenerateCommitWithAI:
         mock_template.render.return_value = "system prompt"
         mock_settings.model = "gpt-5.4-mini"
         mock_settings.reasoning_effort = "medium"
+        mock_settings.stream = False
 
         mock_response = Mock()
         mock_commit_data = CommitData(type="fix", scope=None, msg="correct bug", is_breaking=False, secrets=[])
         mock_response.output_parsed = mock_commit_data
         mock_client.responses.parse.return_value = mock_response
 
-        result = _generate_commit_with_ai("diff content", None, "main")
+        result, _ = _generate_commit_with_ai("diff content", None, "main")
 
         assert result == mock_commit_data
         mock_check.assert_called_once()
@@ -542,11 +643,130 @@ class TestGenerateCommitWithAI:
         mock_template.render.return_value = "system prompt"
         mock_settings.model = "gpt-5.4-mini"
         mock_settings.reasoning_effort = "minimal"
+        mock_settings.stream = False
 
         with pytest.raises(click.ClickException, match=r"not supported by model 'gpt-5\.4-mini'"):
             _generate_commit_with_ai("diff content", None, "main")
 
 
+class _FakeStream:
+    """Stands in for the openai responses stream: yields text deltas, then the parsed response."""
+
+    def __init__(self, text, parsed, events, chunk_size=4, interrupt_at=None):
+        self.text = text
+        self.parsed = parsed
+        self.events = events
+        self.chunk_size = chunk_size
+        self.interrupt_at = interrupt_at
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.closed = True
+        return False
+
+    def __iter__(self):
+        yield SimpleNamespace(type="response.created")
+        for start in range(0, len(self.text), self.chunk_size):
+            if self.interrupt_at is not None and start >= self.interrupt_at:
+                raise KeyboardInterrupt
+            yield SimpleNamespace(type="response.output_text.delta", delta=self.text[start : start + self.chunk_size])
+
+    def get_final_response(self):
+        self.events.append("final")
+        return SimpleNamespace(output_parsed=self.parsed)
+
+
+@patch("tgit.commit._check_openai_availability")
+@patch("tgit.commit._create_openai_client")
+@patch("tgit.commit.console")
+@patch("tgit.commit.commit_prompt_template")
+@patch("tgit.commit.settings")
+class TestStreamCommitWithAI:
+    """Test streamed AI commit generation."""
+
+    def _setup(self, mock_settings, mock_template, mock_create_client, data, **stream_kwargs):
+        mock_template.render.return_value = "system prompt"
+        mock_settings.model = "gpt-4"
+        mock_settings.reasoning_effort = ""
+        mock_settings.stream = True
+        events = []
+        stream = _FakeStream(data.model_dump_json(), data, events, **stream_kwargs)
+        mock_create_client.return_value.responses.stream.return_value = stream
+        return stream, events
+
+    def test_shows_message_as_it_streams(self, mock_settings, mock_template, mock_console, mock_create_client, mock_check):
+        """Test the status line follows the message and the parsed response is returned."""
+        data = CommitData(type="feat", scope="auth", msg="add login with [magic] links")
+        stream, _ = self._setup(mock_settings, mock_template, mock_create_client, data)
+
+        result, secrets_listed = _generate_commit_with_ai("diff content", None, "main")
+
+        assert result == data
+        assert secrets_listed is False
+        assert stream.closed
+        mock_create_client.return_value.responses.parse.assert_not_called()
+        _, kwargs = mock_create_client.return_value.responses.stream.call_args
+        assert kwargs["text_format"] is CommitData
+        updates = [call.args[0] for call in mock_console.status.return_value.__enter__.return_value.update.call_args_list]
+        assert any("feat(auth): add lo" in update for update in updates)
+        assert "feat(auth): add login with \\[magic] links" in updates[-1]
+
+    @patch("tgit.commit.print")
+    def test_lists_secrets_before_the_stream_ends(
+        self, mock_print, mock_settings, mock_template, mock_console, mock_create_client, mock_check
+    ):
+        """Test secrets are shown when their array closes and not again at the confirmation."""
+        secret = PotentialSecret(file=".env", description="OpenAI key")
+        data = CommitData(type="chore", msg="add env", secrets=[secret])
+        _, events = self._setup(mock_settings, mock_template, mock_create_client, data)
+        mock_print.side_effect = lambda *args: events.append(args[0])
+
+        result, secrets_listed = _generate_commit_with_ai("diff content", None, "main")
+
+        assert result is not None
+        assert secrets_listed is True
+        assert events.index("[red]- .env: OpenAI key[/red]") < events.index("final")
+
+        with patch("tgit.commit.click.confirm", return_value=False) as mock_confirm:
+            assert _confirm_detected_secrets(result.secrets, listed=True) is False
+        mock_confirm.assert_called_once_with("Detected potential secrets. Continue with commit?", default=False)
+        assert events.count("[red]- .env: OpenAI key[/red]") == 1
+
+    @patch("tgit.commit.print")
+    def test_falls_back_to_parse_when_streaming_fails(
+        self, mock_print, mock_settings, mock_template, mock_console, mock_create_client, mock_check
+    ):
+        """Test an endpoint that rejects streaming still gets a commit message from a plain request."""
+        data = CommitData(type="feat", msg="add login")
+        self._setup(mock_settings, mock_template, mock_create_client, data)
+        client = mock_create_client.return_value
+        client.responses.stream.side_effect = RuntimeError("stream not supported")
+        client.responses.parse.return_value.output_parsed = data
+
+        result, secrets_listed = _generate_commit_with_ai("diff content", None, "main")
+
+        assert result == data
+        assert secrets_listed is False
+        client.responses.parse.assert_called_once()
+        mock_print.assert_called_once_with("[dim]Streaming failed (stream not supported), retrying without streaming[/dim]")
+
+    @patch("tgit.commit.print")
+    def test_ctrl_c_cancels(self, mock_print, mock_settings, mock_template, mock_console, mock_create_client, mock_check):
+        """Test interrupting the stream closes it and reports a cancellation instead of a connection error."""
+        data = CommitData(type="feat", msg="a direction the user does not want")
+        stream, events = self._setup(mock_settings, mock_template, mock_create_client, data, interrupt_at=30)
+
+        assert _get_ai_response("diff content", None, "main") == (None, False)
+
+        assert stream.closed
+        assert "final" not in events
+        mock_print.assert_called_once_with("[yellow]Cancelled, no commit message was generated.[/yellow]")
+
+
+@pytest.mark.usefixtures("no_commit_cache")
 class TestGetAICommand:
     """Test get_ai_command function."""
 
@@ -566,13 +786,13 @@ class TestGetAICommand:
     @patch("tgit.commit.Path.cwd")
     @patch("tgit.commit.git.Repo")
     @patch("tgit.commit._stage_all_changes_if_confirmed")
-    @patch("tgit.commit.get_filtered_diff_files")
+    @patch("tgit.commit.read_staged_changes")
     def test_get_ai_command_no_files(self, mock_get_files, mock_stage_all, mock_repo, mock_cwd):
         """Test get_ai_command when no files to commit."""
         mock_cwd.return_value = Path(tempfile.gettempdir())
         mock_repo_instance = Mock()
         mock_repo.return_value = mock_repo_instance
-        mock_get_files.return_value = ([], [])
+        mock_get_files.return_value = StagedChanges()
         mock_stage_all.return_value = True
 
         with patch("tgit.commit.print") as mock_print:
@@ -584,7 +804,7 @@ class TestGetAICommand:
     @patch("tgit.commit.Path.cwd")
     @patch("tgit.commit.git.Repo")
     @patch("tgit.commit._stage_all_changes_if_confirmed")
-    @patch("tgit.commit.get_filtered_diff_files")
+    @patch("tgit.commit.read_staged_changes")
     @patch("tgit.commit._generate_commit_with_ai")
     @patch("tgit.commit.get_commit_command")
     @patch("tgit.commit.settings")
@@ -602,15 +822,16 @@ class TestGetAICommand:
         mock_cwd.return_value = Path(tempfile.gettempdir())
         mock_repo_instance = Mock()
         mock_repo.return_value = mock_repo_instance
-        mock_get_files.return_value = (["src/file.py"], ["package.lock"])
+        mock_get_files.return_value = StagedChanges((*_staged("src/file.py").files, StagedFile("package.lock", "M")))
         mock_stage_all.return_value = True
 
-        mock_repo_instance.git.diff.return_value = "diff content"
         mock_repo_instance.active_branch.name = "main"
         mock_settings.commit.emoji = True
+        mock_settings.diff_token_budgets = {}
+        mock_settings.diff_token_budget = 0
 
         mock_commit_data = CommitData(type="feat", scope="auth", msg="add login", is_breaking=False, secrets=[])
-        mock_generate.return_value = mock_commit_data
+        mock_generate.return_value = (mock_commit_data, False)
         mock_get_commit_command.return_value = "git commit -m 'feat(auth): add login'"
 
         result = get_ai_command()
@@ -619,11 +840,47 @@ class TestGetAICommand:
         mock_generate.assert_called_once()
         mock_get_commit_command.assert_called_once_with("feat", "auth", "add login", use_emoji=True, is_breaking=False)
 
+    @patch("tgit.commit.print")
     @patch("tgit.commit.click.confirm")
     @patch("tgit.commit.Path.cwd")
     @patch("tgit.commit.git.Repo")
     @patch("tgit.commit._stage_all_changes_if_confirmed")
-    @patch("tgit.commit.get_filtered_diff_files")
+    @patch("tgit.commit.read_staged_changes")
+    @patch("tgit.commit._generate_commit_with_ai")
+    @patch("tgit.commit.get_commit_command")
+    @patch("tgit.commit.settings")
+    def test_get_ai_command_does_not_relist_streamed_secrets(
+        self,
+        mock_settings,
+        mock_get_commit_command,
+        mock_generate,
+        mock_get_files,
+        mock_stage_all,
+        mock_repo,
+        mock_cwd,
+        mock_confirm,
+        mock_print,
+    ):
+        """Test secrets already listed while streaming are only confirmed, not printed again."""
+        mock_cwd.return_value = Path(tempfile.gettempdir())
+        mock_repo.return_value.active_branch.name = "main"
+        mock_get_files.return_value = _staged("src/file.py")
+        mock_settings.diff_token_budgets = {}
+        mock_settings.diff_token_budget = 0
+        secret = PotentialSecret(file="src/file.py", description="possible api key")
+        mock_generate.return_value = (CommitData(type="feat", msg="add login", secrets=[secret]), True)
+        mock_confirm.return_value = False
+
+        assert get_ai_command() is None
+
+        mock_confirm.assert_called_once_with("Detected potential secrets. Continue with commit?", default=False)
+        assert call("[red]- src/file.py: possible api key[/red]") not in mock_print.call_args_list
+
+    @patch("tgit.commit.click.confirm")
+    @patch("tgit.commit.Path.cwd")
+    @patch("tgit.commit.git.Repo")
+    @patch("tgit.commit._stage_all_changes_if_confirmed")
+    @patch("tgit.commit.read_staged_changes")
     @patch("tgit.commit._generate_commit_with_ai")
     @patch("tgit.commit.get_commit_command")
     @patch("tgit.commit.settings")
@@ -642,15 +899,16 @@ class TestGetAICommand:
         mock_cwd.return_value = Path(tempfile.gettempdir())
         mock_repo_instance = Mock()
         mock_repo.return_value = mock_repo_instance
-        mock_get_files.return_value = (["src/file.py"], [])
+        mock_get_files.return_value = _staged("src/file.py")
         mock_stage_all.return_value = True
-        mock_repo_instance.git.diff.return_value = "diff content"
         mock_repo_instance.active_branch.name = "main"
         mock_settings.commit.emoji = True
+        mock_settings.diff_token_budgets = {}
+        mock_settings.diff_token_budget = 0
 
         secret = PotentialSecret(file="src/file.py", description="possible api key")
         mock_commit_data = CommitData(type="feat", scope="auth", msg="add login", is_breaking=False, secrets=[secret])
-        mock_generate.return_value = mock_commit_data
+        mock_generate.return_value = (mock_commit_data, False)
         mock_confirm.return_value = False
 
         result = get_ai_command()
@@ -663,7 +921,7 @@ class TestGetAICommand:
     @patch("tgit.commit.Path.cwd")
     @patch("tgit.commit.git.Repo")
     @patch("tgit.commit._stage_all_changes_if_confirmed")
-    @patch("tgit.commit.get_filtered_diff_files")
+    @patch("tgit.commit.read_staged_changes")
     @patch("tgit.commit._generate_commit_with_ai")
     @patch("tgit.commit.get_commit_command")
     @patch("tgit.commit.settings")
@@ -682,15 +940,16 @@ class TestGetAICommand:
         mock_cwd.return_value = Path(tempfile.gettempdir())
         mock_repo_instance = Mock()
         mock_repo.return_value = mock_repo_instance
-        mock_get_files.return_value = (["src/file.py"], [])
+        mock_get_files.return_value = _staged("src/file.py")
         mock_stage_all.return_value = True
-        mock_repo_instance.git.diff.return_value = "diff content"
         mock_repo_instance.active_branch.name = "main"
         mock_settings.commit.emoji = True
+        mock_settings.diff_token_budgets = {}
+        mock_settings.diff_token_budget = 0
 
         secret = PotentialSecret(file="src/file.py", description="possible api key")
         mock_commit_data = CommitData(type="feat", scope="auth", msg="add login", is_breaking=False, secrets=[secret])
-        mock_generate.return_value = mock_commit_data
+        mock_generate.return_value = (mock_commit_data, False)
         mock_get_commit_command.return_value = "git commit -m 'feat(auth): add login'"
         mock_confirm.return_value = True
 
@@ -704,7 +963,7 @@ class TestGetAICommand:
     @patch("tgit.commit.Path.cwd")
     @patch("tgit.commit.git.Repo")
     @patch("tgit.commit._stage_all_changes_if_confirmed")
-    @patch("tgit.commit.get_filtered_diff_files")
+    @patch("tgit.commit.read_staged_changes")
     @patch("tgit.commit._generate_commit_with_ai")
     @patch("tgit.commit.get_commit_command")
     @patch("tgit.commit.settings")
@@ -723,15 +982,16 @@ class TestGetAICommand:
         mock_cwd.return_value = Path(tempfile.gettempdir())
         mock_repo_instance = Mock()
         mock_repo.return_value = mock_repo_instance
-        mock_get_files.return_value = (["src/file.py"], [])
+        mock_get_files.return_value = _staged("src/file.py")
         mock_stage_all.return_value = True
-        mock_repo_instance.git.diff.return_value = "diff content"
         mock_repo_instance.active_branch.name = "main"
         mock_settings.commit.emoji = True
+        mock_settings.diff_token_budgets = {}
+        mock_settings.diff_token_budget = 0
 
         secret = PotentialSecret(file="src/file.py", description="api key name only", level="warning")
         mock_commit_data = CommitData(type="feat", scope="auth", msg="add login", is_breaking=False, secrets=[secret])
-        mock_generate.return_value = mock_commit_data
+        mock_generate.return_value = (mock_commit_data, False)
         mock_get_commit_command.return_value = "git commit -m 'feat(auth): add login'"
         mock_confirm.return_value = True
 
@@ -744,17 +1004,16 @@ class TestGetAICommand:
     @patch("tgit.commit.Path.cwd")
     @patch("tgit.commit.git.Repo")
     @patch("tgit.commit._stage_all_changes_if_confirmed")
-    @patch("tgit.commit.get_filtered_diff_files")
+    @patch("tgit.commit.read_staged_changes")
     @patch("tgit.commit._generate_commit_with_ai")
     def test_get_ai_command_ai_failure(self, mock_generate, mock_get_files, mock_stage_all, mock_repo, mock_cwd):
         """Test get_ai_command when AI generation fails."""
         mock_cwd.return_value = Path(tempfile.gettempdir())
         mock_repo_instance = Mock()
         mock_repo.return_value = mock_repo_instance
-        mock_get_files.return_value = (["src/file.py"], [])
+        mock_get_files.return_value = _staged("src/file.py")
         mock_stage_all.return_value = True
 
-        mock_repo_instance.git.diff.return_value = "diff content"
         mock_repo_instance.active_branch.name = "main"
         mock_generate.side_effect = Exception("AI Error")
 
@@ -767,16 +1026,39 @@ class TestGetAICommand:
     @patch("tgit.commit.Path.cwd")
     @patch("tgit.commit.git.Repo")
     @patch("tgit.commit._stage_all_changes_if_confirmed")
-    def test_get_ai_command_aborts_when_stage_all_declined(self, mock_stage_all, mock_repo, mock_cwd):
-        """Test get_ai_command aborts before building diff when staging is declined."""
+    @patch("tgit.commit.read_staged_changes")
+    def test_get_ai_command_aborts_when_stage_all_declined(self, mock_read_staged, mock_stage_all, mock_repo, mock_cwd):
+        """Test get_ai_command aborts before building diff when nothing is staged and staging is declined."""
         mock_cwd.return_value = Path(tempfile.gettempdir())
         mock_repo.return_value = Mock()
+        mock_read_staged.return_value = StagedChanges()
         mock_stage_all.return_value = False
 
         result = get_ai_command()
 
         assert result is None
         mock_stage_all.assert_called_once()
+        mock_read_staged.assert_called_once()
+
+    @patch("tgit.commit.Path.cwd")
+    @patch("tgit.commit.git.Repo")
+    @patch("tgit.commit._stage_all_changes_if_confirmed")
+    @patch("tgit.commit.read_staged_changes")
+    @patch("tgit.commit._generate_commit_with_ai")
+    def test_get_ai_command_skips_status_when_changes_are_staged(
+        self, mock_generate, mock_read_staged, mock_stage_all, mock_repo, mock_cwd
+    ):
+        """Test staged changes are read once and git status is not run."""
+        mock_cwd.return_value = Path(tempfile.gettempdir())
+        mock_repo.return_value.active_branch.name = "main"
+        mock_read_staged.return_value = _staged("src/file.py")
+        mock_generate.return_value = (None, False)
+
+        get_ai_command()
+
+        mock_read_staged.assert_called_once()
+        mock_stage_all.assert_not_called()
+        assert mock_generate.call_args.args[0] == "diff --git a/src/file.py b/src/file.py\n+change\n"
 
 
 class TestHandleCommit:
@@ -791,7 +1073,7 @@ class TestHandleCommit:
         args = CommitArgs(message=[], emoji=False, breaking=False, ai=True)
         handle_commit(args)
 
-        mock_get_ai_command.assert_called_once_with()
+        mock_get_ai_command.assert_called_once_with(use_cache=True)
         # run_command is called with settings and command
         mock_run_command.assert_called_once()
         call_args = mock_run_command.call_args[0]
@@ -807,7 +1089,7 @@ class TestHandleCommit:
         args = CommitArgs(message=[], emoji=False, breaking=False, ai=False)
         handle_commit(args)
 
-        mock_get_ai_command.assert_called_once_with()
+        mock_get_ai_command.assert_called_once_with(use_cache=True)
         # run_command is called with settings and command
         mock_run_command.assert_called_once()
         call_args = mock_run_command.call_args[0]
@@ -823,7 +1105,7 @@ class TestHandleCommit:
         args = CommitArgs(message=["feat"], emoji=False, breaking=False, ai=False)
         handle_commit(args)
 
-        mock_get_ai_command.assert_called_once_with(specified_type="feat")
+        mock_get_ai_command.assert_called_once_with(specified_type="feat", use_cache=True)
         # run_command is called with settings and command
         mock_run_command.assert_called_once()
         call_args = mock_run_command.call_args[0]
@@ -987,6 +1269,60 @@ class TestCommitFunction:
         assert called_args.emoji == expected_args.emoji
         assert called_args.breaking == expected_args.breaking
         assert called_args.ai == expected_args.ai
+        assert called_args.no_cache is False
+
+    @patch("tgit.commit.handle_commit")
+    def test_commit_function_no_cache(self, mock_handle_commit):
+        """Test --no-cache reaches handle_commit."""
+        result = CliRunner().invoke(commit, ["--no-cache"])
+
+        assert result.exit_code == 0
+        assert mock_handle_commit.call_args[0][0].no_cache is True
+
+
+class TestCommitMessageCache:
+    """Test reusing the AI response cached for the staged tree."""
+
+    @patch("tgit.commit.Path.cwd")
+    @patch("tgit.commit._generate_commit_with_ai")
+    def test_repeated_run_reuses_response(self, mock_generate, mock_cwd, temp_git_repo):
+        """Test the provider is asked once per staged tree unless the cache is bypassed."""
+        repo_path, repo = temp_git_repo
+        mock_cwd.return_value = repo_path
+        (repo_path / "app.py").write_text("print('hello')\n")
+        repo.index.add(["app.py"])
+        mock_generate.return_value = (CommitData(type="feat", scope=None, msg="add app"), False)
+
+        first = get_ai_command()
+        second = get_ai_command()
+
+        assert first == second
+        assert mock_generate.call_count == 1
+
+        get_ai_command(specified_type="fix")
+        get_ai_command(use_cache=False)
+
+        assert mock_generate.call_count == 3
+
+        (repo_path / "app.py").write_text("print('bye')\n")
+        repo.index.add(["app.py"])
+        get_ai_command()
+
+        assert mock_generate.call_count == 4
+
+    @patch("tgit.commit.Path.cwd")
+    @patch("tgit.commit._generate_commit_with_ai")
+    def test_failed_response_is_not_cached(self, mock_generate, mock_cwd, temp_git_repo):
+        """Test a failed request is retried on the next run."""
+        repo_path, repo = temp_git_repo
+        mock_cwd.return_value = repo_path
+        (repo_path / "app.py").write_text("print('hello')\n")
+        repo.index.add(["app.py"])
+        mock_generate.side_effect = [(None, False), (CommitData(type="feat", msg="add app"), False)]
+
+        assert get_ai_command() is None
+        assert get_ai_command() is not None
+        assert mock_generate.call_count == 2
 
 
 class TestCommitErrorHandling:
@@ -1005,32 +1341,3 @@ class TestCommitErrorHandling:
 
         # Should have called get_ai_command
         mock_get_ai_command.assert_called_once()
-
-    def test_get_file_change_sizes_binary_files(self):
-        """Test get_file_change_sizes with binary files."""
-        mock_repo = Mock()
-        mock_repo.git.diff.return_value = "-\t-\timage.png\n5\t0\tfile.py\n-\t-\tbinary.dat"
-
-        result = get_file_change_sizes(mock_repo)
-
-        # Should handle binary files (marked with -/-) as 0 size
-        expected = {
-            "image.png": 0,  # Binary files treated as 0 size
-            "file.py": 5,
-            "binary.dat": 0,
-        }
-        assert result == expected
-
-    @patch("tgit.commit.git.Repo")
-    def test_get_changed_files_from_status_renamed_files(self, mock_repo_class):
-        """Test get_changed_files_from_status with renamed files."""
-        mock_repo = Mock()
-        mock_repo.git.diff.return_value = """R100\told_name.py\tnew_name.py
-R100\tdir/old.js\tdir/new.js
-M\tmodified.py"""
-
-        result = get_changed_files_from_status(mock_repo)
-
-        # Should include both old and new names of renamed files and modified files
-        expected = {"old_name.py", "new_name.py", "dir/old.js", "dir/new.js", "modified.py"}
-        assert result == expected
@@ -0,0 +1,60 @@
+"""Tests for the AI commit message cache."""
+
+import os
+
+from tgit.commit_cache import CommitMessageCache
+
+
+def _key(tree, **params):
+    return CommitMessageCache.make_key(tree, model="gpt-5.4-mini", **params)
+
+
+class TestCommitMessageCache:
+    def test_round_trip(self, tmp_path):
+        cache = CommitMessageCache(tmp_path / "cache")
+        value = {"type": "feat", "scope": None, "msg": "add login"}
+
+        assert cache.get(_key("a" * 40)) is None
+        cache.put(_key("a" * 40), value)
+
+        assert cache.get(_key("a" * 40)) == value
+        assert cache.get(_key("a" * 40, specified_type="fix")) is None
+        assert cache.get(_key("b" * 40)) is None
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        cache = CommitMessageCache(tmp_path)
+        cache.put(_key("a" * 40), {"msg": "x"})
+        for path in tmp_path.glob("*.json"):
+            path.write_text("{not json")
+
+        assert cache.get(_key("a" * 40)) is None
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        value = {"msg": "x" * 200}
+        cache = CommitMessageCache(tmp_path, max_bytes=10**6)
+        entries = []
+        for idx in range(3):
+            before = set(tmp_path.glob("*.json"))
+            cache.put(_key(str(idx)), value)
+            entries.extend(set(tmp_path.glob("*.json")) - before)
+        entry_size = max(path.stat().st_size for path in entries)
+        # 让条目按写入顺序变旧，然后读一次最旧的那个
+        for idx, entry in enumerate(entries):
+            os.utime(entry, ns=(idx * 10**9, idx * 10**9))
+        cache.get(_key("0"))
+
+        cache.max_bytes = entry_size * 2
+        removed = cache.evict()
+
+        assert removed == 1
+        assert cache.get(_key("0")) == value
+        assert cache.get(_key("1")) is None
+        assert cache.get(_key("2")) == value
+
+    def test_put_keeps_cache_under_max_bytes(self, tmp_path):
+        cache = CommitMessageCache(tmp_path, max_bytes=2_000)
+        for idx in range(50):
+            cache.put(_key(str(idx)), {"msg": "x" * 200})
+
+        assert sum(path.stat().st_size for path in tmp_path.glob("*.json")) <= 2_000
+        assert cache.get(_key("49")) is not None
@@ -5,9 +5,9 @@ from tgit.commit import (
     CommitArgs,
     _supports_reasoning,
     get_ai_command,
-    get_file_change_sizes,
     handle_commit,
 )
+from tgit.staged import StagedChanges, StagedFile
 
 
 class TestCommitCoverage:
@@ -18,47 +18,35 @@ class TestCommitCoverage:
         assert _supports_reasoning("") is False
         assert _supports_reasoning(None) is False
 
-    def test_get_file_change_sizes_value_error(self):
-        """Test get_file_change_sizes with invalid numstat."""
-        repo = Mock()
-        # Simulate a case where numstat returns invalid integer
-        repo.git.diff.return_value = "invalid\tinvalid\timage.png"
-
-        sizes = get_file_change_sizes(repo)
-        assert sizes["image.png"] == 0
-
     @patch("tgit.commit.git.Repo")
     @patch("tgit.commit._stage_all_changes_if_confirmed")
-    @patch("tgit.commit.get_filtered_diff_files")
-    def test_get_ai_command_no_diff(self, mock_filter, mock_stage_all, mock_repo):
+    @patch("tgit.commit.read_staged_changes")
+    def test_get_ai_command_no_diff(self, mock_read_staged, mock_stage_all, mock_repo):
         """Test get_ai_command when there is no diff after filtering."""
         repo = Mock()
         mock_repo.return_value = repo
         mock_stage_all.return_value = True
 
-        # Return some files to pass the first check
-        mock_filter.return_value = (["file.txt"], [])
-
-        # But make git diff return empty string
-        repo.git.diff.return_value = ""
+        # A staged file whose patch is empty, e.g. an unmerged entry
+        mock_read_staged.return_value = StagedChanges((StagedFile("file.txt", "U"),))
         repo.active_branch.name = "main"
 
         assert get_ai_command() is None
 
+    @pytest.mark.usefixtures("no_commit_cache")
     @patch("tgit.commit.git.Repo")
     @patch("tgit.commit._stage_all_changes_if_confirmed")
-    @patch("tgit.commit.get_filtered_diff_files")
+    @patch("tgit.commit.read_staged_changes")
     @patch("tgit.commit._generate_commit_with_ai")
-    def test_get_ai_command_ai_failure(self, mock_gen, mock_filter, mock_stage_all, mock_repo):
+    def test_get_ai_command_ai_failure(self, mock_gen, mock_read_staged, mock_stage_all, mock_repo):
         """Test get_ai_command when AI generation fails."""
         repo = Mock()
         mock_repo.return_value = repo
         mock_stage_all.return_value = True
-        mock_filter.return_value = (["file.txt"], [])
-        repo.git.diff.return_value = "diff content"
+        mock_read_staged.return_value = StagedChanges((StagedFile("file.txt", "M", patch="diff content"),))
         repo.active_branch.name = "main"
 
-        mock_gen.return_value = None
+        mock_gen.return_value = (None, False)
 
         assert get_ai_command() is None
 
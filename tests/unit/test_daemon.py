@@ -0,0 +1,180 @@
+"""Tests for the tgit daemon and its thin client."""
+
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from tgit.client import (
+    LOCAL_COMMANDS,
+    forward,
+    get_build_id,
+    get_socket_path,
+    main,
+    receive_message,
+    send_message,
+)
+from tgit.daemon import _send_control, daemon
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "send_fds"), reason="requires Unix domain sockets")
+
+SERVE_SCRIPT = """
+import sys
+from pathlib import Path
+
+from tgit.daemon import serve
+
+serve(Path(sys.argv[1]))
+"""
+
+
+def _make_socket_dir():
+    # Unix socket paths are length-limited, so avoid pytest's deep tmp_path.
+    return Path(tempfile.mkdtemp(prefix="tgitd"))
+
+
+def _start_daemon(socket_path):
+    process = subprocess.Popen([sys.executable, "-c", SERVE_SCRIPT, str(socket_path)], stdin=subprocess.DEVNULL)  # noqa: S603
+    deadline = time.monotonic() + 30
+    while _send_control(socket_path, "status") is None:
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            pytest.fail("daemon did not start")
+        time.sleep(0.05)
+    return process
+
+
+@pytest.fixture
+def socket_dir():
+    path = _make_socket_dir()
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest.fixture(scope="module")
+def running_daemon():
+    path = _make_socket_dir()
+    socket_path = path / "d.sock"
+    process = _start_daemon(socket_path)
+    yield socket_path
+    _send_control(socket_path, "stop")
+    process.wait(timeout=10)
+    shutil.rmtree(path, ignore_errors=True)
+
+
+class TestProtocol:
+    def test_message_round_trip_with_fds(self):
+        left, right = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        read_fd, write_fd = os.pipe()
+        try:
+            send_message(left, {"argv": ["--version"], "env": {"X": "y" * 100000}}, (write_fd,))
+            message, fds = receive_message(right, maxfds=1)
+
+            assert message == {"argv": ["--version"], "env": {"X": "y" * 100000}}
+            assert len(fds) == 1
+            os.write(fds[0], b"ok")
+            os.close(fds[0])
+            assert os.read(read_fd, 2) == b"ok"
+        finally:
+            left.close()
+            right.close()
+            os.close(read_fd)
+            os.close(write_fd)
+
+    def test_receive_message_peer_closed(self):
+        left, right = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        left.close()
+
+        assert receive_message(right) == (None, [])
+        right.close()
+
+    def test_socket_path_env_override(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("TGIT_DAEMON_SOCKET", str(tmp_path / "custom.sock"))
+
+        assert get_socket_path() == tmp_path / "custom.sock"
+
+    def test_build_id_is_stable(self):
+        assert get_build_id() == get_build_id()
+
+
+class TestClient:
+    def test_forward_without_daemon_returns_none(self, socket_dir):
+        assert forward(["--version"], socket_dir / "missing.sock") is None
+
+    def test_main_runs_locally_without_daemon(self, socket_dir, monkeypatch):
+        monkeypatch.setenv("TGIT_DAEMON_SOCKET", str(socket_dir / "missing.sock"))
+        monkeypatch.setattr(sys, "argv", ["tgit", "--version"])
+
+        with patch("tgit.cli.app") as mock_app:
+            main()
+
+        mock_app.assert_called_once_with()
+
+    def test_main_never_forwards_daemon_command(self, monkeypatch):
+        monkeypatch.setattr(sys, "argv", ["tgit", "daemon", "status"])
+
+        with patch("tgit.client.forward") as mock_forward, patch("tgit.cli.app"):
+            main()
+
+        assert "daemon" in LOCAL_COMMANDS
+        mock_forward.assert_not_called()
+
+
+class TestDaemon:
+    def test_forwarded_command_writes_to_client_stdout(self, running_daemon, capfd):
+        exit_code = forward(["--version"], running_daemon)
+
+        assert exit_code == 0
+        assert "TGIT - ver." in capfd.readouterr().out
+
+    def test_forwarded_command_uses_client_cwd(self, running_daemon, temp_git_repo, monkeypatch):
+        repo_path, repo = temp_git_repo
+        (repo_path / "new.txt").write_text("content")
+        monkeypatch.chdir(repo_path)
+
+        exit_code = forward(["add", "new.txt"], running_daemon)
+
+        assert exit_code == 0
+        assert "new.txt" in repo.git.diff("--cached", "--name-only")
+
+    def test_forwarded_command_reports_exit_code(self, running_daemon, capfd):
+        exit_code = forward(["no-such-command"], running_daemon)
+
+        assert exit_code == 2
+        assert "No such command" in capfd.readouterr().err
+
+    def test_incompatible_build_falls_back(self, running_daemon):
+        with patch("tgit.client.get_build_id", return_value="other-build"):
+            assert forward(["--version"], running_daemon) is None
+
+    def test_status_and_stop_commands(self, socket_dir, monkeypatch):
+        socket_path = socket_dir / "d.sock"
+        process = _start_daemon(socket_path)
+        monkeypatch.setenv("TGIT_DAEMON_SOCKET", str(socket_path))
+        runner = CliRunner()
+
+        status_result = runner.invoke(daemon, ["status"])
+        assert status_result.exit_code == 0
+        assert "tgit daemon running" in status_result.output
+
+        stop_result = runner.invoke(daemon, ["stop"])
+        assert stop_result.exit_code == 0
+        assert "stopped" in stop_result.output
+        assert process.wait(timeout=10) == 0
+        assert not socket_path.exists()
+
+    def test_stop_without_daemon(self, socket_dir, monkeypatch):
+        monkeypatch.setenv("TGIT_DAEMON_SOCKET", str(socket_dir / "missing.sock"))
+
+        result = CliRunner().invoke(daemon, ["stop"])
+
+        assert result.exit_code == 0
+        assert "No tgit daemon is running" in result.output
@@ -0,0 +1,103 @@
+"""Tests for fitting the AI prompt diff into a token budget."""
+
+from tgit.diff_budget import (
+    GENERATED_FILE,
+    REDUCED_CONTEXT_NOTICE,
+    SOURCE_FILE,
+    TEST_FILE,
+    classify_file,
+    estimate_tokens,
+    fit_diff_to_budget,
+    reduce_context,
+    stat_line,
+)
+from tgit.staged import StagedFile
+
+
+def _file_diff(path, added=3, context=20):
+    lines = [f"diff --git a/{path} b/{path}\n", f"--- a/{path}\n", f"+++ b/{path}\n", f"@@ -1,{context} +1,{context + added} @@\n"]
+    lines += [f" unchanged line {idx} of {path}\n" for idx in range(context)]
+    lines += [f"+added line {idx} of {path}\n" for idx in range(added)]
+    diff = "".join(lines)
+    return StagedFile(path, "M", added=added, deleted=0, patch=diff, patch_chars=len(diff)), diff
+
+
+class TestClassifyFile:
+    def test_paths(self):
+        kinds = {
+            "tgit/commit.py": SOURCE_FILE,
+            "README.md": SOURCE_FILE,
+            "tests/unit/test_commit.py": TEST_FILE,
+            "pkg/handler_test.go": TEST_FILE,
+            "web/src/app.spec.ts": TEST_FILE,
+            "conftest.py": TEST_FILE,
+            "dist/bundle.js": GENERATED_FILE,
+            "static/app.min.js": GENERATED_FILE,
+            "api/service_pb2.py": GENERATED_FILE,
+            "tests/__snapshots__/view.snap": GENERATED_FILE,
+        }
+
+        assert {path: classify_file(StagedFile(path, "M")) for path in kinds} == kinds
+
+    def test_generated_marker_in_patch(self):
+        staged_file = StagedFile("src/schema.py", "M", patch="diff --git a/src/schema.py b/src/schema.py\n+# @generated by protoc\n")
+
+        assert classify_file(staged_file) == GENERATED_FILE
+
+
+class TestFitDiffToBudget:
+    def test_fits_unchanged_in_priority_order(self):
+        diffs = [
+            _file_diff("tests/test_x.py", added=50),
+            _file_diff("dist/x.js", added=80),
+            _file_diff("x.py", added=5),
+            _file_diff("y.py", added=9),
+        ]
+
+        result = fit_diff_to_budget(diffs, 100_000)
+
+        order = [result.index(f"diff --git a/{path}") for path in ("y.py", "x.py", "tests/test_x.py", "dist/x.js")]
+        assert order == sorted(order)
+        assert result.count(" unchanged line") == 4 * 20
+
+    def test_degrades_lowest_priority_first(self):
+        diffs = [_file_diff(path) for path in ("a.py", "tests/test_a.py", "dist/a.js")]
+        full = sum(estimate_tokens(diff) for _, diff in diffs)
+
+        result = fit_diff_to_budget(diffs, full - 10)
+
+        assert "unchanged line 0 of a.py" in result
+        assert "unchanged line 0 of tests/test_a.py" in result
+        assert "unchanged line 0 of dist/a.js" not in result
+        assert "+added line 0 of dist/a.js" in result
+        assert REDUCED_CONTEXT_NOTICE in result
+
+    def test_reduces_context_before_stat_lines(self):
+        diffs = [_file_diff(path) for path in ("a.py", "b.py", "tests/test_a.py")]
+        reduced = sum(estimate_tokens(reduce_context(diff)) for _, diff in diffs)
+
+        result = fit_diff_to_budget(diffs, reduced)
+
+        assert " unchanged line" not in result
+        assert result.count(REDUCED_CONTEXT_NOTICE) == 3
+
+    def test_stat_lines_and_omitted_files(self):
+        diffs = [_file_diff(f"src/m{idx}.py", added=idx + 1) for idx in range(50)]
+        budget = 200
+
+        result = fit_diff_to_budget(diffs, budget)
+
+        assert estimate_tokens(result) <= budget
+        assert "diff --git" not in result
+        assert result.startswith(stat_line(diffs[-1][0]))
+        assert "more staged file(s) omitted" in result
+
+    def test_binary_and_renamed_stat_lines(self):
+        assert stat_line(StagedFile("logo.png", "A")) == "[INFO] Diff omitted for logo.png (A, binary)\n"
+        assert stat_line(StagedFile("new.py", "R090", "old.py", 2, 1)) == "[INFO] Diff omitted for old.py -> new.py (R, +2 -1)\n"
+
+    def test_never_exceeds_budget(self):
+        diffs = [_file_diff(f"src/m{idx}.py", added=idx % 7 + 1, context=idx % 30) for idx in range(40)]
+
+        for budget in (0, 5, 50, 500, 2_000, 5_000):
+            assert estimate_tokens(fit_diff_to_budget(diffs, budget)) <= budget
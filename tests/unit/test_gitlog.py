@@ -0,0 +1,138 @@
+"""Tests for the streaming git log reader."""
+
+from datetime import UTC, datetime
+from unittest.mock import patch
+
+import git
+import pytest
+
+from tgit.gitlog import CommitAuthor, CommitRecord, iter_commit_records, iter_merge_titles, parse_commit_record, parse_trailer_authors
+
+
+def _commit(repo, repo_path, message, content):
+    (repo_path / "test.txt").write_text(content)
+    repo.index.add(["test.txt"])
+    return repo.index.commit(message)
+
+
+class TestParseCommitRecord:
+    def test_parse_commit_record(self):
+        raw = "\x1f".join(
+            [
+                "a" * 40,
+                "aaaaaaa",
+                "b" * 40 + " " + "c" * 40,
+                "Jane",
+                "jane@example.com",
+                "2024-01-02T03:04:05+08:00",
+                "Bob <bob@example.com>\x1eno email",
+                "feat: x \x1f y",
+            ]
+        ).encode()
+
+        record = parse_commit_record(raw)
+
+        assert record == CommitRecord(
+            hexsha="a" * 40,
+            short_hash="aaaaaaa",
+            parents=("b" * 40, "c" * 40),
+            author=CommitAuthor("Jane", "jane@example.com"),
+            committed_datetime=datetime.fromisoformat("2024-01-02T03:04:05+08:00"),
+            subject="feat: x \x1f y",
+            co_authors=(CommitAuthor("Bob", "bob@example.com"),),
+        )
+
+    def test_parse_commit_record_root_commit(self):
+        raw = "\x1f".join(["a" * 40, "aaaaaaa", "", "Jane", "jane@example.com", "2024-01-02T03:04:05Z", "", "init"]).encode()
+
+        assert parse_commit_record(raw).parents == ()
+
+    def test_parse_trailer_authors(self):
+        assert parse_trailer_authors("") == ()
+        assert parse_trailer_authors(" A <a@x> \x1eB <b@x>") == (CommitAuthor("A", "a@x"), CommitAuthor("B", "b@x"))
+
+    def test_parse_commit_record_malformed(self):
+        with pytest.raises(ValueError, match="Unexpected git log record"):
+            parse_commit_record(b"not a record")
+
+
+class TestIterCommitRecords:
+    def test_records_match_gitpython(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        _commit(
+            repo, repo_path, "feat: first\n\nbody\n\nCo-authored-by: Jane <jane@example.com>\nco-authored-by: Bob <bob@example.com>", "1"
+        )
+        _commit(repo, repo_path, "fix(core): second", "2")
+
+        records = list(iter_commit_records(repo, "HEAD"))
+        commits = list(repo.iter_commits("HEAD"))
+
+        assert [r.hexsha for r in records] == [c.hexsha for c in commits]
+        assert records[0].co_authors == ()
+        assert records[1].co_authors == (CommitAuthor("Jane", "jane@example.com"), CommitAuthor("Bob", "bob@example.com"))
+        for record, commit in zip(records, commits, strict=True):
+            assert record.subject == commit.summary
+            assert record.author == CommitAuthor(commit.author.name, commit.author.email)
+            assert record.committed_datetime == commit.committed_datetime
+            assert record.parents == tuple(p.hexsha for p in commit.parents)
+            assert record.short_hash == repo.git.rev_parse(commit.hexsha, short=True)
+
+    def test_range_uses_single_process(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        for i in range(10):
+            _commit(repo, repo_path, f"feat: change {i}", str(i))
+
+        real_execute = git.cmd.Git.execute
+        with patch.object(git.cmd.Git, "execute", autospec=True, side_effect=real_execute) as mock_execute:
+            records = list(iter_commit_records(repo, "HEAD~5..HEAD"))
+
+        assert len(records) == 5
+        assert mock_execute.call_count == 1
+
+    def test_early_close_stops_git(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        for i in range(3):
+            _commit(repo, repo_path, f"feat: change {i}", str(i))
+
+        records = iter_commit_records(repo, "HEAD")
+        first = next(records)
+        records.close()
+
+        assert first.subject == "feat: change 2"
+
+    def test_name_only_adds_paths(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        (repo_path / "pkg").mkdir()
+        (repo_path / "pkg" / "a b.txt").write_text("a")
+        (repo_path / "test.txt").write_text("changed")
+        repo.index.add(["pkg/a b.txt", "test.txt"])
+        repo.index.commit("feat: two files")
+        repo.index.commit("chore: empty")
+
+        records = list(iter_commit_records(repo, "HEAD", name_only=True))
+
+        assert [r.subject for r in records] == ["chore: empty", "feat: two files", "Initial commit"]
+        assert [r.paths for r in records] == [(), ("pkg/a b.txt", "test.txt"), ("test.txt",)]
+        assert records[1] == next(iter_commit_records(repo, "HEAD~1", "-1"))._replace(paths=records[1].paths)
+
+    def test_bad_revision_raises(self, temp_git_repo):
+        _, repo = temp_git_repo
+
+        with pytest.raises(git.GitCommandError):
+            list(iter_commit_records(repo, "no-such-ref"))
+
+
+class TestIterMergeTitles:
+    def test_titles_from_merge_bodies(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        base = repo.head.commit
+        side = _commit(repo, repo_path, "fix: side", "side")
+        repo.head.reset(base, index=True, working_tree=True)
+        main = _commit(repo, repo_path, "feat: main", "main")
+        titled = repo.index.commit("Merge pull request #1 from a/b\n\n  feat: title\n\nmore", parent_commits=(main, side))
+        untitled = repo.index.commit("Merge branch 'x'", parent_commits=(titled, side))
+
+        titles = dict(iter_merge_titles(repo, "HEAD"))
+
+        assert titles == {titled.hexsha: "feat: title"}
+        assert untitled.hexsha not in titles
@@ -0,0 +1,144 @@
+"""Tests for the SQLite history index."""
+
+import sqlite3
+from contextlib import closing
+from unittest.mock import patch
+
+from tgit.changelog import get_commits, get_history_index, iter_changelogs_from_segments, prepare_changelog_segments
+from tgit.gitlog import iter_commit_records
+from tgit.history_index import INDEX_FILENAME, HistoryIndex, open_history_index
+
+
+def _commit(repo, repo_path, message):
+    (repo_path / "test.txt").write_text(message)
+    repo.index.add(["test.txt"])
+    return repo.index.commit(message)
+
+
+def _build_history(repo_path, repo):
+    _commit(repo, repo_path, "feat: one\n\nCo-authored-by: Jane <jane@example.com>")
+    _commit(repo, repo_path, "not conventional")
+    repo.create_tag("v0.1.0")
+    _commit(repo, repo_path, "fix(core)!: two")
+    repo.create_tag("v0.2.0")
+    _commit(repo, repo_path, "docs: three")
+
+
+def _indexed_count(path, sha):
+    with closing(sqlite3.connect(path)) as conn:
+        return conn.execute("SELECT COUNT(*) FROM commits WHERE sha = ?", (sha,)).fetchone()[0]
+
+
+def _facts(commits):
+    return [(c.hash, c.type, c.scope, c.description, c.breaking, c.date, [str(a) for a in c.authors]) for c in commits]
+
+
+class TestHistoryIndex:
+    def test_indexed_commits_match_git_log(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        _build_history(repo_path, repo)
+        first = repo.git.rev_list("--max-parents=0", "HEAD")
+        expected = get_commits(repo, first, "HEAD")
+
+        index = open_history_index(repo)
+
+        assert (repo_path / ".git" / INDEX_FILENAME).exists()
+        assert _facts(index.commits_in_range("HEAD", f"^{first}")) == _facts(expected)
+        assert "Jane <jane@example.com>" in _facts(index.commits_in_range("HEAD", f"^{first}"))[-1][-1]
+
+    def test_update_only_adds_new_commits(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        _build_history(repo_path, repo)
+        path = repo_path / ".git" / INDEX_FILENAME
+        index = HistoryIndex(repo, path)
+        assert index.update() == 5
+        assert index.update() == 0
+
+        _commit(repo, repo_path, "feat: four")
+        _commit(repo, repo_path, "feat: five")
+
+        with patch("tgit.history_index.iter_commit_records", wraps=iter_commit_records) as mock_iter:
+            assert index.update() == 2
+        assert mock_iter.call_args.args[2].startswith("^")
+
+    def test_rewritten_history_rebuilds(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        _build_history(repo_path, repo)
+        path = repo_path / ".git" / INDEX_FILENAME
+        index = HistoryIndex(repo, path)
+        index.update()
+        old_head = repo.head.commit.hexsha
+
+        repo.head.reset("HEAD~1", index=True, working_tree=True)
+        _commit(repo, repo_path, "feat: rewritten")
+        index.update()
+
+        assert _indexed_count(path, old_head) == 0
+        assert _indexed_count(path, repo.head.commit.hexsha) == 1
+
+    def test_schema_change_rebuilds(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        path = repo_path / ".git" / INDEX_FILENAME
+        HistoryIndex(repo, path).update()
+
+        with sqlite3.connect(path) as conn:
+            conn.execute("UPDATE meta SET value = '0' WHERE key = 'schema_version'")
+        conn.close()
+        HistoryIndex(repo, path)
+
+        assert _indexed_count(path, repo.head.commit.hexsha) == 0
+
+    def test_commits_outside_head_are_indexed_on_demand(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        base = repo.head.commit
+        main = repo.active_branch
+        side = repo.create_head("side", base)
+        side.checkout()
+        _commit(repo, repo_path, "feat: side only")
+        repo.create_tag("v-side")
+        main.checkout()
+        index = open_history_index(repo)
+
+        commits = index.commits_in_range("v-side", f"^{base.hexsha}")
+
+        assert [c.description for c in commits] == ["side only"]
+
+
+class TestIndexedChangelog:
+    def test_changelog_with_index_matches_without(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        _build_history(repo_path, repo)
+        segments = prepare_changelog_segments(repo, current_tag="v0.3.0")
+
+        plain = "".join(iter_changelogs_from_segments(repo, segments))
+        index = get_history_index(repo, enabled=True)
+        indexed = "".join(iter_changelogs_from_segments(repo, segments, index=index))
+        indexed_parallel = "".join(iter_changelogs_from_segments(repo, segments, jobs=2, index=index))
+
+        assert indexed == plain
+        assert indexed_parallel == plain
+
+    def test_get_commits_uses_index_when_enabled(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        _build_history(repo_path, repo)
+
+        with patch("tgit.changelog.settings.history_index", new=True), patch("tgit.changelog.iter_commit_records") as mock_iter:
+            commits = get_commits(repo, "v0.1.0", "HEAD")
+
+        mock_iter.assert_not_called()
+        assert [c.description for c in commits] == ["three", "two"]
+
+    def test_disabled_by_default(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+
+        with patch("tgit.changelog.settings.history_index", new=False):
+            assert get_history_index(repo) is None
+            get_commits(repo, "HEAD~0", "HEAD")
+
+        assert not (repo_path / ".git" / INDEX_FILENAME).exists()
+
+    def test_merges_traversal_never_uses_index(self, temp_git_repo):
+        _, repo = temp_git_repo
+
+        assert get_history_index(repo, enabled=True, traversal="merges") is None
+        assert get_history_index(repo, enabled=True, traversal="first-parent") is not None
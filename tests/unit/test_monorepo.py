@@ -0,0 +1,134 @@
+"""Tests for per-package changelogs."""
+
+from unittest.mock import patch
+
+import git
+import pytest
+from click.testing import CliRunner
+
+from tgit.changelog import ChangelogArgs, changelog, handle_changelog
+from tgit.monorepo import PackageTrie, detect_packages, handle_package_changelogs
+from tgit.repo_cache import clear_repo_cache
+
+
+def _commit(repo, repo_path, message, *paths):
+    for path in paths:
+        file_path = repo_path / path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(f"{message}\n")
+    repo.index.add(list(paths))
+    return repo.index.commit(message)
+
+
+def _build_monorepo(repo_path, repo):
+    _commit(repo, repo_path, "chore: packages", "packages/a/pyproject.toml", "packages/b/package.json", "pyproject.toml")
+    _commit(repo, repo_path, "feat(a): first a", "packages/a/src/x.py")
+    _commit(repo, repo_path, "fix(b): first b", "packages/b/index.js")
+    repo.create_tag("v0.1.0")
+    _commit(repo, repo_path, "feat: both", "packages/a/src/y.py", "packages/b/lib.js")
+    _commit(repo, repo_path, "docs: root only", "README.md")
+    repo.create_tag("v0.2.0")
+
+
+def _args(repo_path, **kwargs):
+    return ChangelogArgs(from_raw=None, to_raw=None, verbose=0, path=str(repo_path), per_package=True, **{"output": None, **kwargs})
+
+
+class TestPackageTrie:
+    def test_match_deepest_package(self):
+        trie = PackageTrie(["packages/a", "packages/a/plugins/p", "tools"])
+
+        assert trie.match("packages/a/src/x.py") == "packages/a"
+        assert trie.match("packages/a/plugins/p/main.py") == "packages/a/plugins/p"
+        assert trie.match("packages/a") == "packages/a"
+        assert trie.match("tools/run.sh") == "tools"
+
+    def test_match_outside_packages(self):
+        trie = PackageTrie(["packages/a"])
+
+        assert trie.match("README.md") is None
+        assert trie.match("packages/ab/file") is None
+        assert trie.match("packages") is None
+
+
+class TestPackageChangelogs:
+    def test_detect_packages_skips_root(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        _build_monorepo(repo_path, repo)
+
+        assert detect_packages(repo) == ["packages/a", "packages/b"]
+
+    def test_writes_changelog_per_package(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        _build_monorepo(repo_path, repo)
+
+        real_execute = git.cmd.Git.execute
+        with patch.object(git.cmd.Git, "execute", autospec=True, side_effect=real_execute) as mock_execute:
+            handle_package_changelogs(_args(repo_path))
+
+        history_walks = [call for call in mock_execute.call_args_list if "--name-only" in call.args[1]]
+        assert len(history_walks) == 1
+        a = (repo_path / "packages/a/CHANGELOG.md").read_text()
+        b = (repo_path / "packages/b/CHANGELOG.md").read_text()
+        assert a.index("## v0.2.0") < a.index("both") < a.index("## v0.1.0") < a.index("first a")
+        assert "first b" not in a
+        assert "root only" not in a
+        assert "first b" in b
+        assert "both" in b
+        assert "first a" not in b
+        assert not (repo_path / "CHANGELOG.md").exists()
+
+    def test_prepends_only_new_versions(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        _build_monorepo(repo_path, repo)
+        handle_package_changelogs(_args(repo_path))
+        before_b = (repo_path / "packages/b/CHANGELOG.md").read_text()
+        _commit(repo, repo_path, "fix(a): second a", "packages/a/src/z.py")
+        repo.create_tag("v0.3.0")
+        clear_repo_cache(repo)
+
+        handle_package_changelogs(_args(repo_path))
+
+        a = (repo_path / "packages/a/CHANGELOG.md").read_text()
+        assert a.startswith("## v0.3.0")
+        assert a.count("## v0.2.0") == 1
+        assert "second a" in a
+        assert (repo_path / "packages/b/CHANGELOG.md").read_text() == before_b
+
+    def test_output_name(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        _build_monorepo(repo_path, repo)
+
+        handle_package_changelogs(_args(repo_path, output="docs/CHANGES.md"))
+
+        assert (repo_path / "packages/a/CHANGES.md").exists()
+        assert not (repo_path / "packages/a/CHANGELOG.md").exists()
+
+    def test_handle_changelog_delegates(self, temp_git_repo):
+        repo_path, _ = temp_git_repo
+        args = _args(repo_path)
+
+        with patch("tgit.monorepo.handle_package_changelogs") as mock_handle:
+            handle_changelog(args, "v1.0.0")
+
+        mock_handle.assert_called_once_with(args, "v1.0.0")
+
+    @pytest.mark.parametrize(
+        ("options", "named"),
+        [
+            (["--format", "json"], "--format"),
+            (["--render", "plain"], "--render"),
+            (["--jobs", "4"], "--jobs"),
+            (["--no-index"], "--index/--no-index"),
+            (["--no-cache", "--format", "ndjson"], "--no-cache, --format"),
+        ],
+    )
+    def test_rejects_unsupported_options(self, temp_git_repo, options, named):
+        repo_path, _ = temp_git_repo
+
+        with patch("tgit.changelog.handle_changelog") as mock_handle:
+            result = CliRunner().invoke(changelog, [str(repo_path), "--per-package", *options])
+
+        assert result.exit_code == 2
+        assert f"--per-package cannot be combined with {named}" in result.output
+        mock_handle.assert_not_called()
@@ -0,0 +1,56 @@
+"""Tests for the incremental JSON object parser."""
+
+import json
+
+from tgit.partial_json import PartialObjectParser
+
+DOCUMENT = {
+    "type": "feat",
+    "scope": None,
+    "msg": 'add "quoted" café \\ path',
+    "is_breaking": False,
+    "secrets": [{"file": ".env", "description": "API key", "level": "error"}],
+}
+
+
+class TestPartialObjectParser:
+    def test_any_chunking_gives_the_whole_object(self):
+        text = json.dumps(DOCUMENT, indent=1)
+
+        for size in (1, 2, 3, 5, 8, 13, len(text)):
+            parser = PartialObjectParser()
+            fields = []
+            for start in range(0, len(text), size):
+                fields += parser.feed(text[start : start + size])
+
+            assert dict(fields) == DOCUMENT
+            assert [key for key, _ in fields] == list(DOCUMENT)
+
+    def test_container_and_string_fields_complete_at_their_closing_character(self):
+        parser = PartialObjectParser()
+
+        assert parser.feed('{"type": "fix", "secrets": [{"file": "a"}') == [("type", "fix")]
+        assert parser.feed("]") == [("secrets", [{"file": "a"}])]
+        assert parser.feed(', "is_breaking": true') == []
+        assert parser.feed("}") == [("is_breaking", True)]
+
+    def test_partial_string(self):
+        parser = PartialObjectParser()
+        parser.feed('{"type": "feat", "msg": "add caf')
+
+        assert parser.partial_string() == ("msg", "add caf")
+
+        parser.feed("\\u00")
+
+        assert parser.partial_string() == ("msg", "add caf")
+
+        parser.feed('e9 menu"')
+
+        assert parser.partial_string() is None
+        assert parser.fields["msg"] == "add café menu"
+
+    def test_no_partial_string_for_keys(self):
+        parser = PartialObjectParser()
+        parser.feed('{"ty')
+
+        assert parser.partial_string() is None
@@ -54,9 +54,33 @@ class TestSettings:
         result = runner.invoke(settings_command, ["invalid_key", "test"])
 
         assert result.exit_code == 1
-        available_keys = ["apiKey", "apiUrl", "model", "reasoning_effort", "show_command", "skip_confirm"]
+        available_keys = [
+            "apiKey",
+            "apiUrl",
+            "model",
+            "reasoning_effort",
+            "show_command",
+            "skip_confirm",
+            "history_index",
+            "diff_token_budget",
+            "stream",
+        ]
         mock_print.assert_called_once_with(f"Key invalid_key is not valid. Available keys: {', '.join(available_keys)}")
 
+    @patch("tgit.settings.set_global_settings")
+    @patch("tgit.settings.print")
+    def test_settings_diff_token_budget(self, mock_print, mock_set_global_settings):
+        runner = CliRunner()
+        result = runner.invoke(settings_command, ["diff_token_budget", "12000"])
+
+        assert result.exit_code == 0
+        mock_set_global_settings.assert_called_once_with("diff_token_budget", 12000)
+
+        result = runner.invoke(settings_command, ["diff_token_budget", "lots"])
+
+        assert result.exit_code == 1
+        mock_set_global_settings.assert_called_once()
+
     @patch("tgit.settings.set_global_settings")
     @patch("tgit.settings.print")
     def test_settings_valid_string_key(self, mock_print, mock_set_global_settings):
@@ -0,0 +1,169 @@
+"""Tests for the staged-change reader."""
+
+from unittest.mock import patch
+
+import git
+
+from tgit.staged import PatchLimits, StagedFile, parse_staged_diff, read_staged_changes
+
+
+def _stage(repo_path, repo, files):
+    for name, content in files.items():
+        (repo_path / name).write_bytes(content)
+    repo.index.add(list(files))
+
+
+class TestParseStagedDiff:
+    def test_empty_output(self):
+        assert parse_staged_diff("").files == ()
+
+    def test_rename_and_binary(self):
+        output = (
+            ":100644 100644 1111111 1111111 R100\0old name.txt\0new name.txt\0"
+            ":000000 100644 0000000 2222222 A\0image.png\0"
+            "0\t0\t\0old name.txt\0new name.txt\0"
+            "-\t-\timage.png\0"
+            "\0"
+            "diff --git a/old name.txt b/new name.txt\nsimilarity index 100%\n"
+            "diff --git a/image.png b/image.png\nBinary files /dev/null and b/image.png differ\n"
+        )
+
+        files = parse_staged_diff(output).files
+
+        rename_patch = "diff --git a/old name.txt b/new name.txt\nsimilarity index 100%\n"
+        assert files[0] == StagedFile("new name.txt", "R100", "old name.txt", 0, 0, rename_patch, None, len(rename_patch))
+        assert files[1].added is None
+        assert files[1].changed_lines == 0
+        assert files[1].patch.startswith("diff --git a/image.png")
+
+    def test_unmerged_entry_gets_its_own_section(self):
+        output = (
+            ":000000 000000 0000000 0000000 U\0a.txt\0:100644 100644 1111111 2222222 M\0b.txt\0"
+            "0\t0\ta.txt\0001\t0\tb.txt\0\0"
+            "* Unmerged path a.txt\ndiff --git a/b.txt b/b.txt\n+b\n"
+        )
+
+        files = parse_staged_diff(output).files
+
+        assert [f.patch for f in files] == ["* Unmerged path a.txt\n", "diff --git a/b.txt b/b.txt\n+b\n"]
+
+    def test_quoted_paths(self):
+        output = (
+            ":100644 100644 1111111 2222222 M\0é.txt\0:100644 100644 1111111 2222222 M\0z.txt\0"
+            "1\t0\té.txt\0001\t0\tz.txt\0\0"
+            'diff --git "a/\\303\\251.txt" "b/\\303\\251.txt"\n+e\ndiff --git a/z.txt b/z.txt\n+z\n'
+        )
+
+        files = parse_staged_diff(output).files
+
+        assert files[0].patch.endswith("+e\n")
+        assert files[1].patch == "diff --git a/z.txt b/z.txt\n+z\n"
+
+    def test_small_reads(self):
+        """Header fields, the separator and long lines may all straddle read boundaries."""
+        long_line = "+" + "é" * 50 + "\n"
+        output = (
+            ":100644 100644 1111111 2222222 M\0a.txt\0:100644 100644 1111111 2222222 M\0b.txt\0"
+            "1\t0\ta.txt\0001\t0\tb.txt\0\0"
+            f"diff --git a/a.txt b/a.txt\n{long_line}diff --git a/b.txt b/b.txt\n+diff --git not a header\n"
+        )
+
+        with patch("tgit.staged.READ_CHUNK_SIZE", 7):
+            files = parse_staged_diff(output).files
+
+        assert [f.path for f in files] == ["a.txt", "b.txt"]
+        assert files[0].patch == f"diff --git a/a.txt b/a.txt\n{long_line}"
+        assert files[1].patch == "diff --git a/b.txt b/b.txt\n+diff --git not a header\n"
+
+
+class TestPatchLimits:
+    LIMITS = PatchLimits(max_chars=100, max_lines=1_000, head_chars=30, tail_chars=20)
+
+    def _output(self, body):
+        return f":100644 100644 1111111 2222222 M\0big.txt\0001\t0\tbig.txt\0\0diff --git a/big.txt b/big.txt\n{body}"
+
+    def test_keeps_head_and_tail(self):
+        section = "diff --git a/big.txt b/big.txt\n" + "".join(f"+line {i}\n" for i in range(500))
+
+        staged_file = parse_staged_diff(self._output(section.split("\n", 1)[1]), self.LIMITS).files[0]
+
+        assert staged_file.patch == section[:30]
+        assert staged_file.patch_tail == section[-20:]
+        assert staged_file.patch_chars == len(section)
+
+    def test_small_patches_stay_whole(self):
+        section = "diff --git a/big.txt b/big.txt\n+short\n"
+
+        staged_file = parse_staged_diff(self._output("+short\n"), self.LIMITS).files[0]
+
+        assert staged_file.patch == section
+        assert staged_file.patch_tail is None
+
+    def test_many_short_lines_within_head_and_tail(self):
+        limits = PatchLimits(max_chars=1_000, max_lines=2, head_chars=30, tail_chars=40)
+
+        staged_file = parse_staged_diff(self._output("+a\n+b\n+c\n"), limits).files[0]
+
+        assert staged_file.patch_tail is None
+        assert staged_file.patch.endswith("+a\n+b\n+c\n")
+
+
+class TestReadStagedChanges:
+    def test_matches_separate_git_commands(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        _stage(repo_path, repo, {"keep.txt": b"line\n" * 20, "uv.lock": b"lock\n"})
+        repo.index.commit("base")
+        repo.index.move(["keep.txt", "moved.txt"])
+        _stage(repo_path, repo, {"test.txt": b"changed\n", "blob.bin": b"\x00\x01\x02", "uv.lock": b"lock2\n"})
+
+        real_execute = git.cmd.Git.execute
+        with patch.object(git.cmd.Git, "execute", autospec=True, side_effect=real_execute) as mock_execute:
+            staged = read_staged_changes(repo)
+
+        assert mock_execute.call_count == 1
+        assert mock_execute.call_args.kwargs["as_process"] is True
+        by_path = {f.path: f for f in staged.files}
+        assert by_path["moved.txt"].old_path == "keep.txt"
+        assert by_path["moved.txt"].status.startswith("R")
+        assert by_path["blob.bin"].added is None
+        assert by_path["uv.lock"].is_lock_file
+        assert by_path["test.txt"].changed_lines == 2
+        assert set(by_path) == {"moved.txt", "test.txt", "blob.bin", "uv.lock"}
+        assert "".join(f.patch for f in staged.files) == repo.git.diff("--cached", "-M") + "\n"
+
+    def test_type_change_keeps_later_patches_aligned(self, temp_git_repo):
+        """A symlink replaced by a file is one T entry but two patch sections; later files keep their own patch."""
+        repo_path, repo = temp_git_repo
+        _stage(repo_path, repo, {"target.txt": b"target\n", "later.txt": b"old\n"})
+        (repo_path / "link").symlink_to("target.txt")
+        repo.index.add(["link"])
+        repo.index.commit("base")
+        (repo_path / "link").unlink()
+        _stage(repo_path, repo, {"link": b"real file\n", "later.txt": b"new\n"})
+
+        staged = read_staged_changes(repo)
+
+        by_path = {f.path: f for f in staged.files}
+        assert by_path["link"].status == "T"
+        assert by_path["link"].patch.count("diff --git a/link b/link") == 2
+        assert "+real file" in by_path["link"].patch
+        assert by_path["later.txt"].patch.startswith("diff --git a/later.txt b/later.txt")
+        assert "+new" in by_path["later.txt"].patch
+
+    def test_ignores_configured_prefixes(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        repo.config_writer().set_value("diff", "noprefix", "true").release()
+        _stage(repo_path, repo, {"test.txt": b"changed\n"})
+
+        staged = read_staged_changes(repo)
+
+        assert staged.files[0].patch.startswith("diff --git a/test.txt b/test.txt")
+
+    def test_ignores_external_diff_drivers(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        repo.config_writer().set_value("diff", "external", "false").release()
+        _stage(repo_path, repo, {"test.txt": b"changed\n"})
+
+        staged = read_staged_changes(repo)
+
+        assert staged.files[0].patch.startswith("diff --git a/test.txt b/test.txt")
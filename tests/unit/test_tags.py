@@ -0,0 +1,116 @@
+"""Tests for the for-each-ref tag index."""
+
+from datetime import UTC, datetime
+from unittest.mock import patch
+
+import git
+
+from tgit.repo_cache import clear_repo_cache
+from tgit.tags import TagIndex, TagInfo, build_tag_index, get_tag_index, parse_tag_line, semver_key
+
+
+def _commit(repo, repo_path, message, date):
+    (repo_path / "test.txt").write_text(message)
+    repo.index.add(["test.txt"])
+    return repo.index.commit(message, author_date=date, commit_date=date)
+
+
+class TestSemverKey:
+    def test_orders_by_semver_precedence(self):
+        names = [
+            "v1.0.0",
+            "v1.0.0-rc.1",
+            "v1.0.0-alpha",
+            "v1.0.0-alpha.1",
+            "v1.0.0-alpha.beta",
+            "v1.0.0-beta.11",
+            "v1.0.0-beta.2",
+            "v0.9.10",
+        ]
+
+        assert sorted(names, key=semver_key) == [
+            "v0.9.10",
+            "v1.0.0-alpha",
+            "v1.0.0-alpha.1",
+            "v1.0.0-alpha.beta",
+            "v1.0.0-beta.2",
+            "v1.0.0-beta.11",
+            "v1.0.0-rc.1",
+            "v1.0.0",
+        ]
+
+    def test_non_semver_names(self):
+        assert semver_key("release-2024") is None
+        assert semver_key("v1.2") is None
+        assert semver_key("1.2.3") == semver_key("v1.2.3")
+
+
+class TestParseTagLine:
+    def test_skips_tags_that_do_not_point_at_commits(self):
+        assert parse_tag_line("\x1f".join(["tree-tag", "tree", "a" * 40, "", "", "", "", ""])) is None
+        assert parse_tag_line("garbage") is None
+
+
+class TestTagIndex:
+    def test_matches_gitpython_tags(self, temp_git_repo):
+        repo_path, repo = temp_git_repo
+        _commit(repo, repo_path, "feat: one", "1704067200 +0000")
+        repo.create_tag("v0.10.0")
+        _commit(repo, repo_path, "feat: two", "1706745600 +0000")
+        repo.create_tag("v0.9.0", message="annotated")
+        repo.create_tag("nightly")
+        repo.create_tag("tree-tag", ref=repo.head.commit.tree.hexsha)
+
+        index = build_tag_index(repo)
+
+        expected = sorted((t for t in repo.tags if t.name != "tree-tag"), key=lambda t: t.commit.committed_datetime)
+        assert [tag.name for tag in index.by_date] == [t.name for t in expected]
+        assert [tag.sha for tag in index.by_date] == [t.commit.hexsha for t in expected]
+        assert index["v0.9.0"].tagger_datetime is not None
+        assert index["v0.10.0"].tagger_datetime is None
+        assert index["v0.10.0"].committed_datetime == datetime(2024, 1, 1, tzinfo=UTC)
+        assert [tag.name for tag in index.by_semver] == ["v0.9.0", "v0.10.0"]
+        assert "tree-tag" not in index
+
+    def test_empty_repository_tags(self, temp_git_repo):
+        _, repo = temp_git_repo
+
+        index = build_tag_index(repo)
+
+        assert len(index) == 0
+        assert index.latest is None
+
+    def test_latest_and_get(self):
+        index = TagIndex(
+            [
+                TagInfo("v2.0.0", "b" * 40, datetime(2024, 2, 1, tzinfo=UTC), None, semver_key("v2.0.0")),
+                TagInfo("v1.0.0", "a" * 40, datetime(2024, 1, 1, tzinfo=UTC), None, semver_key("v1.0.0")),
+            ]
+        )
+
+        assert index.latest.name == "v2.0.0"
+        assert index.get("v1.0.0").sha == "a" * 40
+        assert index.get("missing") is None
+
+
+class TestGetTagIndex:
+    def test_memoised_per_repo(self, temp_git_repo):
+        _, repo = temp_git_repo
+        repo.create_tag("v1.0.0")
+
+        real_execute = git.cmd.Git.execute
+        with patch.object(git.cmd.Git, "execute", autospec=True, side_effect=real_execute) as mock_execute:
+            first = get_tag_index(repo)
+            second = get_tag_index(git.Repo(repo.working_dir))
+
+        assert first is second
+        assert mock_execute.call_count == 1
+
+    def test_clear_repo_cache_rebuilds(self, temp_git_repo):
+        _, repo = temp_git_repo
+        assert len(get_tag_index(repo)) == 0
+        repo.create_tag("v1.0.0")
+
+        clear_repo_cache(repo)
+
+        assert [tag.name for tag in get_tag_index(repo).by_date] == ["v1.0.0"]
@@ -4,13 +4,13 @@ from unittest.mock import patch, MagicMock
 import subprocess
 import sys
 
-from tgit.utils import run_command, simple_run_command, get_commit_command, type_emojis, load_workspace_settings
+from tgit.utils import run_command, simple_run_command, get_commit_command, type_emojis, load_workspace_settings, write_cache_file
 from tgit.types import TGitSettings, CommitSettings
 
 
 class TestRunCommand:
     @patch("tgit.utils.subprocess.Popen")
-    @patch("tgit.utils.questionary.confirm")
+    @patch("questionary.confirm")
     def test_run_command_user_confirms(self, mock_confirm, mock_popen):
         """Test run_command when user confirms execution."""
         # Arrange
@@ -30,7 +30,7 @@ class TestRunCommand:
         mock_popen.assert_called_once()
 
     @patch("tgit.utils.subprocess.Popen")
-    @patch("tgit.utils.questionary.confirm")
+    @patch("questionary.confirm")
     def test_run_command_user_cancels(self, mock_confirm, mock_popen):
         """Test run_command when user cancels execution."""
         # Arrange
@@ -47,7 +47,7 @@ class TestRunCommand:
         mock_popen.assert_not_called()
 
     @patch("tgit.utils.subprocess.Popen")
-    @patch("tgit.utils.questionary.confirm")
+    @patch("questionary.confirm")
     def test_run_command_skip_confirm(self, mock_confirm, mock_popen):
         """Test run_command when skip_confirm is True."""
         # Arrange
@@ -67,7 +67,7 @@ class TestRunCommand:
 
     @patch("tgit.utils.console.print")
     @patch("tgit.utils.subprocess.Popen")
-    @patch("tgit.utils.questionary.confirm")
+    @patch("questionary.confirm")
     def test_run_command_show_command(self, mock_confirm, mock_popen, mock_console_print):
         """Test run_command when show_command is True."""
         # Arrange
@@ -88,7 +88,7 @@ class TestRunCommand:
         mock_popen.assert_called_once()
 
     @patch("tgit.utils.subprocess.Popen")
-    @patch("tgit.utils.questionary.confirm")
+    @patch("questionary.confirm")
     @patch("tgit.utils.sys.stderr.write")
     def test_run_command_error_handling(self, mock_stderr_write, mock_confirm, mock_popen):
         """Test run_command error handling."""
@@ -108,7 +108,7 @@ class TestRunCommand:
         mock_stderr_write.assert_called_once_with("error message")
 
     @patch("tgit.utils.subprocess.Popen")
-    @patch("tgit.utils.questionary.confirm")
+    @patch("questionary.confirm")
     def test_run_command_multiple_commands(self, mock_confirm, mock_popen):
         """Test run_command with multiple commands."""
         # Arrange
@@ -245,6 +245,26 @@ class TestTypeEmojis:
             assert type_emojis[commit_type].endswith(":")
 
 
+class TestWriteCacheFile:
+    def test_writes_json_and_creates_directory(self, tmp_path):
+        path = tmp_path / "cache" / "entry.json"
+
+        assert write_cache_file(path, {"msg": "café"}) is True
+
+        assert json.loads(path.read_text(encoding="utf-8")) == {"msg": "café"}
+        assert list(path.parent.iterdir()) == [path]
+
+    def test_failed_write_keeps_old_entry_and_leaves_no_temp_file(self, tmp_path):
+        path = tmp_path / "entry.json"
+        write_cache_file(path, {"msg": "old"})
+
+        with patch("tgit.utils.json.dump", side_effect=OSError("disk full")):
+            assert write_cache_file(path, {"msg": "new"}) is False
+
+        assert json.loads(path.read_text(encoding="utf-8")) == {"msg": "old"}
+        assert list(tmp_path.iterdir()) == [path]
+
+
 class TestSettingsFileHandling:
     """Test settings file loading and error handling."""
 
@@ -799,6 +799,7 @@ class TestNewVersionFunctions:
         """Test get_next_version with interactive selection."""
         args = Mock()
         args.path = "/fake/path"
+        args.traversal = "first-parent"
         prev_version = Version(major=1, minor=2, patch=3)
 
         mock_has_explicit.return_value = False
@@ -810,7 +811,7 @@ class TestNewVersionFunctions:
 
         assert result == expected_version
         mock_has_explicit.assert_called_once_with(args)
-        mock_get_default_bump.assert_called_once_with("/fake/path", prev_version, 0)
+        mock_get_default_bump.assert_called_once_with("/fake/path", prev_version, 0, "first-parent")
         mock_handle_interactive.assert_called_once_with(prev_version, "patch", 0)
 
     def test_get_next_version_none_prev_version(self):
@@ -3,6 +3,7 @@ from pathlib import Path
 from unittest.mock import Mock, patch
 
 import pytest
+from tgit.changelog import ChangelogArgs
 from tgit.version import (
     Version,
     VersionArgs,
@@ -161,6 +162,9 @@ version = "invalid"
         call_args = mock_changelog.call_args
         assert call_args[0][0].output == "CHANGELOG.md"
         assert call_args[1]["current_tag"] == "v1.1.0"
+        # handle_changelog reads every ChangelogArgs option, so a bare Namespace is not enough
+        assert isinstance(call_args[0][0], ChangelogArgs)
+        assert call_args[0][0].no_cache is False
 
     def test_get_version_from_files_gradle(self, tmp_path):
         """Test get_version_from_files with build.gradle.kts."""
@@ -1,10 +1,23 @@
 import contextlib
+import functools
+import json
 import logging
+import os
 import re
+import shutil
+import sys
+import tempfile
+import threading
 import warnings
-from collections import defaultdict
+from abc import ABC, abstractmethod
+from collections import Counter, defaultdict, deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, TextIO, TypeVar
 
 import click
 import git
@@ -12,12 +25,35 @@ from markdown_it.token import Token
 from rich import print
 from rich.console import Console, ConsoleOptions, RenderResult
 from rich.markdown import Markdown, MarkdownContext, TextElement
-from rich.progress import Progress
+from rich.progress import Progress, TaskID, TaskProgressColumn
 from rich.text import Text
 
+from tgit.changelog_cache import CACHE_DIR, ChangelogCache
+from tgit.gitlog import CommitRecord, iter_commit_parents, iter_commit_records, iter_merge_titles
+from tgit.repo_cache import repo_cached
+from tgit.shared import settings
+from tgit.tags import get_tag_index
 from tgit.utils import console
 
+if TYPE_CHECKING:
+    from tgit.history_index import HistoryIndex
+
 logger = logging.getLogger("tgit")
+T = TypeVar("T")
+
+# Bump whenever generate_changelog renders differently, so cached segments are regenerated.
+CHANGELOG_TEMPLATE_VERSION = 3
+# Distinct (name, email) pairs kept interned; far more than the contributors of most repositories.
+AUTHOR_CACHE_SIZE = 8192
+# Block size used to copy the existing changelog when prepending.
+PREPEND_COPY_CHUNK_SIZE = 1024 * 1024
+RENDER_MODES = ("rich", "plain", "none")
+OUTPUT_FORMATS = ("markdown", "ndjson", "json")
+# all: every commit of a version; first-parent: only the main line; merges: the main line, with merge
+# commits entered under the pull request title from their body instead of walking the merged branches.
+TRAVERSALS = ("all", "first-parent", "merges")
+# 排除的 ^ref 也只沿第一父提交，主线上的提交不会因为被旧 tag 经由 merge 包含而消失
+FIRST_PARENT_ARGS = ("--first-parent", "--exclude-first-parent-only")
 
 
 @dataclass
@@ -80,7 +116,7 @@ def get_latest_git_tag(repo: git.Repo) -> str | None:
 
 def get_tag_by_idx(repo: git.Repo, idx: int) -> str | None:
     try:
-        if tags := sorted(repo.tags, key=lambda t: t.commit.committed_datetime):
+        if tags := get_tag_index(repo).by_date:
             return tags[idx].name
         return None
     except Exception:
@@ -88,16 +124,30 @@ def get_tag_by_idx(repo: git.Repo, idx: int) -> str | None:
         return None
 
 
+def get_root_commits(repo: git.Repo) -> list[str]:
+    """Root commits reachable from HEAD, oldest first with ties broken by hash, cached per repo."""
+
+    def find_roots() -> list[str]:
+        try:
+            output = repo.git.log("--max-parents=0", "--format=%ct %H", "HEAD")
+        except git.GitCommandError:
+            # 空仓库没有 HEAD
+            return []
+        roots = [(int(timestamp), sha) for timestamp, sha in (line.split() for line in output.splitlines())]
+        return [sha for _, sha in sorted(roots)]
+
+    return repo_cached(repo, "root_commits", find_roots)
+
+
 def get_first_commit_hash(repo: git.Repo) -> str:
-    return next(
-        (commit.hexsha for commit in repo.iter_commits() if not commit.parents),
-        "",
-    )
+    # 有多个根提交时（例如 subtree 合并）取最早的那个
+    roots = get_root_commits(repo)
+    return roots[0] if roots else ""
 
 
 def get_commit_hash_from_tag(repo: git.Repo, tag: str) -> str | None:
     try:
-        return repo.tags[tag].commit.hexsha
+        return get_tag_index(repo)[tag].sha
     except Exception:
         logger.exception("Can't find tag %s", tag)
         return None
@@ -109,12 +159,44 @@ def get_commit_hash_from_tag(repo: git.Repo, tag: str) -> str | None:
 @click.option("-t", "--to", "to_raw", help="To hash/tag")
 @click.option("-v", "--verbose", count=True, help="increase output verbosity")
 @click.option("-o", "--output", help="output file")
-def changelog(
+@click.option("--no-cache", is_flag=True, help="regenerate released versions instead of reading .tgit/cache")
+@click.option("--index/--no-index", default=None, help="read commit facts from the .git/tgit-index.sqlite history index")
+@click.option("-j", "--jobs", type=click.IntRange(min=1), default=1, show_default=True, help="number of versions to generate in parallel")
+@click.option("--first-parent", "traversal", flag_value="first-parent", help="only follow the first parent of merge commits")
+@click.option(
+    "--merges-as-entries",
+    "traversal",
+    flag_value="merges",
+    help="follow the first parent and list merged pull requests by their title instead of their commits",
+)
+@click.option("--per-package", is_flag=True, help="write a changelog into every package directory that has a version file")
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(OUTPUT_FORMATS),
+    default="markdown",
+    show_default=True,
+    help="markdown, or one JSON record per version and commit (ndjson) or a JSON array of versions (json)",
+)
+@click.option(
+    "--render",
+    type=click.Choice(RENDER_MODES),
+    help="how to print the changelog: rich markdown, plain text or not at all (default: rich on a terminal)",
+)
+def changelog(  # noqa: PLR0913
     path: str,
     from_raw: str | None,
     to_raw: str | None,
     verbose: int,
     output: str | None,
+    *,
+    no_cache: bool,
+    jobs: int,
+    index: bool | None,
+    render: str | None,
+    traversal: str | None,
+    per_package: bool,
+    output_format: str,
 ) -> None:
     """
     Generate a changelog from git commit history.
@@ -123,6 +205,11 @@ def changelog(
     You can specify a range of commits using tags or hashes, or generate changelogs for all unreleased changes.
     The output can be printed to the console or saved to a file.
     """
+    if per_package:
+        conflicts = _per_package_conflicts(no_cache=no_cache, jobs=jobs, index=index, render=render, output_format=output_format)
+        if conflicts:
+            msg = f"--per-package cannot be combined with {', '.join(conflicts)}"
+            raise click.UsageError(msg)
     # Handle the output parameter like argparse const behavior
     output_value = None if output is None else output or "CHANGELOG.md"
 
@@ -132,10 +219,29 @@ def changelog(
         to_raw=to_raw,
         verbose=verbose,
         output=output_value,
+        no_cache=no_cache,
+        jobs=jobs,
+        index=index,
+        render=render,
+        traversal=traversal or "all",
+        per_package=per_package,
+        output_format=output_format,
     )
     handle_changelog(args)
 
 
+def _per_package_conflicts(*, no_cache: bool, jobs: int, index: bool | None, render: str | None, output_format: str) -> list[str]:
+    """Options given together with --per-package that it does not support."""
+    used = (
+        ("--no-cache", no_cache),
+        ("--index/--no-index", index is not None),
+        ("--jobs", jobs != 1),
+        ("--format", output_format != "markdown"),
+        ("--render", render is not None),
+    )
+    return [option for option, given in used if given]
+
+
 @dataclass
 class ChangelogArgs:
     from_raw: str | None
@@ -143,6 +249,13 @@ class ChangelogArgs:
     verbose: int
     path: str
     output: str | None
+    no_cache: bool = False
+    jobs: int = 1
+    index: bool | None = None
+    render: str | None = None
+    traversal: str = "all"
+    per_package: bool = False
+    output_format: str = "markdown"
 
 
 def get_simple_hash(repo: git.Repo, git_hash: str, length: int = 7) -> str | None:
@@ -167,6 +280,15 @@ commit_pattern = re.compile(
 )
 
 
+def parse_commit_subject(subject: str) -> dict[str, str] | None:
+    """Type, scope, breaking mark and description of a conventional commit subject, or None for other subjects."""
+    # 不含 ": " 的标题不可能匹配，跳过代价较高的正则
+    if ": " not in subject:
+        return None
+    m = commit_pattern.match(subject)
+    return m.groupdict() if m else None
+
+
 def resolve_from_ref(repo: git.Repo, from_raw: str | None) -> str:
     if from_raw is not None and from_raw:
         return from_raw
@@ -176,7 +298,7 @@ def resolve_from_ref(repo: git.Repo, from_raw: str | None) -> str:
     return last_tag
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Author:
     name: str
     email: str
@@ -185,27 +307,60 @@ class Author:
         return f"{self.name} <{self.email}>"
 
 
+@functools.lru_cache(maxsize=AUTHOR_CACHE_SIZE)
+def intern_author(name: str, email: str) -> Author:
+    """The shared Author for (name, email), so a contributor of thousands of commits is stored once."""
+    return Author(name, email)
+
+
+@functools.lru_cache(maxsize=AUTHOR_CACHE_SIZE)
+def intern_authors(authors: tuple[tuple[str, str], ...]) -> tuple[Author, ...]:
+    """The shared tuple of interned authors for a commit's (name, email) pairs."""
+    return tuple(intern_author(name, email) for name, email in authors)
+
+
+def _intern_optional(value: str | None) -> str | None:
+    return None if value is None else sys.intern(value)
+
+
 class TGITCommit:
-    def __init__(self, repo: git.Repo, commit: git.Commit, message_dict: dict[str, str]) -> None:
-        commit_date = commit.committed_datetime
-
-        message = commit.message
-        if isinstance(message, bytes):
-            message = message.decode()
-        elif not isinstance(message, str):
-            message = str(message)
-        co_author_raws = [line for line in message.split("\n") if line.lower().startswith("co-authored-by:")]
-        co_author_pattern = re.compile(r"Co-authored-by: (?P<name>.+?) <(?P<email>.+?)>", re.IGNORECASE)
-        co_authors = [match.groupdict() for co_author in co_author_raws if (match := co_author_pattern.match(co_author))]
-        authors = [{"name": commit.author.name, "email": commit.author.email}, *co_authors]
-        self.authors: list[Author] = [Author(**kwargs) for kwargs in authors]
-        self.date = commit_date
-        self.emoji = message_dict.get("emoji")
-        self.type = message_dict.get("type")
-        self.scope = message_dict.get("scope")
-        self.description = message_dict.get("description")
+    """One conventional commit; slotted, with interned authors and type/scope strings, as histories can be large."""
+
+    __slots__ = ("authors", "breaking", "date", "description", "emoji", "hash", "scope", "type")
+
+    def __init__(
+        self,
+        short_hash: str,
+        date: datetime,
+        authors: tuple[Author, ...],
+        message_dict: dict[str, Any],
+    ) -> None:
+        self.authors = authors
+        self.date = date
+        self.emoji = _intern_optional(message_dict.get("emoji"))
+        self.type = _intern_optional(message_dict.get("type"))
+        self.scope = _intern_optional(message_dict.get("scope"))
+        self.description: str | None = message_dict.get("description")
         self.breaking = bool(message_dict.get("breaking"))
-        self.hash = repo.git.rev_parse(commit.hexsha, short=7)
+        self.hash = short_hash
+
+    @classmethod
+    def from_record(cls, record: CommitRecord, message_dict: dict[str, Any]) -> "TGITCommit":
+        """Build a commit from a `git log` record, whose co-authors were already read from the trailers."""
+        authors = intern_authors((record.author, *record.co_authors))
+        return cls(record.short_hash, record.committed_datetime, authors, message_dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "hash": self.hash,
+            "type": self.type,
+            "scope": self.scope,
+            "description": self.description,
+            "breaking": self.breaking,
+            "emoji": self.emoji,
+            "date": self.date.isoformat(),
+            "authors": [{"name": author.name, "email": author.email} for author in self.authors],
+        }
 
     def __str__(self) -> str:
         authors_str = ", ".join(str(author) for author in self.authors)
@@ -252,22 +407,60 @@ def get_remote_uri(url: str) -> str | None:
     return None
 
 
-def get_commits(repo: git.Repo, from_hash: str, to_hash: str) -> list[TGITCommit]:
-    raw_commits = list(repo.iter_commits(f"{from_hash}...{to_hash}"))
-    tgit_commits = []
-    for commit in raw_commits:
-        message = commit.message
-        if isinstance(message, bytes):
-            message = message.decode()
-        elif not isinstance(message, str):
-            message = str(message)
-        if m := commit_pattern.match(message):
-            message_dict = m.groupdict()
-            tgit_commits.append(TGITCommit(repo, commit, message_dict))
-    return tgit_commits
+def iter_tgit_commits(records: Iterable[CommitRecord]) -> Iterator[TGITCommit]:
+    """Yield a TGITCommit for every record whose subject follows the conventional commit format."""
+    for record in records:
+        if (message_dict := parse_commit_subject(record.subject)) is not None:
+            yield TGITCommit.from_record(record, message_dict)
+
+
+def get_history_index(repo: git.Repo, *, enabled: bool | None = None, traversal: str = "all") -> "HistoryIndex | None":
+    """
+    The SQLite history index when enabled by `enabled` or, if that is None, by the `history_index` setting.
+
+    Always None for the merges traversal: the index only stores commit subjects, and the PR titles of merge
+    commits have to be read from git.
+    """
+    if traversal == "merges" or not (settings.history_index if enabled is None else enabled):
+        return None
+    from tgit.history_index import open_history_index  # noqa: PLC0415
+
+    return open_history_index(repo)
+
+
+def segment_rev_args(repo: git.Repo, segment: VersionSegment) -> tuple[str, ...]:
+    """
+    The revisions of one segment: commits reachable from `to_hash` but neither from `from_hash` nor from an older tag.
+
+    Every way of listing a segment uses this rule, so a commit is always listed once, under the oldest
+    release that contains it, whether the segments are walked together, one by one or from the index.
+    """
+    older = get_tag_index(repo).older_than(segment.from_name)
+    return (segment.to_hash, f"^{segment.from_hash}", *(f"^{tag.sha}" for tag in older))
+
+
+def iter_traversal_records(repo: git.Repo, traversal: str, *rev_args: str, name_only: bool = False) -> Iterator[CommitRecord]:
+    """Commit records for `rev_args` walked according to `traversal`, see TRAVERSALS; `name_only` adds the touched paths."""
+    if traversal == "all":
+        yield from iter_commit_records(repo, *rev_args, name_only=name_only)
+        return
+    # --first-parent 同时让 merge 提交列出相对第一个父提交改动的文件
+    rev_args = (*FIRST_PARENT_ARGS, *rev_args)
+    titles = dict(iter_merge_titles(repo, *rev_args)) if traversal == "merges" else {}
+    for record in iter_commit_records(repo, *rev_args, name_only=name_only):
+        if (title := titles.get(record.hexsha)) is not None:
+            record = record._replace(subject=title)  # noqa: PLW2901
+        yield record
+
+
+def get_commits(repo: git.Repo, from_hash: str, to_hash: str, traversal: str = "all") -> list[TGITCommit]:
+    rev_args = (to_hash, f"^{from_hash}")
+    if (index := get_history_index(repo, traversal=traversal)) is not None:
+        return index.commits_in_range(*rev_args, first_parent=traversal == "first-parent")
+    return list(iter_tgit_commits(iter_traversal_records(repo, traversal, *rev_args)))
 
 
-def group_commits_by_type(commits: list[TGITCommit]) -> dict[str, list[TGITCommit]]:
+def group_commits_by_type(commits: Iterable[TGITCommit]) -> dict[str, list[TGITCommit]]:
     commits_by_type = defaultdict[str, list[TGITCommit]](list[TGITCommit])
     for commit in commits:
         if commit.breaking:
@@ -277,47 +470,57 @@ def group_commits_by_type(commits: list[TGITCommit]) -> dict[str, list[TGITCommi
     return commits_by_type
 
 
-def generate_changelog(commits_by_type: dict[str, list[TGITCommit]], from_ref: str, to_ref: str, remote_uri: str | None = None) -> str:
-    order = ["breaking", "feat", "fix", "refactor", "perf", "style", "docs", "test", "ci", "chore"]
-    names = [
-        ":rocket: Breaking Changes",
-        ":sparkles: Features",
-        ":adhesive_bandage: Fixes",
-        ":art: Refactors",
-        ":zap: Performance Improvements",
-        ":lipstick: Styles",
-        ":memo: Documentation",
-        ":test_tube: Tests",
-        ":construction_worker: CI",
-        ":wrench: Chores",
-    ]
-    out_str = ""
-    out_str = f"## {to_ref}\n\n"
+CHANGELOG_SECTIONS = (
+    ("breaking", ":rocket: Breaking Changes"),
+    ("feat", ":sparkles: Features"),
+    ("fix", ":adhesive_bandage: Fixes"),
+    ("refactor", ":art: Refactors"),
+    ("perf", ":zap: Performance Improvements"),
+    ("style", ":lipstick: Styles"),
+    ("docs", ":memo: Documentation"),
+    ("test", ":test_tube: Tests"),
+    ("ci", ":construction_worker: CI"),
+    ("chore", ":wrench: Chores"),
+)
+
+
+def iter_changelog_lines(
+    commits_by_type: dict[str, list[TGITCommit]],
+    from_ref: str,
+    to_ref: str,
+    remote_uri: str | None = None,
+) -> Iterator[str]:
+    """Yield the markdown for one version line by line, each line ending in a newline."""
+    yield f"## {to_ref}\n"
+    yield "\n"
     if remote_uri:
-        out_str += f"[{from_ref}...{to_ref}](https://{remote_uri}/compare/{from_ref}...{to_ref})\n\n"
+        yield f"[{from_ref}...{to_ref}](https://{remote_uri}/compare/{from_ref}...{to_ref})\n"
     else:
-        out_str += f"{from_ref}...{to_ref}\n\n"
+        yield f"{from_ref}...{to_ref}\n"
+    yield "\n"
 
     def get_hash_link(commit: TGITCommit) -> str:
         if remote_uri:
             return f"[{commit.hash}](https://{remote_uri}/commit/{commit.hash})"
         return commit.hash
 
-    for i, o in enumerate(order):
-        if commits := commits_by_type.get(o):
-            title = f"### {names[i]}\n\n"
-            out_str += title
+    for commit_type, name in CHANGELOG_SECTIONS:
+        if commits := commits_by_type.get(commit_type):
+            yield f"### {name}\n"
+            yield "\n"
             # Sort commits by scope, if scope is None, put it to last
             commits.sort(key=lambda c: c.scope or "zzzzz")
             for commit in commits:
                 authors_str = format_names([f"[{a.name}](mailto:{a.email})" for a in commit.authors])
                 if commit.scope:
-                    line = f"- **{commit.scope}**: {commit.description} - {authors_str} in {get_hash_link(commit)}\n"
+                    yield f"- **{commit.scope}**: {commit.description} - {authors_str} in {get_hash_link(commit)}\n"
                 else:
-                    line = f"- {commit.description} - {authors_str} in {get_hash_link(commit)}\n"
-                out_str += line
-            out_str += "\n"
-    return out_str
+                    yield f"- {commit.description} - {authors_str} in {get_hash_link(commit)}\n"
+            yield "\n"
+
+
+def generate_changelog(commits_by_type: dict[str, list[TGITCommit]], from_ref: str, to_ref: str, remote_uri: str | None = None) -> str:
+    return "".join(iter_changelog_lines(commits_by_type, from_ref, to_ref, remote_uri))
 
 
 def extract_latest_tag_from_changelog(filepath: str) -> str | None:
@@ -334,13 +537,13 @@ def prepare_changelog_segments(
     latest_tag_in_file: str | None = None,
     current_tag: str | None = None,
 ) -> list[VersionSegment]:
-    tags = sorted(repo.tags, key=lambda t: t.commit.committed_datetime)
+    tags = get_tag_index(repo).by_date
     if not tags:
         print("[yellow]No tags found in the repository.[/yellow]")
         return []
     first_commit = get_first_commit_hash(repo)
 
-    points = [first_commit] + [tag.commit.hexsha for tag in tags]
+    points = [first_commit] + [tag.sha for tag in tags]
     point_names = [first_commit] + [tag.name for tag in tags]
     if current_tag is not None:
         point_names += ["HEAD"]
@@ -372,44 +575,228 @@ def prepare_changelog_segments(
 
 
 def write_changelog_prepend(filepath: str, new_content: str) -> None:
-    path = Path(filepath)
-    if path.exists():
-        with path.open("r", encoding="utf-8") as f:
-            old_content = f.read()
-        with path.open("w", encoding="utf-8") as f:
-            f.write(new_content.strip("\n") + "\n\n" + old_content)
-    else:
-        with path.open("w", encoding="utf-8") as f:
-            f.write(new_content.strip("\n") + "\n")
+    """Put `new_content` in front of `filepath`, see PrependChangelogWriter."""
+    write_changelog([new_content], [PrependChangelogWriter(filepath)])
+
+
+class ChangelogWriter(ABC):
+    """Receives a changelog chunk by chunk and sends it to one destination."""
+
+    @abstractmethod
+    def write(self, chunk: str) -> None: ...
+
+    def close(self) -> None:  # noqa: B027
+        """Called once after the last chunk."""
+
+    def abort(self) -> None:
+        """Called instead of close when generation failed; by default whatever was written is kept."""
+        self.close()
+
+
+class ConsoleChangelogWriter(ChangelogWriter):
+    """Render each chunk as markdown on the console as soon as it arrives."""
+
+    def __init__(self, output_path: str | None = None) -> None:
+        self.output_path = output_path
+        self.started = False
+
+    def write(self, chunk: str) -> None:
+        text = chunk.strip("\n")
+        if not text:
+            return
+        if not self.started:
+            self.started = True
+            print()
+            console.print("[cyan]Changelog:[/cyan]")
+            if self.output_path:
+                console.print(f"[dim]It is saved to {self.output_path}[/dim]")
+            print()
+        # rich.Markdown 默认标题居中，需用 console.print 并设置参数 style 和 width
+        console.print(Markdown(text, justify="left"))
+
+
+class TextChangelogWriter(ChangelogWriter):
+    """
+    Write the raw markdown to a text stream.
+
+    The output matches writing `changelog.strip("\n") + "\n"` at once: trailing newlines of a chunk are
+    held back until more text follows, and the stream is only opened once there is something to write.
+    """
+
+    def __init__(self, stream: TextIO | None = None) -> None:
+        self.stream = stream
+        self.pending_newlines = ""
+
+    def open(self) -> TextIO:
+        if self.stream is None:
+            msg = "TextChangelogWriter needs a stream"
+            raise ValueError(msg)
+        return self.stream
+
+    def write(self, chunk: str) -> None:
+        body = chunk.rstrip("\n")
+        if not body:
+            if self.stream is not None:
+                self.pending_newlines += chunk
+            return
+        if self.stream is None:
+            body = body.lstrip("\n")
+            self.stream = self.open()
+        self.stream.write(self.pending_newlines + body)
+        self.stream.flush()
+        self.pending_newlines = chunk[len(chunk.rstrip("\n")) :]
+
+    def close(self) -> None:
+        if self.stream is not None:
+            self.stream.write("\n")
+            self.stream.flush()
+
+
+class PlainChangelogWriter(TextChangelogWriter):
+    """Print the raw markdown to stdout, skipping rich's markdown parsing and layout."""
+
+    def open(self) -> TextIO:
+        return sys.stdout
+
+
+class FileChangelogWriter(TextChangelogWriter):
+    """Write the changelog to `filepath`, replacing its contents."""
+
+    def __init__(self, filepath: str) -> None:
+        super().__init__()
+        self.filepath = filepath
+
+    def open(self) -> TextIO:
+        return Path(self.filepath).open("w", encoding="utf-8")
+
+    def close(self) -> None:
+        if self.stream is not None:
+            super().close()
+            self.stream.close()
+
+
+class PrependChangelogWriter(TextChangelogWriter):
+    """
+    Put the new versions in front of the existing file.
+
+    They are streamed to a temp file next to `filepath`, followed by the old file copied in blocks, and the
+    temp file then replaces the original, so memory use does not grow with the file and an interrupted run
+    leaves the old changelog untouched.
+    """
+
+    def __init__(self, filepath: str) -> None:
+        super().__init__()
+        self.path = Path(filepath)
+        self.temp_path: Path | None = None
+
+    def open(self) -> TextIO:
+        if not self.path.exists():
+            return self.path.open("w", encoding="utf-8")
+        fd, temp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        self.temp_path = Path(temp_path)
+        return os.fdopen(fd, "w", encoding="utf-8")
+
+    def close(self) -> None:
+        if self.stream is None:
+            return
+        if self.temp_path is None:
+            super().close()
+            self.stream.close()
+            return
+        try:
+            self.stream.write("\n\n")
+            self.stream.flush()
+            with self.path.open("rb") as old:
+                shutil.copyfileobj(old, self.stream.buffer, PREPEND_COPY_CHUNK_SIZE)
+            self.stream.flush()
+            os.fsync(self.stream.fileno())
+            self.stream.close()
+            shutil.copymode(self.path, self.temp_path)
+            self.temp_path.replace(self.path)
+        except BaseException:
+            self.abort()
+            raise
+
+    def abort(self) -> None:
+        if self.stream is None:
+            return
+        if self.temp_path is None:
+            # 新建的文件没有旧内容可丢失，保留已写入的部分
+            self.close()
+            return
+        self.stream.close()
+        self.temp_path.unlink(missing_ok=True)
+
+
+def resolve_render_mode(render: str | None, output_path: str | None = None) -> str:
+    """
+    The `--render` mode to use: rich on a terminal, otherwise plain text.
+
+    When stdout is not a terminal and the changelog goes to a file, nothing is printed at all.
+    """
+    if render is not None:
+        return render
+    if sys.stdout.isatty():
+        return "rich"
+    return "none" if output_path else "plain"
+
+
+def changelog_writers(output_path: str | None = None, *, prepend: bool = False, render: str = "rich") -> list[ChangelogWriter]:
+    """The console in the given render mode plus, when `output_path` is given, the file the changelog is saved to."""
+    writers: list[ChangelogWriter] = []
+    if render == "rich":
+        writers.append(ConsoleChangelogWriter(output_path))
+    elif render == "plain":
+        writers.append(PlainChangelogWriter())
+    if output_path:
+        writers.append(PrependChangelogWriter(output_path) if prepend else FileChangelogWriter(output_path))
+    return writers
+
+
+def write_changelog(chunks: Iterable[str], writers: list[ChangelogWriter]) -> bool:
+    """Send every chunk to every writer; returns False when the changelog was empty and nothing was written."""
+    wrote = False
+    try:
+        for chunk in chunks:
+            if not wrote and not chunk.strip():
+                continue
+            wrote = True
+            for writer in writers:
+                writer.write(chunk)
+    except BaseException:
+        if wrote:
+            for writer in writers:
+                writer.abort()
+        raise
+    if wrote:
+        for writer in writers:
+            writer.close()
+    return wrote
 
 
 def print_and_write_changelog(
-    changelog: str,
+    changelog: str | Iterable[str],
     output_path: str | None = None,
     *,
     prepend: bool = False,
+    render: str = "rich",
 ) -> None:
-    if not changelog or not changelog.strip():
+    """Print the changelog and save it to `output_path`; chunks are written as they arrive."""
+    chunks = [changelog] if isinstance(changelog, str) else changelog
+    if not write_changelog(chunks, changelog_writers(output_path, prepend=prepend, render=render)):
         print("[yellow]No changes found, nothing to output.[/yellow]")
-        return
-    print()
-    console.print("[cyan]Changelog:[/cyan]")
-    if output_path:
-        console.print(f"[dim]It is saved to {output_path}[/dim]")
-    print()
-    # rich.Markdown 默认标题居中，需用 console.print 并设置参数 style 和 width
-    md = Markdown(changelog.strip("\n"), justify="left")
-    console.print(md)
-    if output_path:
-        if prepend:
-            write_changelog_prepend(output_path, changelog)
-        else:
-            with Path(output_path).open("w", encoding="utf-8") as output_file:
-                output_file.write(changelog.strip("\n") + "\n")
 
 
 def handle_changelog(args: ChangelogArgs, current_tag: str | None = None) -> None:
+    if args.per_package:
+        from tgit.monorepo import handle_package_changelogs  # noqa: PLC0415
+
+        handle_package_changelogs(args, current_tag)
+        return
     repo = git.Repo(args.path)
+    if args.output_format != "markdown":
+        _handle_changelog_records(repo, args, current_tag)
+        return
     from_raw = args.from_raw
     to_raw = args.to_raw
     latest_tag_in_file = None
@@ -438,10 +825,31 @@ def handle_changelog(args: ChangelogArgs, current_tag: str | None = None) -> Non
             return
 
     # 生成 changelog
-    changelogs = _generate_changelogs_from_segments(repo, segments)
-
-    # 输出结果
-    print_and_write_changelog(changelogs, args.output, prepend=prepend)
+    cache = None if args.no_cache else _open_changelog_cache(repo, args.traversal)
+    index = get_history_index(repo, enabled=args.index, traversal=args.traversal)
+    chunks = iter_changelogs_from_segments(repo, segments, cache=cache, jobs=args.jobs, index=index, traversal=args.traversal)
+
+    # 按发布顺序边生成边输出，控制台只渲染新生成的版本
+    render = resolve_render_mode(args.render, args.output)
+    print_and_write_changelog(chunks, args.output, prepend=prepend, render=render)
+    if cache is not None and args.verbose > 0:
+        console.print(f"[dim]Changelog cache: {cache.hits} hits, {cache.misses} misses[/dim]")
+
+
+def _handle_changelog_records(repo: git.Repo, args: ChangelogArgs, current_tag: str | None = None) -> None:
+    """以 JSON 输出全部（或指定范围的）分段，不经过 markdown 和 rich 渲染"""
+    # stdout 只能输出 JSON，没有 tag 时不走会打印提示的分段逻辑
+    if not get_tag_index(repo).by_date:
+        segments = []
+    elif args.from_raw is not None or args.to_raw is not None:
+        segments = _get_range_segments(repo, args.from_raw, args.to_raw)
+    else:
+        segments = prepare_changelog_segments(repo, None, current_tag)
+    index = get_history_index(repo, enabled=args.index, traversal=args.traversal)
+    segment_commits = iter_segment_commits(repo, segments, index, args.traversal)
+    chunks = iter_json_changelog(segment_commits) if args.output_format == "json" else iter_ndjson_changelog(segment_commits)
+    writer = FileChangelogWriter(args.output) if args.output else PlainChangelogWriter()
+    write_changelog(chunks, [writer])
 
 
 def _get_range_segments(repo: git.Repo, from_raw: str | None, to_raw: str | None) -> list[VersionSegment]:
@@ -461,44 +869,294 @@ def _get_range_segments(repo: git.Repo, from_raw: str | None, to_raw: str | None
     return segments[start:end]
 
 
-def _generate_changelogs_from_segments(repo: git.Repo, segments: list[VersionSegment]) -> str:
-    """从分段列表生成 changelog"""
-    if not segments:
-        return ""
+def _bucket_by_segment(
+    repo: git.Repo,
+    segments: list[VersionSegment],
+    walk: Callable[..., Iterable[tuple[str, tuple[str, ...], T]]],
+) -> Iterator[list[T]]:
+    """
+    Walk history once and split it into the given segments, yielding each bucket in the same order.
+
+    A commit goes to the oldest segment whose `to_hash` reaches it, the same rule as segment_rev_args.
+    A bucket is yielded as soon as the walk can no longer add to it, so only the segments
+    the walk is currently interleaving are held in memory.
+    """
+    tips = [segment.to_hash for segment in segments]
+    tip_hashes = repo.git.rev_parse(*tips).split()
+    # Segments are ordered newest first; a lower rank means an older release.
+    tip_ranks: dict[str, int] = {}
+    for rank, tip_hash in enumerate(reversed(tip_hashes)):
+        tip_ranks.setdefault(tip_hash, rank)
+    # The boundary map only holds commits whose children have been seen but which have not been
+    # emitted yet; --date-order guarantees every child is emitted before its parents.
+    frontier: dict[str, int] = {}
+    # 按 rank 统计尚未遍历到的 tip 和边界上等待的提交，两者都为 0 时该分段不会再增加提交
+    unseen_tips = Counter(tip_ranks.values())
+    frontier_ranks: Counter[int] = Counter()
+    buckets: defaultdict[int, list[T]] = defaultdict(list)
+    next_rank = len(segments) - 1
+    for sha, parents, item in walk("--date-order", *tip_hashes, *segment_rev_args(repo, segments[-1])[1:]):
+        rank = len(segments)
+        if (waiting := frontier.pop(sha, None)) is not None:
+            frontier_ranks[waiting] -= 1
+            rank = waiting
+        if (tip_rank := tip_ranks.get(sha)) is not None:
+            unseen_tips[tip_rank] -= 1
+            rank = min(rank, tip_rank)
+        for parent in parents:
+            previous = frontier.get(parent)
+            if previous is not None and previous <= rank:
+                continue
+            if previous is not None:
+                frontier_ranks[previous] -= 1
+            frontier[parent] = rank
+            frontier_ranks[rank] += 1
+        buckets[rank].append(item)
+        # Newer segments are finished first, so nothing can reach a rank above `next_rank` any more.
+        while next_rank >= 0 and not unseen_tips[next_rank] and not frontier_ranks[next_rank]:
+            yield buckets.pop(next_rank, [])
+            next_rank -= 1
+    for rank in range(next_rank, -1, -1):
+        yield buckets.pop(rank, [])
+
+
+def bucket_records_by_segment(
+    repo: git.Repo,
+    segments: list[VersionSegment],
+    traversal: str = "all",
+    *,
+    name_only: bool = False,
+) -> Iterator[list[CommitRecord]]:
+    """Split commit records into `segments` with a single `git log`; `name_only` adds the paths each commit touched."""
 
-    changelogs = ""
+    def walk(*rev_args: str) -> Iterator[tuple[str, tuple[str, ...], CommitRecord]]:
+        for record in iter_traversal_records(repo, traversal, *rev_args, name_only=name_only):
+            yield record.hexsha, record.parents if traversal == "all" else record.parents[:1], record
 
-    with Progress() as progress:
-        task = progress.add_task("Generating changelog...", total=len(segments))
+    return _bucket_by_segment(repo, segments, walk)
+
+
+def bucket_hashes_by_segment(repo: git.Repo, segments: list[VersionSegment], traversal: str = "all") -> Iterator[list[str]]:
+    """Split commit hashes into `segments` with a single `git rev-list`, for when the facts come from the history index."""
+
+    def walk(*rev_args: str) -> Iterator[tuple[str, tuple[str, ...], str]]:
+        if traversal == "all":
+            yield from ((sha, parents, sha) for sha, parents in iter_commit_parents(repo, *rev_args))
+            return
+        for sha, parents in iter_commit_parents(repo, *FIRST_PARENT_ARGS, *rev_args):
+            yield sha, parents[:1], sha
+
+    return _bucket_by_segment(repo, segments, walk)
+
+
+def _open_changelog_cache(repo: git.Repo, traversal: str = "all") -> ChangelogCache | None:
+    """打开 changelog 缓存，并清理边界 tag 已移动或删除的条目"""
+    if repo.working_tree_dir is None:
+        return None
+    cache = ChangelogCache(Path(repo.working_tree_dir) / CACHE_DIR, CHANGELOG_TEMPLATE_VERSION, traversal)
+    cache.prune({tag.sha for tag in get_tag_index(repo).by_date} | set(get_root_commits(repo)))
+    return cache
+
+
+def _contiguous_runs(segments: list[VersionSegment], indices: list[int]) -> list[list[int]]:
+    """把需要生成的分段按首尾相接分组，每组只需遍历一次历史"""
+    runs: list[list[int]] = []
+    for idx in indices:
+        if runs and runs[-1][-1] == idx - 1 and segments[idx - 1].from_hash == segments[idx].to_hash:
+            runs[-1].append(idx)
+        else:
+            runs.append([idx])
+    return runs
+
+
+def _render_segment(
+    segment: VersionSegment,
+    tgit_commits: list[TGITCommit],
+    remote_uri: str | None,
+    cache: ChangelogCache | None,
+) -> tuple[str, int]:
+    """生成单个分段的 changelog，返回内容和提交数量"""
+    commits_by_type = group_commits_by_type(tgit_commits)
+
+    changelog = generate_changelog(commits_by_type, segment.from_name, segment.to_name, remote_uri)
+    if cache is not None:
+        commits_data = {commit_type: [commit.to_dict() for commit in commits] for commit_type, commits in commits_by_type.items()}
+        cache.put(segment, remote_uri, changelog, commits_data)
+    return changelog, len(tgit_commits)
+
+
+def _segment_commits(repo: git.Repo, segment: VersionSegment, index: "HistoryIndex | None", traversal: str) -> list[TGITCommit]:
+    """单独遍历一个分段的提交"""
+    rev_args = segment_rev_args(repo, segment)
+    if index is not None:
+        return index.commits_in_range(*rev_args, first_parent=traversal != "all")
+    return _process_commits(iter_traversal_records(repo, traversal, *rev_args))
 
-        for segment in segments:
-            from_hash, to_hash, from_name, to_name = segment.from_hash, segment.to_hash, segment.from_name, segment.to_name
-            # 获取提交信息
-            raw_commits = list(repo.iter_commits(f"{from_hash}...{to_hash}"))
-            tgit_commits = _process_commits(repo, raw_commits)
-            commits_by_type = group_commits_by_type(tgit_commits)
 
-            # 获取远程仓库信息
-            remote_uri = _get_remote_uri_safe(repo)
+def _iter_run_commits(
+    repo: git.Repo,
+    run_segments: list[VersionSegment],
+    index: "HistoryIndex | None",
+    traversal: str = "all",
+) -> Iterator[list[TGITCommit]]:
+    """逐个产出首尾相接的一组分段的提交"""
+    if len(run_segments) == 1:
+        yield _segment_commits(repo, run_segments[0], index, traversal)
+        return
+    # 多个分段时只遍历一次历史
+    if index is not None:
+        for segment, shas in zip(run_segments, bucket_hashes_by_segment(repo, run_segments, traversal), strict=True):
+            yield index.commits_for_hashes(shas, segment_rev_args(repo, segment))
+        return
+    segment_records = bucket_records_by_segment(repo, run_segments, traversal)
+    for raw_commits in segment_records:
+        yield _process_commits(raw_commits)
 
-            # 生成 changelog
-            changelog = generate_changelog(commits_by_type, from_name, to_name, remote_uri)
-            changelogs += changelog
 
+def iter_segment_commits(
+    repo: git.Repo,
+    segments: list[VersionSegment],
+    index: "HistoryIndex | None" = None,
+    traversal: str = "all",
+) -> Iterator[tuple[VersionSegment, list[TGITCommit]]]:
+    """Each segment with its commits in release order, without rendering; adjacent segments share one walk."""
+    for run in _contiguous_runs(segments, list(range(len(segments)))):
+        run_segments = [segments[idx] for idx in run]
+        yield from zip(run_segments, _iter_run_commits(repo, run_segments, index, traversal), strict=True)
+
+
+def segment_to_dict(segment: VersionSegment) -> dict[str, str]:
+    return {"segment": segment.to_name, "from": segment.from_name, "from_hash": segment.from_hash, "to_hash": segment.to_hash}
+
+
+def iter_ndjson_changelog(segment_commits: Iterable[tuple[VersionSegment, list[TGITCommit]]]) -> Iterator[str]:
+    """One line per segment followed by one line per commit, a chunk per segment."""
+    for segment, commits in segment_commits:
+        lines = [json.dumps({"record": "segment", **segment_to_dict(segment), "commits": len(commits)}, ensure_ascii=False)]
+        lines += [
+            json.dumps({"record": "commit", "segment": segment.to_name, **commit.to_dict()}, ensure_ascii=False) for commit in commits
+        ]
+        yield "\n".join(lines) + "\n"
+
+
+def iter_json_changelog(segment_commits: Iterable[tuple[VersionSegment, list[TGITCommit]]]) -> Iterator[str]:
+    """A JSON array of segments with their commits, streamed a segment at a time."""
+    yield "["
+    separator = "\n"
+    for segment, commits in segment_commits:
+        entry = {**segment_to_dict(segment), "commits": [commit.to_dict() for commit in commits]}
+        yield separator + json.dumps(entry, ensure_ascii=False)
+        separator = ",\n"
+    yield "\n]"
+
+
+def _iter_changelogs_serial(  # noqa: PLR0913
+    repo: git.Repo,
+    segments: list[VersionSegment],
+    remote_uri: str | None,
+    cache: ChangelogCache | None,
+    index: "HistoryIndex | None",
+    progress: Progress,
+    task: TaskID,
+    traversal: str = "all",
+) -> Iterator[str]:
+    # 已发布的分段直接读取缓存
+    cached = [cache.get(segment, remote_uri) if cache else None for segment in segments]
+    missing = [idx for idx, changelog in enumerate(cached) if changelog is None]
+    next_idx = 0
+    for run in _contiguous_runs(segments, missing):
+        for idx in range(next_idx, run[0]):
             progress.update(task, advance=1)
+            yield cached[idx]  # type: ignore[misc]
+        run_segments = [segments[idx] for idx in run]
+        for segment, tgit_commits in zip(run_segments, _iter_run_commits(repo, run_segments, index, traversal), strict=True):
+            changelog, _ = _render_segment(segment, tgit_commits, remote_uri, cache)
+            progress.update(task, advance=1)
+            yield changelog
+        next_idx = run[-1] + 1
+    for idx in range(next_idx, len(segments)):
+        progress.update(task, advance=1)
+        yield cached[idx]  # type: ignore[misc]
+
 
-    return changelogs
+def _iter_changelogs_parallel(  # noqa: PLR0913
+    repo: git.Repo,
+    segments: list[VersionSegment],
+    remote_uri: str | None,
+    cache: ChangelogCache | None,
+    index: "HistoryIndex | None",
+    progress: Progress,
+    task: TaskID,
+    jobs: int,
+    traversal: str = "all",
+) -> Iterator[str]:
+    """每个分段单独遍历历史并在线程池中生成，按发布顺序产出"""
+    worker_tasks: dict[str, TaskID] = {}
+    worker_lock = threading.Lock()
+
+    def render(segment: VersionSegment) -> str:
+        name = threading.current_thread().name
+        with worker_lock:
+            if name not in worker_tasks:
+                worker_tasks[name] = progress.add_task(f"  worker {len(worker_tasks) + 1}", total=None)
+        tgit_commits = _segment_commits(repo, segment, index, traversal)
+        changelog, commit_count = _render_segment(segment, tgit_commits, remote_uri, cache)
+        progress.update(worker_tasks[name], advance=commit_count)
+        return changelog
+
+    def submit(segment: VersionSegment) -> Future[str]:
+        if cache is not None and (changelog := cache.get(segment, remote_uri)) is not None:
+            future: Future[str] = Future()
+            future.set_result(changelog)
+            return future
+        return executor.submit(render, segment)
+
+    # 只让少量分段处于进行中，内存占用不随分段总数增长
+    window = jobs * 2
+    executor = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="tgit-changelog")
+    try:
+        pending_segments = iter(segments)
+        in_flight = deque(submit(segment) for segment in islice(pending_segments, window))
+        while in_flight:
+            changelog = in_flight.popleft().result()
+            if (segment := next(pending_segments, None)) is not None:
+                in_flight.append(submit(segment))
+            progress.update(task, advance=1)
+            yield changelog
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def iter_changelogs_from_segments(  # noqa: PLR0913
+    repo: git.Repo,
+    segments: list[VersionSegment],
+    cache: ChangelogCache | None = None,
+    jobs: int = 1,
+    index: "HistoryIndex | None" = None,
+    traversal: str = "all",
+) -> Iterator[str]:
+    """按分段顺序逐个产出 changelog；`jobs` 大于 1 时并行生成"""
+    if not segments:
+        return
+
+    # 获取远程仓库信息
+    remote_uri = _get_remote_uri_safe(repo)
+
+    columns = (*Progress.get_default_columns(), TaskProgressColumn(text_format="", show_speed=True))
+    # stdout 被重定向到文件或管道时进度条改写到 stderr，不能混进 changelog；
+    # 终端上仍共用 console，让 rich 把输出排在进度条上方
+    progress_console = console if console.is_terminal else Console(stderr=True)
+    with Progress(*columns, console=progress_console, redirect_stdout=console.is_terminal) as progress:
+        task = progress.add_task("Generating changelog...", total=len(segments))
+        if jobs > 1:
+            yield from _iter_changelogs_parallel(repo, segments, remote_uri, cache, index, progress, task, jobs, traversal)
+        else:
+            yield from _iter_changelogs_serial(repo, segments, remote_uri, cache, index, progress, task, traversal)
 
 
-def _process_commits(repo: git.Repo, raw_commits: list) -> list:
+def _process_commits(raw_commits: Iterable[CommitRecord]) -> list[TGITCommit]:
     """处理原始提交，转换为 TGITCommit 对象"""
-    tgit_commits = []
-    for commit in raw_commits:
-        message = commit.message.decode() if isinstance(commit.message, bytes) else commit.message
-        if m := commit_pattern.match(message):
-            message_dict = m.groupdict()
-            tgit_commits.append(TGITCommit(repo, commit, message_dict))
-    return tgit_commits
+    return list(iter_tgit_commits(raw_commits))
 
 
 def _get_remote_uri_safe(repo: git.Repo) -> str | None:
@@ -0,0 +1,104 @@
+"""On-disk cache of rendered changelog segments bounded by fixed commits."""
+
+import contextlib
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from tgit.utils import write_cache_file
+
+if TYPE_CHECKING:
+    from tgit.changelog import VersionSegment
+
+CACHE_DIR = Path(".tgit") / "cache" / "changelog"
+FULL_SHA_PATTERN = re.compile(r"[0-9a-f]{40}(?:[0-9a-f]{24})?")
+
+
+class ChangelogCache:
+    """
+    Rendered markdown and commit data per segment, stored as one JSON file per entry.
+
+    Entries are named `v<template>-<from_sha>-<to_sha>-<digest>.json`, where the digest covers the
+    segment names and remote URI, so stale entries can be pruned from file names alone.
+    """
+
+    def __init__(self, directory: Path, template_version: int, traversal: str = "all") -> None:
+        self.directory = directory
+        self.template_version = template_version
+        self.traversal = traversal
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def is_cacheable(segment: "VersionSegment") -> bool:
+        # Only full hashes name immutable history; refs such as HEAD can move.
+        return bool(FULL_SHA_PATTERN.fullmatch(segment.from_hash) and FULL_SHA_PATTERN.fullmatch(segment.to_hash))
+
+    def _entry_key(self, segment: "VersionSegment", remote_uri: str | None) -> dict[str, Any]:
+        key = {
+            "template_version": self.template_version,
+            "from_sha": segment.from_hash,
+            "to_sha": segment.to_hash,
+            "from_name": segment.from_name,
+            "to_name": segment.to_name,
+            "remote_uri": remote_uri,
+        }
+        # Only keyed when set, so entries written before traversal modes existed stay valid.
+        if self.traversal != "all":
+            key["traversal"] = self.traversal
+        return key
+
+    def _entry_path(self, key: dict[str, Any]) -> Path:
+        digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()[:16]
+        return self.directory / f"v{self.template_version}-{key['from_sha']}-{key['to_sha']}-{digest}.json"
+
+    def get(self, segment: "VersionSegment", remote_uri: str | None) -> str | None:
+        """Return the cached markdown for `segment`, or None when it has to be generated."""
+        if not self.is_cacheable(segment):
+            return None
+        key = self._entry_key(segment, remote_uri)
+        try:
+            entry = json.loads(self._entry_path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            entry = None
+        if not isinstance(entry, dict) or entry.get("key") != key:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["markdown"]
+
+    def put(self, segment: "VersionSegment", remote_uri: str | None, markdown: str, commits: dict[str, list[dict[str, Any]]]) -> None:
+        if not self.is_cacheable(segment):
+            return
+        key = self._entry_key(segment, remote_uri)
+        entry = {"key": key, "markdown": markdown, "commits": commits}
+        if self._ensure_directory():
+            write_cache_file(self._entry_path(key), entry)
+
+    def prune(self, valid_shas: set[str]) -> int:
+        """Delete entries from other template versions or whose boundaries no longer match a tag or root commit."""
+        removed = 0
+        if not self.directory.is_dir():
+            return removed
+        for path in self.directory.glob("*.json"):
+            version, _, rest = path.stem.partition("-")
+            from_sha, _, rest = rest.partition("-")
+            to_sha, _, _ = rest.partition("-")
+            if version != f"v{self.template_version}" or from_sha not in valid_shas or to_sha not in valid_shas:
+                with contextlib.suppress(OSError):
+                    path.unlink()
+                    removed += 1
+        return removed
+
+    def _ensure_directory(self) -> bool:
+        if self.directory.is_dir():
+            return True
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Keep the cache out of `git status` without touching the project's .gitignore.
+            (self.directory.parent / ".gitignore").write_text("*\n", encoding="utf-8")
+        except OSError:
+            return False
+        return True
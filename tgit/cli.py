@@ -1,17 +1,23 @@
 import contextlib
+import importlib
 import importlib.metadata
 import sys
-import threading
 
 import click
 import setproctitle as setproctitle_module
 
-from tgit.add import add
-from tgit.changelog import changelog
-from tgit.commit import commit
-from tgit.settings import settings_command
 from tgit.utils import console
-from tgit.version import version
+
+# Subcommands are resolved from "module:attribute" only when invoked, so that
+# `tgit add` or `tgit --version` never pay for jinja2, pydantic, GitPython, etc.
+LAZY_SUBCOMMANDS = {
+    "add": "tgit.add:add",
+    "changelog": "tgit.changelog:changelog",
+    "commit": "tgit.commit:commit",
+    "daemon": "tgit.daemon:daemon",
+    "settings": "tgit.settings:settings_command",
+    "version": "tgit.version:version",
+}
 
 
 def set_process_title(title: str) -> None:
@@ -26,6 +32,30 @@ def set_terminal_title(title: str) -> None:
     sys.stdout.flush()
 
 
+class LazyGroup(click.Group):
+    """A click group that imports each subcommand's module on first use."""
+
+    def __init__(self, *args: object, lazy_subcommands: dict[str, str] | None = None, **kwargs: object) -> None:
+        super().__init__(*args, **kwargs)  # type: ignore[arg-type]
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        return sorted({*super().list_commands(ctx), *self.lazy_subcommands})
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        if cmd_name in self.lazy_subcommands and cmd_name not in self.commands:
+            self.add_command(self._load_command(cmd_name), name=cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def _load_command(self, cmd_name: str) -> click.Command:
+        module_name, attr_name = self.lazy_subcommands[cmd_name].split(":", maxsplit=1)
+        command = getattr(importlib.import_module(module_name), attr_name)
+        if not isinstance(command, click.Command):
+            msg = f"Lazy subcommand {cmd_name!r} did not resolve to a click command"
+            raise TypeError(msg)
+        return command
+
+
 def version_callback(ctx: click.Context, _param: click.Parameter, value: bool) -> None:  # noqa: FBT001
     if not value or ctx.resilient_parsing:
         return
@@ -36,6 +66,8 @@ def version_callback(ctx: click.Context, _param: click.Parameter, value: bool) -
 
 @click.group(
     name="tgit",
+    cls=LazyGroup,
+    lazy_subcommands=LAZY_SUBCOMMANDS,
     help="TGIT cli",
     no_args_is_help=True,
 )
@@ -51,20 +83,6 @@ def app() -> None:
     set_process_title("tgit")
     set_terminal_title("tgit")
 
-    def import_openai() -> None:
-        with contextlib.suppress(Exception):
-            import openai  # noqa: F401, PLC0415
-
-    threading.Thread(target=import_openai).start()
-
-
-# Add individual commands directly to the main app
-app.add_command(commit)
-app.add_command(version)
-app.add_command(changelog)
-app.add_command(add)
-app.add_command(settings_command, name="settings")
-
 
 if __name__ == "__main__":
     app()
@@ -0,0 +1,117 @@
+"""Thin `tgit` entry point that forwards to a running `tgit daemon` when one is available.
+
+Only the standard library is imported here: the point of forwarding is to skip the
+imports and settings loading that a cold `tgit` process pays for.
+"""
+
+import contextlib
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+from pathlib import Path
+from typing import Any
+
+SOCKET_ENV = "TGIT_DAEMON_SOCKET"
+DISABLE_ENV = "TGIT_NO_DAEMON"
+HEADER = struct.Struct("!I")
+RECV_CHUNK_SIZE = 65536
+FORWARDED_FDS = (0, 1, 2)
+FORWARDED_SIGNALS = ("SIGINT", "SIGTERM", "SIGHUP", "SIGQUIT")
+# Commands that must run in the calling process rather than inside the daemon.
+LOCAL_COMMANDS = {"daemon"}
+
+
+def get_socket_path() -> Path:
+    if path := os.environ.get(SOCKET_ENV):
+        return Path(path)
+    return Path.home() / ".tgit" / "daemon.sock"
+
+
+def get_build_id() -> str:
+    """Identify the installed tgit sources so a daemon never serves a stale build."""
+    package_dir = Path(__file__).resolve().parent
+    latest_mtime = max((path.stat().st_mtime_ns for path in package_dir.rglob("*.py")), default=0)
+    return f"{package_dir}:{latest_mtime}"
+
+
+def send_message(sock: socket.socket, message: dict[str, Any], fds: tuple[int, ...] = ()) -> None:
+    data = json.dumps(message).encode()
+    payload = HEADER.pack(len(data)) + data
+    if fds:
+        sent = socket.send_fds(sock, [payload], list(fds))
+        sock.sendall(payload[sent:])
+    else:
+        sock.sendall(payload)
+
+
+def receive_message(sock: socket.socket, maxfds: int = 0) -> tuple[dict[str, Any] | None, list[int]]:
+    """Read one length-prefixed JSON message, returning None when the peer hung up."""
+    buffer = b""
+    fds: list[int] = []
+    while len(buffer) < HEADER.size or len(buffer) < HEADER.size + HEADER.unpack_from(buffer)[0]:
+        if maxfds and not fds:
+            chunk, fds, _flags, _addr = socket.recv_fds(sock, RECV_CHUNK_SIZE, maxfds)
+        else:
+            chunk = sock.recv(RECV_CHUNK_SIZE)
+        if not chunk:
+            return None, fds
+        buffer += chunk
+    (length,) = HEADER.unpack_from(buffer)
+    return json.loads(buffer[HEADER.size : HEADER.size + length]), fds
+
+
+def _forward_signals_to(pid: int) -> None:
+    def forward(signum: int, _frame: object) -> None:
+        with contextlib.suppress(ProcessLookupError):
+            os.kill(pid, signum)
+
+    for name in FORWARDED_SIGNALS:
+        if signum := getattr(signal, name, None):
+            signal.signal(signum, forward)
+
+
+def forward(argv: list[str], socket_path: Path | None = None) -> int | None:
+    """
+    Run `argv` inside the daemon, sharing this process's cwd, environment and stdio.
+
+    Returns the command's exit code, or None when no compatible daemon is listening
+    and the caller should run the command itself.
+    """
+    if not hasattr(socket, "send_fds"):
+        return None
+    path = socket_path or get_socket_path()
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    started = False
+    try:
+        sock.connect(str(path))
+        request = {"build": get_build_id(), "argv": argv, "cwd": str(Path.cwd()), "env": dict(os.environ)}
+        send_message(sock, request, FORWARDED_FDS)
+        reply, _ = receive_message(sock)
+        if reply is None or "pid" not in reply:
+            return None
+        started = True
+        _forward_signals_to(reply["pid"])
+        result, _ = receive_message(sock)
+    except OSError:
+        # Once the daemon has started the command, running it again locally would repeat its side effects.
+        return 1 if started else None
+    finally:
+        sock.close()
+    if result is None:
+        return 1
+    return int(result.get("exit", 1))
+
+
+def main() -> None:
+    argv = sys.argv[1:]
+    if not os.environ.get(DISABLE_ENV) and (not argv or argv[0] not in LOCAL_COMMANDS):
+        exit_code = forward(argv)
+        if exit_code is not None:
+            sys.exit(exit_code)
+
+    from tgit.cli import app  # noqa: PLC0415
+
+    app()
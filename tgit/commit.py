@@ -1,6 +1,8 @@
+import contextlib
 import importlib
 import importlib.resources
 import itertools
+import threading
 from dataclasses import dataclass
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
@@ -10,9 +12,14 @@ import git
 from jinja2 import Environment, FileSystemLoader
 from pydantic import BaseModel, Field
 from rich import get_console, print
+from rich.markup import escape
 
-from tgit.constants import DEFAULT_MODEL, REASONING_MODEL_HINTS
+from tgit.commit_cache import CACHE_DIRNAME, CommitMessageCache, prompt_digest
+from tgit.constants import DEFAULT_DIFF_TOKEN_BUDGET, DEFAULT_MODEL, DIFF_TOKEN_BUDGETS, REASONING_MODEL_HINTS
+from tgit.diff_budget import estimate_tokens, fit_diff_to_budget
+from tgit.partial_json import PartialObjectParser
 from tgit.shared import settings
+from tgit.staged import PatchLimits, StagedChanges, StagedFile, read_staged_changes
 from tgit.utils import get_commit_command, run_command, type_emojis
 
 if TYPE_CHECKING:
@@ -35,24 +42,40 @@ MESSAGE_ARG = click.argument(
 EMOJI_OPT = click.option("-e", "--emoji", is_flag=True, help="use emojis")
 BREAKING_OPT = click.option("-b", "--breaking", is_flag=True, help="breaking change")
 AI_OPT = click.option("-a", "--ai", is_flag=True, help="use ai")
+NO_CACHE_OPT = click.option("--no-cache", is_flag=True, help="ask the AI again instead of reusing the message cached for the staged tree")
 
 MAX_DIFF_LINES = 1000
 MAX_DIFF_SECTION_CHARS = 20000
 TRUNCATED_DIFF_HEAD_CHARS = 6000
 TRUNCATED_DIFF_TAIL_CHARS = 4000
-NUMSTAT_PARTS = 3
 NAME_STATUS_PARTS = 2
-RENAME_STATUS_PARTS = 3
 SENSITIVITY_LEVEL_WARNING = "warning"
 SENSITIVITY_LEVEL_ERROR = "error"
+PRECONNECT_TIMEOUT_SECONDS = 5.0
+GENERATING_STATUS = "[bold green]Generating commit message...[/bold green]"
+STREAM_TEXT_DELTA_EVENT = "response.output_text.delta"
+
+
+DEFAULT_COMMIT_TYPE_LIST = ("feat", "fix", "chore", "docs", "style", "refactor", "perf")
+DEFAULT_TYPE_EMOJIS = dict(type_emojis)
+commit_type_list = list(DEFAULT_COMMIT_TYPE_LIST)
+
+
+def register_custom_commit_types() -> None:
+    """Reset the commit types and emojis to the defaults, then register the custom ones configured in settings."""
+    # 守护进程的子进程会为另一个目录重新注册，上一个目录的自定义类型不能留下
+    type_emojis.clear()
+    type_emojis.update(DEFAULT_TYPE_EMOJIS)
+    commit_type_list[:] = DEFAULT_COMMIT_TYPE_LIST
+    for commit_type_obj in settings.commit.types:
+        if commit_type_obj.emoji and commit_type_obj.type:
+            type_emojis[commit_type_obj.type] = commit_type_obj.emoji
+            if commit_type_obj.type not in commit_type_list:
+                commit_type_list.append(commit_type_obj.type)
 
 
 # Initialize commit types from settings
-commit_type_list = ["feat", "fix", "chore", "docs", "style", "refactor", "perf"]
-for commit_type_obj in settings.commit.types:
-    if commit_type_obj.emoji and commit_type_obj.type:
-        type_emojis[commit_type_obj.type] = commit_type_obj.emoji
-        commit_type_list.append(commit_type_obj.type)
+register_custom_commit_types()
 
 
 @dataclass
@@ -61,6 +84,7 @@ class CommitArgs:
     emoji: bool
     breaking: bool
     ai: bool
+    no_cache: bool = False
 
 
 @dataclass
@@ -84,6 +108,10 @@ class CommitData(BaseModel):
     secrets: list[PotentialSecret] = Field(default_factory=list)
 
 
+class AIRequestCancelledError(Exception):
+    """The user interrupted a streamed AI request."""
+
+
 def _supports_reasoning(model: str) -> bool:
     """Return True when the selected model supports reasoning parameters."""
     if not model:
@@ -121,85 +149,33 @@ def _validate_reasoning_effort_for_model(model: str, effort: str) -> None:
         raise click.ClickException(error_message)
 
 
-def get_changed_files_from_status(repo: git.Repo) -> set[str]:
-    """获取所有变更的文件，包括重命名/移动的文件"""
-    diff_name_status = repo.git.diff("--cached", "--name-status", "-M")
-    all_changed_files: set[str] = set()
-
-    for line in diff_name_status.splitlines():
-        parts = line.split("\t")
-        if len(parts) >= NAME_STATUS_PARTS:
-            status = parts[0]
-            if status.startswith("R"):  # 重命名/移动
-                # 重命名格式: R100    old_file    new_file
-                if len(parts) >= RENAME_STATUS_PARTS:
-                    old_file, new_file = parts[1], parts[2]
-                    all_changed_files.add(old_file)
-                    all_changed_files.add(new_file)
-            else:
-                # 其他状态: A(添加), M(修改), D(删除)等
-                filename = parts[1]
-                all_changed_files.add(filename)
-
-    return all_changed_files
-
-
-def get_file_change_sizes(repo: git.Repo) -> dict[str, int]:
-    """获取文件变更的行数统计"""
-    diff_numstat = repo.git.diff("--cached", "--numstat", "-M")
-    file_sizes: dict[str, int] = {}
-
-    for line in diff_numstat.splitlines():
-        parts = line.split("\t")
-        if len(parts) >= NUMSTAT_PARTS:
-            added, deleted, filename = parts[0], parts[1], parts[2]
-            try:
-                added_int = int(added) if added != "-" else 0
-                deleted_int = int(deleted) if deleted != "-" else 0
-                file_sizes[filename] = added_int + deleted_int
-            except ValueError:
-                # 对于二进制文件等特殊情况，设置为0以包含在diff中
-                file_sizes[filename] = 0
-
-    return file_sizes
-
-
-def get_filtered_diff_files(repo: git.Repo) -> tuple[list[str], list[str]]:
-    """获取过滤后的差异文件列表"""
-    all_changed_files = get_changed_files_from_status(repo)
-
-    files_to_include: list[str] = []
-    lock_files: list[str] = []
-
-    for filename in sorted(all_changed_files):
-        if filename.endswith(".lock"):
-            lock_files.append(filename)
-            continue
+def _get_diff_token_budget(model: str) -> int:
+    """Prompt diff token budget: the model's `diff_token_budgets` entry, then `diff_token_budget`, then DIFF_TOKEN_BUDGETS."""
+    if budget := settings.diff_token_budgets.get(model):
+        return budget
+    if settings.diff_token_budget:
+        return settings.diff_token_budget
+    model_lower = model.lower()
+    return next((budget for prefix, budget in DIFF_TOKEN_BUDGETS if model_lower.startswith(prefix)), DEFAULT_DIFF_TOKEN_BUDGET)
 
-        files_to_include.append(filename)
 
+def split_lock_files(staged: StagedChanges) -> tuple[list[StagedFile], list[str]]:
+    """Staged files to show the AI, and the lock files left out of the diff."""
+    files_to_include = [staged_file for staged_file in staged.files if not staged_file.is_lock_file]
+    lock_files = sorted(staged_file.path for staged_file in staged.files if staged_file.is_lock_file)
     return files_to_include, lock_files
 
 
-def _split_diff_sections(diff: str) -> list[str]:
-    """Split a git diff into per-file sections."""
-    if not diff:
-        return []
-
-    sections: list[str] = []
-    current_section: list[str] = []
-
-    for line in diff.splitlines(keepends=True):
-        if line.startswith("diff --git ") and current_section:
-            sections.append("".join(current_section))
-            current_section = [line]
-            continue
-        current_section.append(line)
+def _patch_limits() -> PatchLimits:
+    return PatchLimits(MAX_DIFF_SECTION_CHARS, MAX_DIFF_LINES, TRUNCATED_DIFF_HEAD_CHARS, TRUNCATED_DIFF_TAIL_CHARS)
 
-    if current_section:
-        sections.append("".join(current_section))
 
-    return sections
+def _join_truncated_diff(head: str, tail: str, total_chars: int) -> str:
+    head = head.rstrip("\n")
+    tail = tail.lstrip("\n")
+    omitted_chars = total_chars - len(head) - len(tail)
+    omission_notice = f"[INFO] Middle of this file diff omitted: {omitted_chars} characters omitted."
+    return f"{head}\n\n{omission_notice}\n\n{tail}"
 
 
 def _truncate_diff_section(diff_section: str) -> str:
@@ -210,21 +186,17 @@ def _truncate_diff_section(diff_section: str) -> str:
 
     head = diff_section[:TRUNCATED_DIFF_HEAD_CHARS].rstrip("\n")
     tail = diff_section[-TRUNCATED_DIFF_TAIL_CHARS:].lstrip("\n")
-    omitted_chars = len(diff_section) - len(head) - len(tail)
-
-    if omitted_chars <= 0:
+    if len(diff_section) - len(head) - len(tail) <= 0:
         return diff_section
 
-    omission_notice = f"[INFO] Middle of this file diff omitted: {omitted_chars} characters omitted."
-    return f"{head}\n\n{omission_notice}\n\n{tail}"
+    return _join_truncated_diff(head, tail, len(diff_section))
 
 
-def _truncate_large_diff_sections(diff: str) -> str:
-    """Truncate oversized sections in a multi-file git diff."""
-    sections = _split_diff_sections(diff)
-    if not sections:
-        return diff
-    return "".join(_truncate_diff_section(section) for section in sections)
+def _staged_file_diff(staged_file: StagedFile) -> str:
+    """The diff of one staged file for the prompt; streamed patches arrive already reduced to head and tail."""
+    if staged_file.patch_tail is None:
+        return _truncate_diff_section(staged_file.patch)
+    return _join_truncated_diff(staged_file.patch, staged_file.patch_tail, staged_file.patch_chars)
 
 
 def _import_openai():  # type: ignore[misc]  # noqa: ANN202
@@ -256,39 +228,143 @@ def _create_openai_client() -> "Client":  # type: ignore[misc]
     return openai.Client(**kwargs)
 
 
-def _generate_commit_with_ai(diff: str, specified_type: str | None, current_branch: str) -> CommitData | None:
-    """使用 AI 生成提交消息"""
-    _check_openai_availability()
-    client = _create_openai_client()
+def _preconnect_openai_client(client: "Client") -> None:
+    """Open a pooled TLS connection to the API host so the first request skips the handshake."""
+    openai = _import_openai()
+    # with_options shares the connection pool, and any answer, even an error status, leaves the connection in it.
+    with contextlib.suppress(openai.APIError):
+        client.with_options(max_retries=0, timeout=PRECONNECT_TIMEOUT_SECONDS).get("", cast_to=str)
+
+
+class AIClientWarmup:
+    """Import openai and build the client on a daemon thread while git collects the staged diff."""
+
+    def __init__(self, *, preconnect: bool = False) -> None:
+        self.preconnect = preconnect
+        self._client: Client | None = None
+        self._thread = threading.Thread(target=self._run, name="tgit-ai-warmup", daemon=True)
+
+    def start(self) -> "AIClientWarmup":
+        self._thread.start()
+        return self
 
+    def _run(self) -> None:
+        # Failures are left for the foreground path, which reports them to the user.
+        with contextlib.suppress(Exception):
+            client = _create_openai_client()
+            if self.preconnect:
+                _preconnect_openai_client(client)
+            self._client = client
+
+    def get_client(self) -> "Client":
+        """Return the warmed client, building one in the foreground if the warm-up failed."""
+        if self._thread.is_alive():
+            self._thread.join()
+        if self._client is None:
+            _check_openai_availability()
+            return _create_openai_client()
+        return self._client
+
+
+def _start_ai_warmup() -> AIClientWarmup:
+    # Only a custom endpoint is worth a speculative handshake; it is usually a slower proxy.
+    return AIClientWarmup(preconnect=bool(settings.api_url)).start()
+
+
+def _render_system_prompt(specified_type: str | None, current_branch: str) -> str:
     template_params = TemplateParams(
         types=commit_types,
         branch=current_branch,
         specified_type=specified_type,
     )
-
-    with console.status("[bold green]Generating commit message...[/bold green]"):
-        model_name = settings.model or DEFAULT_MODEL
-        request_kwargs: dict[str, Any] = {
-            "input": [
-                {
-                    "role": "system",
-                    "content": commit_prompt_template.render(**template_params.__dict__),
-                },
-                {"role": "user", "content": diff},
-            ],
-            "model": model_name,
-            "text_format": CommitData,
-        }
-        if _supports_reasoning(model_name) and settings.reasoning_effort:
-            _validate_reasoning_effort_for_model(model_name, settings.reasoning_effort)
-            request_kwargs["reasoning"] = {"effort": settings.reasoning_effort}
-
+    return commit_prompt_template.render(**template_params.__dict__)
+
+
+def _generate_commit_with_ai(
+    diff: str,
+    specified_type: str | None,
+    current_branch: str,
+    warmup: AIClientWarmup | None = None,
+) -> tuple[CommitData | None, bool]:
+    """使用 AI 生成提交消息；同时返回 secrets 是否已在流式输出时列出"""
+    if warmup is None:
+        _check_openai_availability()
+        client = _create_openai_client()
+    else:
+        client = warmup.get_client()
+
+    model_name = settings.model or DEFAULT_MODEL
+    request_kwargs: dict[str, Any] = {
+        "input": [
+            {
+                "role": "system",
+                "content": _render_system_prompt(specified_type, current_branch),
+            },
+            {"role": "user", "content": diff},
+        ],
+        "model": model_name,
+        "text_format": CommitData,
+    }
+    if _supports_reasoning(model_name) and settings.reasoning_effort:
+        _validate_reasoning_effort_for_model(model_name, settings.reasoning_effort)
+        request_kwargs["reasoning"] = {"effort": settings.reasoning_effort}
+
+    if settings.stream:
+        try:
+            return _stream_commit_with_ai(client, request_kwargs)
+        except AIRequestCancelledError:
+            raise
+        except Exception as e:
+            # 部分兼容端点不支持流式输出，退回到普通请求
+            print(f"[dim]Streaming failed ({escape(str(e))}), retrying without streaming[/dim]")
+
+    with console.status(GENERATING_STATUS):
         chat_completion = client.responses.parse(
             **request_kwargs,
         )
 
-    return chat_completion.output_parsed
+    return chat_completion.output_parsed, False
+
+
+def _format_commit_preview(parser: PartialObjectParser) -> str:
+    """`type(scope): msg` from the fields streamed so far, including the one still being written."""
+    fields = dict(parser.fields)
+    if (partial := parser.partial_string()) is not None:
+        key, text = partial
+        fields[key] = text
+    if not fields.get("type"):
+        return ""
+    scope = f"({fields['scope']})" if fields.get("scope") else ""
+    breaking = "!" if fields.get("is_breaking") else ""
+    return f"{fields['type']}{scope}{breaking}: {fields.get('msg', '')}"
+
+
+def _stream_commit_with_ai(client: "Client", request_kwargs: dict[str, Any]) -> tuple[CommitData | None, bool]:
+    """
+    Stream the structured response, showing the message in the status line as it is written.
+
+    Potential secrets are listed as soon as their array is complete, and the returned flag says whether
+    they were; Ctrl+C closes the stream and raises AIRequestCancelledError.
+    """
+    parser = PartialObjectParser()
+    secrets_listed = False
+    try:
+        with console.status(GENERATING_STATUS) as status, client.responses.stream(**request_kwargs) as stream:
+            for event in stream:
+                if event.type != STREAM_TEXT_DELTA_EVENT:
+                    continue
+                for key, value in parser.feed(event.delta):
+                    if key == "secrets" and value:
+                        with contextlib.suppress(ValueError):
+                            _list_detected_secrets([PotentialSecret.model_validate(item) for item in value])
+                            secrets_listed = True
+                if preview := _format_commit_preview(parser):
+                    status.update(f"{GENERATING_STATUS} {escape(preview)} [dim](Ctrl+C to cancel)[/dim]")
+            response = stream.get_final_response()
+    except KeyboardInterrupt:
+        raise AIRequestCancelledError from None
+
+    return response.output_parsed, secrets_listed
 
 
 def _get_repo_for_ai(current_dir: Path) -> git.Repo | None:
@@ -381,8 +457,9 @@ def _get_manual_commit_command(args: CommitArgs, choices: list[str]) -> str | No
     )
 
 
-def _build_diff_for_ai(repo: git.Repo) -> str | None:
-    files_to_include, lock_files = get_filtered_diff_files(repo)
+def _build_diff_for_ai(staged: StagedChanges, token_budget: int | None = None) -> str | None:
+    """The prompt diff; with `token_budget`, files are ranked and degraded until it fits."""
+    files_to_include, lock_files = split_lock_files(staged)
     if not files_to_include and not lock_files:
         print("[yellow]No files to commit, please add some files before using AI[/yellow]")
         return None
@@ -390,9 +467,11 @@ def _build_diff_for_ai(repo: git.Repo) -> str | None:
     diff = ""
     if lock_files:
         diff += f"[INFO] The following lock files were modified but are not included in the diff: {', '.join(lock_files)}\n"
-    if files_to_include:
-        raw_diff = repo.git.diff("--cached", "-M", "--", *files_to_include)
-        diff += _truncate_large_diff_sections(raw_diff)
+    file_diffs = [(staged_file, _staged_file_diff(staged_file)) for staged_file in files_to_include if staged_file.patch]
+    if token_budget is None:
+        diff += "".join(file_diff for _, file_diff in file_diffs)
+    else:
+        diff += fit_diff_to_budget(file_diffs, max(token_budget - estimate_tokens(diff), 0))
 
     if not diff:
         print("[yellow]No changes to commit, please add some changes before using AI[/yellow]")
@@ -401,26 +480,77 @@ def _build_diff_for_ai(repo: git.Repo) -> str | None:
     return diff
 
 
-def _get_ai_response(diff: str, specified_type: str | None, current_branch: str) -> CommitData | None:
+def _get_ai_response(
+    diff: str,
+    specified_type: str | None,
+    current_branch: str,
+    warmup: AIClientWarmup | None = None,
+) -> tuple[CommitData | None, bool]:
     try:
-        resp = _generate_commit_with_ai(diff, specified_type, current_branch)
+        resp, secrets_listed = _generate_commit_with_ai(diff, specified_type, current_branch, warmup)
         if resp is None:
             print("[red]Failed to parse AI response[/red]")
-            return None
+            return None, False
+    except AIRequestCancelledError:
+        print("[yellow]Cancelled, no commit message was generated.[/yellow]")
+        return None, False
     except Exception as e:
         print("[red]Could not connect to AI provider[/red]")
         print(e)
+        return None, False
+    return resp, secrets_listed
+
+
+def _get_commit_cache_key(repo: git.Repo, specified_type: str | None, current_branch: str) -> dict[str, Any] | None:
+    """Key of the AI response for the staged tree, or None when the index cannot be written as a tree."""
+    try:
+        tree = repo.git.write_tree()
+    except git.GitCommandError:
         return None
-    return resp
+    model_name = settings.model or DEFAULT_MODEL
+    return CommitMessageCache.make_key(
+        tree,
+        model=model_name,
+        reasoning_effort=settings.reasoning_effort,
+        specified_type=specified_type,
+        # 渲染后的系统提示词同时覆盖模板内容和分支名
+        prompt=prompt_digest(_render_system_prompt(specified_type, current_branch)),
+        diff_token_budget=_get_diff_token_budget(model_name),
+    )
+
+
+def _get_cached_ai_response(  # noqa: PLR0913
+    repo: git.Repo,
+    diff: str,
+    specified_type: str | None,
+    current_branch: str,
+    warmup: AIClientWarmup | None = None,
+    *,
+    use_cache: bool = True,
+) -> tuple[CommitData | None, bool]:
+    """_get_ai_response, reusing the response cached for the same staged tree and request parameters."""
+    key = _get_commit_cache_key(repo, specified_type, current_branch) if use_cache else None
+    if key is None:
+        return _get_ai_response(diff, specified_type, current_branch, warmup)
+
+    cache = CommitMessageCache(Path(repo.git_dir) / CACHE_DIRNAME)
+    if (cached := cache.get(key)) is not None:
+        with contextlib.suppress(ValueError):
+            resp = CommitData.model_validate(cached)
+            print("[dim]Reusing the commit message generated for these staged changes (--no-cache to regenerate)[/dim]")
+            return resp, False
+
+    resp, secrets_listed = _get_ai_response(diff, specified_type, current_branch, warmup)
+    if resp is not None:
+        cache.put(key, resp.model_dump())
+    return resp, secrets_listed
 
 
 def _is_warning_level(level: str) -> bool:
     return level.lower() == SENSITIVITY_LEVEL_WARNING
 
 
-def _confirm_detected_secrets(secrets: list[PotentialSecret]) -> bool:
-    if not secrets:
-        return True
+def _list_detected_secrets(secrets: list[PotentialSecret]) -> None:
     warning_secrets = [secret for secret in secrets if _is_warning_level(secret.level)]
     error_secrets = [secret for secret in secrets if not _is_warning_level(secret.level)]
     if warning_secrets:
@@ -431,30 +561,43 @@ def _confirm_detected_secrets(secrets: list[PotentialSecret]) -> bool:
         print("[red]Detected potential secrets in these files:[/red]")
         for secret in error_secrets:
             print(f"[red]- {secret.file}: {secret.description}[/red]")
+
+
+def _confirm_detected_secrets(secrets: list[PotentialSecret], *, listed: bool = False) -> bool:
+    """Ask before committing flagged content; `listed` skips printing secrets already shown while streaming."""
+    if not secrets:
+        return True
+    if not listed:
+        _list_detected_secrets(secrets)
+    if any(not _is_warning_level(secret.level) for secret in secrets):
         return click.confirm("Detected potential secrets. Continue with commit?", default=False)
-    if warning_secrets:
-        return click.confirm("Detected potential sensitive key names. Continue with commit?", default=True)
-    return True
+    return click.confirm("Detected potential sensitive key names. Continue with commit?", default=True)
 
 
-def get_ai_command(specified_type: str | None = None) -> str | None:
+def get_ai_command(specified_type: str | None = None, *, use_cache: bool = True) -> str | None:
     repo = _get_repo_for_ai(Path.cwd())
     if repo is None:
         return None
-    if not _stage_all_changes_if_confirmed(repo):
-        return None
 
-    diff = _build_diff_for_ai(repo)
+    # Build the client while git collects the staged diff.
+    warmup = _start_ai_warmup()
+    # 一次 git diff 读取暂存区的文件列表、行数和补丁
+    staged = read_staged_changes(repo, _patch_limits())
+    if not staged.files:
+        if not _stage_all_changes_if_confirmed(repo):
+            return None
+        staged = read_staged_changes(repo, _patch_limits())
+    diff = _build_diff_for_ai(staged, _get_diff_token_budget(settings.model or DEFAULT_MODEL))
     if diff is None:
         return None
 
     current_branch = repo.active_branch.name
-    resp = _get_ai_response(diff, specified_type, current_branch)
+    resp, secrets_listed = _get_cached_ai_response(repo, diff, specified_type, current_branch, warmup, use_cache=use_cache)
     if resp is None:
         return None
 
     detected_secrets: list[PotentialSecret] = resp.secrets or []
-    if not _confirm_detected_secrets(detected_secrets):
+    if not _confirm_detected_secrets(detected_secrets, listed=secrets_listed):
         print("[yellow]Commit aborted. Please review sensitive content.[/yellow]")
         return None
 
@@ -475,15 +618,17 @@ def get_ai_command(specified_type: str | None = None) -> str | None:
 @EMOJI_OPT
 @BREAKING_OPT
 @AI_OPT
+@NO_CACHE_OPT
 def commit(
     *,
     message: tuple[str, ...],
     emoji: bool,
     breaking: bool,
     ai: bool,
+    no_cache: bool,
 ) -> None:
     """Commit changes to the Git repository. Supports AI-generated commit messages or manual type/scope/message specification."""
-    args = CommitArgs(message=list(message), emoji=emoji, breaking=breaking, ai=ai)
+    args = CommitArgs(message=list(message), emoji=emoji, breaking=breaking, ai=ai, no_cache=no_cache)
     handle_commit(args)
 
 
@@ -492,7 +637,7 @@ def handle_commit(args: CommitArgs) -> None:
 
     if args.ai or len(args.message) == 0:
         # 如果明确指定使用 AI
-        command = get_ai_command()
+        command = get_ai_command(use_cache=not args.no_cache)
         if not command:
             return
     elif len(args.message) == 1:
@@ -504,7 +649,7 @@ def handle_commit(args: CommitArgs) -> None:
             return
 
         # 使用 AI 生成提交信息，但保留用户指定的类型
-        command = get_ai_command(specified_type=commit_type)
+        command = get_ai_command(specified_type=commit_type, use_cache=not args.no_cache)
         if not command:
             return
     else:
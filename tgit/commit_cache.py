@@ -0,0 +1,75 @@
+"""On-disk cache of AI commit messages keyed by the staged tree, so a repeated `tgit commit` skips the provider."""
+
+import contextlib
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+from tgit.utils import write_cache_file
+
+CACHE_DIRNAME = Path("tgit-cache") / "commit"
+# 修改键或值的格式时递增，旧条目随之失效
+CACHE_FORMAT_VERSION = 1
+MAX_CACHE_BYTES = 1 << 20
+
+
+def prompt_digest(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class CommitMessageCache:
+    """
+    AI responses stored as one JSON file per key, named by the SHA-256 of the key.
+
+    Reads refresh an entry's modification time; writes evict the least recently used entries
+    until the directory is back under `max_bytes`.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = MAX_CACHE_BYTES) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(tree: str, **params: Any) -> dict[str, Any]:  # noqa: ANN401
+        """The cache key for the staged `tree` and the request parameters that shape the response."""
+        return {"version": CACHE_FORMAT_VERSION, "tree": tree, **params}
+
+    def _entry_path(self, key: dict[str, Any]) -> Path:
+        digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def get(self, key: dict[str, Any]) -> dict[str, Any] | None:
+        path = self._entry_path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("key") != key or not isinstance(entry.get("value"), dict):
+            return None
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return entry["value"]
+
+    def put(self, key: dict[str, Any], value: dict[str, Any]) -> None:
+        if write_cache_file(self._entry_path(key), {"key": key, "value": value}):
+            self.evict()
+
+    def evict(self) -> int:
+        """Delete the least recently used entries until the cache fits in `max_bytes`; returns how many were removed."""
+        entries = []
+        for path in self.directory.glob("*.json"):
+            with contextlib.suppress(OSError):
+                stat = path.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            with contextlib.suppress(OSError):
+                path.unlink()
+                removed += 1
+            total -= size
+        return removed
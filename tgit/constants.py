@@ -3,3 +3,6 @@
 DEFAULT_MODEL = "gpt-5.4-mini"
 REASONING_MODEL_HINTS = ("-reasoning", "o1", "o3", "gpt-5")
 REASONING_EFFORT_CHOICES = ("none", "minimal", "low", "medium", "high", "xhigh")
+# Diff token budget of the AI commit prompt by model prefix, checked in order; other models get the default
+DIFF_TOKEN_BUDGETS = (("gpt-5.4-nano", 16_000), ("gpt-5.4-mini", 32_000), ("gpt-5", 48_000))
+DEFAULT_DIFF_TOKEN_BUDGET = 24_000
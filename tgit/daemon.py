@@ -0,0 +1,238 @@
+import contextlib
+import importlib
+import os
+import signal
+import socket
+import sys
+import traceback
+from pathlib import Path
+from typing import NoReturn
+
+import click
+import rich
+
+from tgit.client import FORWARDED_FDS, get_build_id, get_socket_path, receive_message, send_message
+from tgit.utils import console
+
+# Imported once in the daemon so that forwarded commands start with them already loaded.
+PRELOADED_MODULES = (
+    "git",
+    "jinja2",
+    "pydantic",
+    "questionary",
+    "rich.markdown",
+    "rich.syntax",
+    "openai",
+    "tgit.interactive_settings",
+)
+LISTEN_BACKLOG = 64
+
+
+def preload() -> None:
+    """Import every subcommand and the heavy third-party modules they use."""
+    from tgit.cli import LAZY_SUBCOMMANDS, app  # noqa: PLC0415
+
+    ctx = click.Context(app)
+    for name in LAZY_SUBCOMMANDS:
+        app.get_command(ctx, name)
+    for module_name in PRELOADED_MODULES:
+        with contextlib.suppress(ImportError):
+            importlib.import_module(module_name)
+
+
+def _is_listening(socket_path: Path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(str(socket_path))
+        except OSError:
+            return False
+    return True
+
+
+def _invoke_app(argv: list[str]) -> int:
+    from tgit.cli import app  # noqa: PLC0415
+
+    try:
+        app.main(args=argv, prog_name="tgit", standalone_mode=True)
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        sys.stderr.write(f"{e.code}\n")
+        return 1
+    return 0
+
+
+def _prepare_forwarded_process(request: dict, fds: list[int]) -> None:
+    """Turn a freshly forked child into a stand-in for the client process."""
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    for target, fd in zip(FORWARDED_FDS, fds, strict=True):
+        os.dup2(fd, target)
+        os.close(fd)
+    os.chdir(request["cwd"])
+    os.environ.clear()
+    os.environ.update(request["env"])
+    # The shared console detected colours and size for the daemon's own stdout.
+    rich.reconfigure()
+
+    # Settings depend on the working directory, so they are re-read for every request.
+    from tgit.shared import reload_settings  # noqa: PLC0415
+
+    reload_settings()
+    if commit_module := sys.modules.get("tgit.commit"):
+        commit_module.register_custom_commit_types()
+
+
+def _run_forwarded(conn: socket.socket, request: dict, fds: list[int]) -> NoReturn:
+    exit_code = 1
+    try:
+        _prepare_forwarded_process(request, fds)
+        send_message(conn, {"pid": os.getpid()})
+        exit_code = _invoke_app(request["argv"])
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            with contextlib.suppress(Exception):
+                stream.flush()
+        with contextlib.suppress(OSError):
+            send_message(conn, {"exit": exit_code})
+        os._exit(exit_code)
+
+
+def _handle_connection(server: socket.socket, conn: socket.socket, build_id: str) -> bool:
+    """Serve one client connection; returns False when the daemon should stop."""
+    request, fds = receive_message(conn, maxfds=len(FORWARDED_FDS))
+    try:
+        if request is None:
+            return True
+        control = request.get("control")
+        if control == "status":
+            send_message(conn, {"daemon_pid": os.getpid(), "build": build_id})
+            return True
+        if control == "stop":
+            send_message(conn, {"stopping": True})
+            return False
+        if request.get("build") != build_id or len(fds) != len(FORWARDED_FDS):
+            send_message(conn, {"error": "incompatible client"})
+            return True
+
+        if os.fork() == 0:
+            server.close()
+            _run_forwarded(conn, request, fds)
+    finally:
+        for fd in fds:
+            with contextlib.suppress(OSError):
+                os.close(fd)
+    return True
+
+
+def serve(socket_path: Path) -> None:
+    """Listen on `socket_path` and run each forwarded command in a fork of this warm process."""
+    if _is_listening(socket_path):
+        msg = f"A tgit daemon is already listening on {socket_path}"
+        raise click.ClickException(msg)
+
+    preload()
+    build_id = get_build_id()
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    with contextlib.suppress(FileNotFoundError):
+        socket_path.unlink()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(socket_path))
+    socket_path.chmod(0o600)
+    server.listen(LISTEN_BACKLOG)
+    # Let the kernel reap finished commands; exit codes travel back over the socket instead.
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                if not _handle_connection(server, conn, build_id):
+                    break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        with contextlib.suppress(FileNotFoundError):
+            socket_path.unlink()
+
+
+def _send_control(socket_path: Path, control: str) -> dict | None:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_path))
+            send_message(sock, {"control": control})
+            reply, _ = receive_message(sock)
+        except OSError:
+            return None
+    return reply
+
+
+def _detach() -> bool:
+    """Fork into a background session; returns True in the original process."""
+    if os.fork() != 0:
+        return True
+    os.setsid()
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in FORWARDED_FDS:
+        os.dup2(devnull, fd)
+    os.close(devnull)
+    return False
+
+
+def _require_posix() -> None:
+    if not hasattr(os, "fork") or not hasattr(socket, "send_fds"):
+        msg = "tgit daemon requires a POSIX system with Unix domain sockets"
+        raise click.ClickException(msg)
+
+
+@click.group()
+def daemon() -> None:
+    """Keep a warm tgit process running so that later invocations skip startup."""
+
+
+@daemon.command("start")
+@click.option("-d", "--detach", is_flag=True, help="run the daemon in the background")
+def start(*, detach: bool) -> None:
+    """Start serving forwarded tgit commands on the daemon socket."""
+    _require_posix()
+    socket_path = get_socket_path()
+    if detach:
+        if _detach():
+            console.print(f"[green]tgit daemon starting on {socket_path}[/green]")
+            return
+        try:
+            serve(socket_path)
+        finally:
+            os._exit(0)
+    console.print(f"[green]tgit daemon listening on {socket_path}[/green]")
+    serve(socket_path)
+
+
+@daemon.command("stop")
+def stop() -> None:
+    """Stop the running daemon."""
+    _require_posix()
+    if _send_control(get_socket_path(), "stop") is None:
+        console.print("[yellow]No tgit daemon is running.[/yellow]")
+        return
+    console.print("[green]tgit daemon stopped.[/green]")
+
+
+@daemon.command("status")
+def status() -> None:
+    """Show whether a daemon is running and whether it serves the installed build."""
+    _require_posix()
+    reply = _send_control(get_socket_path(), "status")
+    if reply is None:
+        console.print("[yellow]No tgit daemon is running.[/yellow]")
+        return
+    console.print(f"tgit daemon running with pid [cyan bold]{reply.get('daemon_pid')}[/cyan bold]")
+    if reply.get("build") != get_build_id():
+        console.print("[yellow]The daemon serves an older build; restart it to pick up the installed version.[/yellow]")
@@ -0,0 +1,118 @@
+"""Fit the staged diff shown to the AI into a token budget, keeping the most informative files in full."""
+
+from dataclasses import dataclass, field
+from pathlib import PurePosixPath
+
+from tgit.staged import StagedFile
+
+# 没有分词器时按每个 token 约 4 个字符估算
+CHARS_PER_TOKEN = 4
+
+SOURCE_FILE = 0
+TEST_FILE = 1
+GENERATED_FILE = 2
+
+TEST_DIRS = frozenset({"test", "tests", "__tests__", "spec", "specs"})
+GENERATED_DIRS = frozenset({"dist", "build", "vendor", "node_modules", "generated", "__generated__", "__snapshots__"})
+GENERATED_SUFFIXES = (".min.js", ".min.css", ".map", ".snap", "_pb2.py", "_pb2.pyi", ".pb.go", ".g.dart", ".designer.cs")
+GENERATED_MARKERS = ("@generated", "DO NOT EDIT")
+# 只在补丁开头查找生成文件标记
+GENERATED_MARKER_SCAN_CHARS = 2000
+
+# Detail levels of one file in the prompt, from the whole patch down to a single line
+FULL_DIFF = 0
+REDUCED_CONTEXT = 1
+STAT_LINE = 2
+
+REDUCED_CONTEXT_NOTICE = "[INFO] Unchanged context lines omitted from this file diff.\n"
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def classify_file(staged_file: StagedFile) -> int:
+    """SOURCE_FILE, TEST_FILE or GENERATED_FILE, judged by the path and the start of the patch."""
+    path = PurePosixPath(staged_file.path)
+    name = path.name
+    if (
+        GENERATED_DIRS.intersection(path.parts[:-1])
+        or name.endswith(GENERATED_SUFFIXES)
+        or any(marker in staged_file.patch[:GENERATED_MARKER_SCAN_CHARS] for marker in GENERATED_MARKERS)
+    ):
+        return GENERATED_FILE
+    stem = name.split(".", 1)[0]
+    if (
+        TEST_DIRS.intersection(path.parts[:-1])
+        or stem.startswith("test_")
+        or stem.endswith(("_test", "_spec"))
+        or ".test." in name
+        or ".spec." in name
+        or name == "conftest.py"
+    ):
+        return TEST_FILE
+    return SOURCE_FILE
+
+
+def file_priority(staged_file: StagedFile) -> tuple[int, int, str]:
+    """Sort key: source before tests before generated files, then the largest changes first."""
+    return classify_file(staged_file), -staged_file.changed_lines, staged_file.path
+
+
+def reduce_context(diff: str) -> str:
+    """The diff without its unchanged context lines; headers, hunk headers and changed lines are kept."""
+    return "".join(line for line in diff.splitlines(keepends=True) if not line.startswith(" ")) + REDUCED_CONTEXT_NOTICE
+
+
+def stat_line(staged_file: StagedFile) -> str:
+    path = f"{staged_file.old_path} -> {staged_file.path}" if staged_file.old_path is not None else staged_file.path
+    if staged_file.added is None:
+        return f"[INFO] Diff omitted for {path} ({staged_file.status[:1]}, binary)\n"
+    return f"[INFO] Diff omitted for {path} ({staged_file.status[:1]}, +{staged_file.added} -{staged_file.deleted})\n"
+
+
+def omitted_files_notice(count: int) -> str:
+    return f"[INFO] {count} more staged file(s) omitted to fit the prompt budget.\n" if count else ""
+
+
+@dataclass(slots=True)
+class _BudgetedFile:
+    texts: tuple[str, str, str]
+    costs: tuple[int, int, int] = field(init=False)
+    level: int = FULL_DIFF
+
+    def __post_init__(self) -> None:
+        self.costs = (estimate_tokens(self.texts[0]), estimate_tokens(self.texts[1]), estimate_tokens(self.texts[2]))
+
+    @property
+    def cost(self) -> int:
+        return self.costs[self.level]
+
+
+def fit_diff_to_budget(diffs: list[tuple[StagedFile, str]], budget: int) -> str:
+    """
+    Join the per-file diffs, ordered by file_priority, into at most `budget` estimated tokens.
+
+    While over budget, files lose detail from the lowest priority up: first every file drops its context
+    lines, then files shrink to a stat line, and finally the remaining stat lines are cut and counted.
+    """
+    ordered = sorted(diffs, key=lambda item: file_priority(item[0]))
+    files = [_BudgetedFile((diff, reduce_context(diff), stat_line(staged_file))) for staged_file, diff in ordered]
+    total = sum(budgeted.cost for budgeted in files)
+    for level in (REDUCED_CONTEXT, STAT_LINE):
+        for budgeted in reversed(files):
+            if total <= budget:
+                break
+            # 降级后没有变小的就保留原样
+            if budgeted.costs[level] < budgeted.cost:
+                total += budgeted.costs[level] - budgeted.cost
+                budgeted.level = level
+
+    omitted = 0
+    while files and total + estimate_tokens(omitted_files_notice(omitted)) > budget:
+        total -= files.pop().cost
+        omitted += 1
+    notice = omitted_files_notice(omitted)
+    if estimate_tokens(notice) > budget:
+        notice = ""
+    return "".join(budgeted.texts[budgeted.level] for budgeted in files) + notice
@@ -0,0 +1,146 @@
+"""Streaming `git log` reader that yields lightweight commit records."""
+
+import re
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from typing import NamedTuple
+
+import git
+
+FIELD_SEPARATOR = "\x1f"
+TRAILER_SEPARATOR = "\x1e"
+# Starts each commit header when file names follow it in the same `git log -z --name-only` output.
+COMMIT_MARKER = "\x1d"
+RECORD_SEPARATOR = b"\x00"
+# hash, short hash, parents, author name, author email, committer date (strict ISO 8601), Co-authored-by trailer
+# values, subject; the body itself is never read. The subject comes last so nothing in it can shift the fields.
+LOG_FORMAT = "%H%x1f%h%x1f%P%x1f%an%x1f%ae%x1f%cI%x1f%(trailers:key=Co-authored-by,valueonly,separator=%x1e)%x1f%s"
+LOG_FIELD_COUNT = 8
+READ_CHUNK_SIZE = 1 << 16
+
+
+class CommitAuthor(NamedTuple):
+    name: str
+    email: str
+
+
+class CommitRecord(NamedTuple):
+    """The subset of a commit that changelog and version bumping need, parsed from one `git log` line."""
+
+    hexsha: str
+    short_hash: str
+    parents: tuple[str, ...]
+    author: CommitAuthor
+    committed_datetime: datetime
+    subject: str
+    co_authors: tuple[CommitAuthor, ...] = ()
+    paths: tuple[str, ...] = ()
+
+
+trailer_author_pattern = re.compile(r"(?P<name>.+?) <(?P<email>.+?)>")
+
+
+def parse_trailer_authors(values: str) -> tuple[CommitAuthor, ...]:
+    """Authors from `Name <email>` trailer values separated by TRAILER_SEPARATOR; values without an email are skipped."""
+    if not values:
+        return ()
+    matches = (trailer_author_pattern.match(value.strip()) for value in values.split(TRAILER_SEPARATOR))
+    return tuple(CommitAuthor(m["name"], m["email"]) for m in matches if m)
+
+
+def parse_commit_record(raw: bytes, paths: Iterable[str] = ()) -> CommitRecord:
+    fields = raw.decode("utf-8", errors="replace").split(FIELD_SEPARATOR, LOG_FIELD_COUNT - 1)
+    if len(fields) != LOG_FIELD_COUNT:
+        msg = f"Unexpected git log record: {raw[:80]!r}"
+        raise ValueError(msg)
+    hexsha, short_hash, parents, author_name, author_email, date, co_authors, subject = fields
+    return CommitRecord(
+        hexsha=hexsha,
+        short_hash=short_hash,
+        parents=tuple(parents.split()),
+        author=CommitAuthor(author_name, author_email),
+        committed_datetime=datetime.fromisoformat(date),
+        subject=subject.rstrip("\n"),
+        co_authors=parse_trailer_authors(co_authors),
+        paths=tuple(paths),
+    )
+
+
+def _iter_log_tokens(repo: git.Repo, *log_args: str) -> Iterator[bytes]:
+    """
+    NUL-separated tokens of a single `git log -z` process, read as the output arrives.
+
+    Memory stays bounded by one read chunk plus the token being parsed, whatever the size of the range.
+    """
+    process = repo.git.log("-z", *log_args, "--", as_process=True)
+    stdout = process.proc.stdout
+    finished = False
+    try:
+        pending = b""
+        while chunk := stdout.read(READ_CHUNK_SIZE):
+            pending += chunk
+            *tokens, pending = pending.split(RECORD_SEPARATOR)
+            yield from (token for token in tokens if token)
+        if pending.strip():
+            yield pending
+        finished = True
+    finally:
+        if finished:
+            # Raises GitCommandError for bad revisions, like iter_commits would.
+            process.wait()
+        else:
+            process.proc.kill()
+            process.proc.wait()
+        stdout.close()
+
+
+def iter_commit_records(repo: git.Repo, *rev_args: str, name_only: bool = False) -> Iterator[CommitRecord]:
+    """
+    Yield commits for `rev_args` from a single streaming `git log -z` process.
+
+    With `name_only`, each record also carries the paths the commit touched, from the same process.
+    """
+    if not name_only:
+        tokens = _iter_log_tokens(repo, f"--format={LOG_FORMAT}", *rev_args)
+        try:
+            yield from (parse_commit_record(raw) for raw in tokens)
+        finally:
+            tokens.close()
+        return
+    # 文件名与提交头同样以 NUL 分隔，提交头以 COMMIT_MARKER 开头以便区分
+    tokens = _iter_log_tokens(repo, "--name-only", f"--format={COMMIT_MARKER}{LOG_FORMAT}", *rev_args)
+    header: bytes | None = None
+    paths: list[str] = []
+    try:
+        for token in tokens:
+            if token.startswith(COMMIT_MARKER.encode()):
+                if header is not None:
+                    yield parse_commit_record(header, paths)
+                header, paths = token[1:], []
+            else:
+                paths.append(token.lstrip(b"\n").decode("utf-8", errors="replace"))
+        if header is not None:
+            yield parse_commit_record(header, paths)
+    finally:
+        tokens.close()
+
+
+def iter_merge_titles(repo: git.Repo, *rev_args: str) -> Iterator[tuple[str, str]]:
+    """
+    Yield (sha, title) for the merge commits of `rev_args` whose body has a title line.
+
+    GitHub and GitLab put the pull request title in the body of the merge commit, under the
+    generic `Merge pull request ...` subject.
+    """
+    output = repo.git.log("-z", "--merges", "--format=%H%x1f%b", *rev_args, "--")
+    for raw in output.split("\0"):
+        sha, _, body = raw.partition(FIELD_SEPARATOR)
+        if title := next((line.strip() for line in body.splitlines() if line.strip()), ""):
+            yield sha.strip(), title
+
+
+def iter_commit_parents(repo: git.Repo, *rev_args: str) -> Iterator[tuple[str, tuple[str, ...]]]:
+    """Yield (sha, parents) pairs from `git rev-list --parents` without reading commit messages."""
+    for line in repo.git.rev_list("--parents", *rev_args).splitlines():
+        sha, *parents = line.split()
+        yield sha, tuple(parents)
@@ -0,0 +1,182 @@
+"""Opt-in SQLite index of conventional-commit facts, updated incrementally from HEAD."""
+
+import contextlib
+import json
+import sqlite3
+import threading
+from collections.abc import Iterable, Sequence
+from datetime import datetime
+from pathlib import Path
+
+import git
+
+from tgit.changelog import FIRST_PARENT_ARGS, TGITCommit, intern_authors, parse_commit_subject
+from tgit.gitlog import CommitRecord, iter_commit_records
+from tgit.repo_cache import repo_cached
+
+INDEX_FILENAME = "tgit-index.sqlite"
+# Bump when the schema or the way messages are parsed changes; older indexes are rebuilt.
+SCHEMA_VERSION = "2"
+# Stay well below SQLite's limit on bound parameters per statement.
+QUERY_BATCH_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS commits (
+    sha TEXT PRIMARY KEY,
+    short_hash TEXT NOT NULL,
+    parents TEXT NOT NULL,
+    author_name TEXT NOT NULL,
+    author_email TEXT NOT NULL,
+    co_authors TEXT NOT NULL,
+    committed_at TEXT NOT NULL,
+    emoji TEXT,
+    type TEXT,
+    scope TEXT,
+    description TEXT,
+    breaking INTEGER NOT NULL
+);
+"""
+
+
+def _commit_row(record: CommitRecord) -> tuple:
+    message_dict = parse_commit_subject(record.subject) or {}
+    return (
+        record.hexsha,
+        record.short_hash,
+        " ".join(record.parents),
+        record.author.name,
+        record.author.email,
+        json.dumps([co_author._asdict() for co_author in record.co_authors], ensure_ascii=False),
+        record.committed_datetime.isoformat(),
+        message_dict.get("emoji"),
+        message_dict.get("type"),
+        message_dict.get("scope"),
+        message_dict.get("description"),
+        int(bool(message_dict.get("breaking"))),
+    )
+
+
+def _row_to_commit(row: sqlite3.Row) -> TGITCommit:
+    co_authors = [(co_author["name"], co_author["email"]) for co_author in json.loads(row["co_authors"])]
+    authors = intern_authors(((row["author_name"], row["author_email"]), *co_authors))
+    return TGITCommit(
+        row["short_hash"],
+        datetime.fromisoformat(row["committed_at"]),
+        authors,
+        {key: row[key] for key in ("emoji", "type", "scope", "description", "breaking")},
+    )
+
+
+class HistoryIndex:
+    """Commit facts keyed by sha; segment membership still comes from git, the facts from SQLite."""
+
+    def __init__(self, repo: git.Repo, path: Path) -> None:
+        self.repo = repo
+        self.path = path
+        # The connection is shared by the --jobs worker threads, serialised by the lock.
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(SCHEMA)
+        if self._get_meta("schema_version") != SCHEMA_VERSION:
+            self._reset()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _get_meta(self, key: str) -> str | None:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _reset(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM commits")
+            self._conn.execute("DELETE FROM meta")
+            self._set_meta("schema_version", SCHEMA_VERSION)
+
+    def _is_reachable(self, sha: str, head: str) -> bool:
+        try:
+            self.repo.git.merge_base("--is-ancestor", sha, head)
+        except git.GitCommandError:
+            return False
+        return True
+
+    def add_records(self, records: Iterable[CommitRecord]) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.executemany(
+                "INSERT OR IGNORE INTO commits VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (_commit_row(record) for record in records),
+            )
+        return cursor.rowcount
+
+    def update(self) -> int:
+        """Index commits added since the last run; a stored tip no longer reachable from HEAD means history was rewritten."""
+        try:
+            head = self.repo.git.rev_parse("HEAD")
+        except git.GitCommandError:
+            # 空仓库没有 HEAD
+            return 0
+        tip = self._get_meta("tip")
+        if tip == head:
+            return 0
+        if tip is not None and not self._is_reachable(tip, head):
+            self._reset()
+            tip = None
+        rev_args = [head, f"^{tip}"] if tip else [head]
+        added = self.add_records(iter_commit_records(self.repo, *rev_args))
+        with self._lock, self._conn:
+            self._set_meta("tip", head)
+        return added
+
+    def _query(self, shas: list[str]) -> dict[str, sqlite3.Row]:
+        rows: dict[str, sqlite3.Row] = {}
+        with self._lock:
+            for start in range(0, len(shas), QUERY_BATCH_SIZE):
+                batch = shas[start : start + QUERY_BATCH_SIZE]
+                placeholders = ", ".join("?" * len(batch))
+                for row in self._conn.execute(f"SELECT * FROM commits WHERE sha IN ({placeholders})", batch):  # noqa: S608
+                    rows[row["sha"]] = row
+        return rows
+
+    def commits_for_hashes(self, shas: list[str], rev_args: Sequence[str] = ()) -> list[TGITCommit]:
+        """
+        Conventional commits among `shas`, in the given order.
+
+        Commits missing from the index, such as ones reachable only from tags, are indexed from `rev_args` first.
+        """
+        rows = self._query(shas)
+        if rev_args and len(rows) < len(shas):
+            self.add_records(iter_commit_records(self.repo, *rev_args))
+            rows = self._query(shas)
+        return [_row_to_commit(row) for sha in shas if (row := rows.get(sha)) is not None and row["type"]]
+
+    def commits_in_range(self, *rev_args: str, first_parent: bool = False) -> list[TGITCommit]:
+        """Conventional commits of `rev_args`, e.g. segment_rev_args, in `git rev-list` order."""
+        walk_args = (*FIRST_PARENT_ARGS, *rev_args) if first_parent else rev_args
+        return self.commits_for_hashes(self.repo.git.rev_list(*walk_args).split(), rev_args)
+
+
+def open_history_index(repo: git.Repo) -> HistoryIndex | None:
+    """The up-to-date index for `repo`, opened once per process; None when SQLite cannot open or update it."""
+
+    def open_index() -> HistoryIndex | None:
+        try:
+            index = HistoryIndex(repo, Path(repo.git_dir) / INDEX_FILENAME)
+        except sqlite3.Error:
+            return None
+        try:
+            index.update()
+        except sqlite3.Error:
+            with contextlib.suppress(sqlite3.Error):
+                index.close()
+            return None
+        return index
+
+    return repo_cached(repo, "history_index", open_index)
@@ -15,6 +15,8 @@ WORKSPACE_BOOL_INHERIT = "inherit"
 WORKSPACE_BOOL_TRUE = "true"
 WORKSPACE_BOOL_FALSE = "false"
 WORKSPACE_PROMPT_CANCEL = object()
+# Settings without a prompt, carried over when the global settings are saved
+UNPROMPTED_SETTINGS = ("history_index", "diff_token_budget", "diff_token_budgets", "stream")
 
 
 def _get_global_settings_path() -> Path:
@@ -168,6 +170,9 @@ def _configure_global_settings() -> None:  # noqa: C901, PLR0911
         },
     }
 
+    # Keep settings that have no prompt
+    new_settings.update({key: current_settings[key] for key in UNPROMPTED_SETTINGS if key in current_settings})
+
     # Remove empty values
     if not new_settings["apiUrl"]:
         del new_settings["apiUrl"]
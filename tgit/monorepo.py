@@ -0,0 +1,134 @@
+"""Per-package changelogs for monorepos, generated from a single pass over history."""
+
+from collections import defaultdict
+from pathlib import Path
+
+import git
+from rich import print
+
+from tgit.changelog import (
+    ChangelogArgs,
+    FileChangelogWriter,
+    PrependChangelogWriter,
+    TGITCommit,
+    _get_range_segments,
+    _get_remote_uri_safe,
+    bucket_records_by_segment,
+    extract_latest_tag_from_changelog,
+    generate_changelog,
+    group_commits_by_type,
+    iter_tgit_commits,
+    prepare_changelog_segments,
+    write_changelog,
+)
+from tgit.gitlog import CommitRecord
+from tgit.version import get_detected_files
+
+DEFAULT_CHANGELOG_NAME = "CHANGELOG.md"
+
+
+class _TrieNode:
+    __slots__ = ("children", "package")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.package: str | None = None
+
+
+class PackageTrie:
+    """Maps repository paths to the innermost package directory containing them, one path component per level."""
+
+    def __init__(self, packages: list[str] | None = None) -> None:
+        self.root = _TrieNode()
+        for package in packages or []:
+            self.add(package)
+
+    def add(self, package: str) -> None:
+        node = self.root
+        for part in package.split("/"):
+            node = node.children.setdefault(part, _TrieNode())
+        node.package = package
+
+    def match(self, path: str) -> str | None:
+        """The deepest package that `path` lies in, or None for paths outside every package."""
+        node = self.root
+        package = None
+        for part in path.split("/"):
+            if (node := node.children.get(part)) is None:
+                break
+            if node.package is not None:
+                package = node.package
+        return package
+
+
+def detect_packages(repo: git.Repo) -> list[str]:
+    """Package directories relative to the repository root, i.e. where `tgit version -r` finds version files."""
+    root = Path(repo.working_tree_dir or ".").resolve()
+    directories = {file.parent.relative_to(root).as_posix() for file in get_detected_files(str(root))}
+    # 根目录由普通的 changelog 负责
+    directories.discard(".")
+    return sorted(directories)
+
+
+def bucket_commits_by_package(records: list[CommitRecord], trie: PackageTrie) -> dict[str, list[TGITCommit]]:
+    """Conventional commits of one segment grouped by every package their touched paths fall in."""
+    commits_by_package: defaultdict[str, list[TGITCommit]] = defaultdict(list)
+    for record in records:
+        packages = {package for path in record.paths if (package := trie.match(path)) is not None}
+        if not packages:
+            continue
+        for commit in iter_tgit_commits([record]):
+            for package in packages:
+                commits_by_package[package].append(commit)
+    return commits_by_package
+
+
+def handle_package_changelogs(args: ChangelogArgs, current_tag: str | None = None) -> None:
+    """
+    Write `CHANGELOG.md` (or the `--output` file name) in every package directory.
+
+    History is walked once with `--name-only` for the versions the most outdated package still misses;
+    each package then gets the versions newer than the latest one already in its own file.
+    """
+    repo = git.Repo(args.path)
+    root = Path(repo.working_tree_dir or args.path)
+    packages = detect_packages(repo)
+    if not packages:
+        print("[yellow]No packages found, nothing to output.[/yellow]")
+        return
+    filename = Path(args.output).name if args.output else DEFAULT_CHANGELOG_NAME
+    changelog_paths = {package: root / package / filename for package in packages}
+
+    if args.from_raw is not None or args.to_raw is not None:
+        segments = _get_range_segments(repo, args.from_raw, args.to_raw)
+        wanted = dict.fromkeys(packages, len(segments))
+        latest_tags: dict[str, str | None] = dict.fromkeys(packages)
+    else:
+        segments = prepare_changelog_segments(repo, None, current_tag)
+        latest_tags = {package: extract_latest_tag_from_changelog(str(path)) for package, path in changelog_paths.items()}
+        # 分段按从新到旧排列，每个包只需要比自己文件中最新版本更新的那部分
+        names = [segment.to_name for segment in segments]
+        wanted = {package: names.index(tag) if tag in names else len(segments) for package, tag in latest_tags.items()}
+    segments = segments[: max(wanted.values(), default=0)]
+    if not segments:
+        print("[green]Changelogs are already up to date.[/green]")
+        return
+
+    trie = PackageTrie(packages)
+    remote_uri = _get_remote_uri_safe(repo)
+    buckets = bucket_records_by_segment(repo, segments, args.traversal, name_only=True)
+    changelogs: defaultdict[str, list[str]] = defaultdict(list)
+    for position, (segment, records) in enumerate(zip(segments, buckets, strict=True)):
+        for package, commits in bucket_commits_by_package(records, trie).items():
+            if position < wanted[package]:
+                commits_by_type = group_commits_by_type(commits)
+                changelogs[package].append(generate_changelog(commits_by_type, segment.from_name, segment.to_name, remote_uri))
+
+    for package in packages:
+        path = changelog_paths[package]
+        if not changelogs[package]:
+            print(f"[dim]{package}: up to date[/dim]")
+            continue
+        writer = PrependChangelogWriter(str(path)) if latest_tags[package] else FileChangelogWriter(str(path))
+        write_changelog(changelogs[package], [writer])
+        print(f"[green]{package}[/green]: {len(changelogs[package])} version(s) written to {path.relative_to(root)}")
@@ -0,0 +1,94 @@
+"""Incremental parsing of one streamed JSON object, field by field."""
+
+import json
+from typing import Any
+
+# 未闭合的字符串最多回退这么多个字符，以跳过被截断的转义序列（如 \u00e9）
+MAX_ESCAPE_CHARS = 6
+
+
+class PartialObjectParser:
+    """
+    Reads a JSON object from text fed in arbitrary pieces and reports each top-level field once its value is complete.
+
+    Strings, arrays and objects are complete at their closing character, so a field is reported without
+    waiting for the comma after it; numbers and literals are complete at the next `,` or `}`.
+    """
+
+    def __init__(self) -> None:
+        self.buffer = ""
+        self.fields: dict[str, Any] = {}
+        self._position = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._segment_start: int | None = None
+        self._key: str | None = None
+        self._value_start: int | None = None
+
+    def feed(self, text: str) -> list[tuple[str, Any]]:
+        """Add `text` and return the fields completed by it, in order."""
+        self.buffer += text
+        completed: list[tuple[str, Any]] = []
+        for position in range(self._position, len(self.buffer)):
+            if self._in_string:
+                self._feed_string_char(position, completed)
+            else:
+                self._feed_structural_char(position, completed)
+        self._position = len(self.buffer)
+        return completed
+
+    def _feed_string_char(self, position: int, completed: list[tuple[str, Any]]) -> None:
+        """Track escapes inside a string; a top-level string value is complete at its closing quote."""
+        char = self.buffer[position]
+        if self._escaped:
+            self._escaped = False
+        elif char == "\\":
+            self._escaped = True
+        elif char == '"':
+            self._in_string = False
+            if self._depth == 1:
+                self._complete(position + 1, completed)
+
+    def _feed_structural_char(self, position: int, completed: list[tuple[str, Any]]) -> None:
+        """Track nesting, keys and separators outside strings."""
+        char = self.buffer[position]
+        if char == '"':
+            self._in_string = True
+        elif char in "{[":
+            self._depth += 1
+            if self._depth == 1:
+                self._segment_start = position + 1
+        elif char in "}]":
+            self._depth -= 1
+            if self._depth == 1:
+                self._complete(position + 1, completed)
+            elif self._depth == 0:
+                self._complete(position, completed)
+        elif self._depth == 1 and char == ":":
+            self._key = json.loads(self.buffer[self._segment_start : position])
+            self._value_start = position + 1
+        elif self._depth == 1 and char == ",":
+            self._complete(position, completed)
+            self._segment_start = position + 1
+
+    def _complete(self, end: int, completed: list[tuple[str, Any]]) -> None:
+        if self._key is None or self._value_start is None:
+            return
+        value = json.loads(self.buffer[self._value_start : end])
+        self.fields[self._key] = value
+        completed.append((self._key, value))
+        self._key = None
+        self._value_start = None
+
+    def partial_string(self) -> tuple[str, str] | None:
+        """The key and the text so far of a top-level string value that is still being streamed."""
+        if not (self._in_string and self._depth == 1 and self._key is not None and self._value_start is not None):
+            return None
+        raw = self.buffer[self._value_start :].lstrip()
+        for cut in range(min(MAX_ESCAPE_CHARS, len(raw)) + 1):
+            try:
+                return self._key, json.loads(raw[: len(raw) - cut] + '"')
+            except ValueError:
+                continue
+        return None
@@ -0,0 +1,26 @@
+"""Per-process memo for repository metadata that several commands look up repeatedly."""
+
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+import git
+
+T = TypeVar("T")
+
+_repo_caches: dict[str, dict[str, Any]] = {}
+
+
+def repo_cached(repo: git.Repo, key: str, compute: Callable[[], T]) -> T:
+    """Return the value stored under `key` for `repo`, computing it on first use."""
+    cache = _repo_caches.setdefault(str(repo.git_dir), {})
+    if key not in cache:
+        cache[key] = compute()
+    return cache[key]
+
+
+def clear_repo_cache(repo: git.Repo | None = None) -> None:
+    """Forget cached metadata for `repo`, or for every repository when omitted."""
+    if repo is None:
+        _repo_caches.clear()
+    else:
+        _repo_caches.pop(str(repo.git_dir), None)
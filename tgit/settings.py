@@ -1,3 +1,6 @@
+from collections.abc import Callable
+from typing import Any
+
 import click
 from rich import print
 
@@ -5,6 +8,50 @@ from tgit.constants import REASONING_EFFORT_CHOICES
 from tgit.utils import set_global_settings
 
 
+def _parse_text(_key: str, value: str) -> str:
+    return value
+
+
+def _parse_bool(key: str, value: str) -> bool:
+    if value.lower() in ["true", "1", "yes", "on"]:
+        return True
+    if value.lower() in ["false", "0", "no", "off"]:
+        return False
+    print(f"Invalid boolean value for {key}. Use true/false, 1/0, yes/no, or on/off")
+    raise click.Abort
+
+
+def _parse_token_count(key: str, value: str) -> int:
+    if not value.isdigit():
+        print(f"Invalid token count for {key}. Use a whole number, or 0 for the model's default")
+        raise click.Abort
+    return int(value)
+
+
+def _parse_reasoning_effort(_key: str, value: str) -> str:
+    normalized_value = value.lower()
+    if normalized_value in ["auto", "default"]:
+        return ""
+    if normalized_value in REASONING_EFFORT_CHOICES:
+        return normalized_value
+    print("Invalid reasoning effort. Use auto/default or one of: " + ", ".join(REASONING_EFFORT_CHOICES))
+    raise click.Abort
+
+
+# 每个可设置的键及其取值的校验与转换，校验失败时打印原因并中止
+SETTING_PARSERS: dict[str, Callable[[str, str], Any]] = {
+    "apiKey": _parse_text,
+    "apiUrl": _parse_text,
+    "model": _parse_text,
+    "reasoning_effort": _parse_reasoning_effort,
+    "show_command": _parse_bool,
+    "skip_confirm": _parse_bool,
+    "history_index": _parse_bool,
+    "diff_token_budget": _parse_token_count,
+    "stream": _parse_bool,
+}
+
+
 @click.command()
 @click.argument("key", required=False)
 @click.argument("value", required=False)
@@ -27,33 +74,9 @@ def settings_command(
         print("Use --interactive or -i for interactive configuration")
         raise click.Abort
 
-    available_keys = ["apiKey", "apiUrl", "model", "reasoning_effort", "show_command", "skip_confirm"]
-
-    if key not in available_keys:
-        print(f"Key {key} is not valid. Available keys: {', '.join(available_keys)}")
+    if key not in SETTING_PARSERS:
+        print(f"Key {key} is not valid. Available keys: {', '.join(SETTING_PARSERS)}")
         raise click.Abort
-    true_value = value
-    # Convert boolean strings
-    if key in ["show_command", "skip_confirm"]:
-        if value.lower() in ["true", "1", "yes", "on"]:
-            true_value = True
-        elif value.lower() in ["false", "0", "no", "off"]:
-            true_value = False
-        else:
-            print(f"Invalid boolean value for {key}. Use true/false, 1/0, yes/no, or on/off")
-            raise click.Abort
-    elif key == "reasoning_effort":
-        normalized_value = value.lower()
-        if normalized_value in ["auto", "default"]:
-            true_value = ""
-        elif normalized_value in REASONING_EFFORT_CHOICES:
-            true_value = normalized_value
-        else:
-            print(
-                "Invalid reasoning effort. Use auto/default or one of: "
-                + ", ".join(REASONING_EFFORT_CHOICES)
-            )
-            raise click.Abort
-
-    set_global_settings(key, true_value)
+
+    set_global_settings(key, SETTING_PARSERS[key](key, value))
     print(f"[green]Setting {key} updated successfully![/green]")
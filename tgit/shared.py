@@ -2,3 +2,9 @@ from tgit.types import TGitSettings
 from tgit.utils import load_settings
 
 settings: TGitSettings = load_settings()
+
+
+def reload_settings() -> TGitSettings:
+    """Re-read settings for the current directory, updating the shared object in place for existing importers."""
+    settings.__dict__.update(load_settings().__dict__)
+    return settings
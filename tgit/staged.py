@@ -0,0 +1,312 @@
+"""The staged changes, read with a single streaming `git diff --cached` process and parsed once."""
+
+import codecs
+import io
+import re
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import IO
+
+import git
+
+# Raw entries and numstat counts come first as NUL-terminated fields, then an empty field and the patch text.
+# Textconv filters, external diff drivers and configured prefixes are overridden so the output is always git's own format.
+STAGED_DIFF_ARGS = (
+    "--cached",
+    "-z",
+    "--raw",
+    "--numstat",
+    "--patch",
+    "-M",
+    "--no-textconv",
+    "--no-ext-diff",
+    "--no-color",
+    "--src-prefix=a/",
+    "--dst-prefix=b/",
+)
+LOCK_FILE_SUFFIX = ".lock"
+# 重命名和复制在 raw 输出中带有旧路径和新路径
+TWO_PATH_STATUSES = ("R", "C")
+NUMSTAT_FIELDS = 3
+DIFF_SECTION_START = "diff --git "
+UNMERGED_SECTION_START = "* Unmerged path "
+SECTION_STARTS = (DIFF_SECTION_START, UNMERGED_SECTION_START)
+SECTION_START_BYTES = tuple(start.encode() for start in SECTION_STARTS)
+SECTION_MARKERS = tuple(b"\n" + start for start in SECTION_START_BYTES)
+READ_CHUNK_SIZE = 1 << 16
+HEADER_END = b"\0\0"
+# 含特殊字符的路径在补丁头中按 C 语言风格加引号转义
+QUOTED_PATH_PATTERN = re.compile(r'"((?:[^"\\]|\\.)*)"')
+OCTAL_ESCAPE_DIGITS = 3
+C_ESCAPE_PATTERN = re.compile(rb"\\([0-7]{3}|.)")
+C_ESCAPES = {b"a": b"\a", b"b": b"\b", b"t": b"\t", b"n": b"\n", b"v": b"\v", b"f": b"\f", b"r": b"\r"}
+
+
+@dataclass(frozen=True, slots=True)
+class PatchLimits:
+    """
+    Per-file bounds on the patch text kept in memory.
+
+    A file's patch over `max_chars` characters or `max_lines` lines keeps only its first `head_chars`
+    and last `tail_chars` characters; shorter patches are always kept whole.
+    """
+
+    max_chars: int
+    max_lines: int
+    head_chars: int
+    tail_chars: int
+
+
+@dataclass(frozen=True, slots=True)
+class StagedFile:
+    """
+    One entry of the staged diff; `added` and `deleted` are None for binary files.
+
+    When the patch went over the PatchLimits, `patch` holds its head, `patch_tail` its tail and
+    `patch_chars` the size of the whole patch.
+    """
+
+    path: str
+    status: str
+    old_path: str | None = None
+    added: int | None = None
+    deleted: int | None = None
+    patch: str = ""
+    patch_tail: str | None = None
+    patch_chars: int = 0
+
+    @property
+    def changed_lines(self) -> int:
+        return (self.added or 0) + (self.deleted or 0)
+
+    @property
+    def is_lock_file(self) -> bool:
+        return self.path.endswith(LOCK_FILE_SUFFIX)
+
+
+@dataclass(frozen=True, slots=True)
+class StagedChanges:
+    files: tuple[StagedFile, ...] = ()
+
+
+class _PatchSection:
+    """The patch text of one file, reduced to a bounded head and tail once it goes over the limits."""
+
+    __slots__ = ("chars", "head", "limits", "lines", "parts", "tail", "tail_chars")
+
+    def __init__(self, limits: PatchLimits | None) -> None:
+        self.limits = limits
+        self.parts: list[str] = []
+        self.head: str | None = None
+        self.tail: deque[str] = deque()
+        self.tail_chars = 0
+        self.chars = 0
+        self.lines = 0
+
+    def add(self, text: str) -> None:
+        self.chars += len(text)
+        self.lines += text.count("\n")
+        if self.head is not None:
+            self._add_tail(text)
+            return
+        self.parts.append(text)
+        limits = self.limits
+        if limits is None or (self.chars <= limits.max_chars and self.lines <= limits.max_lines):
+            return
+        # 超出限制且放不下开头加结尾时才截断，中间的内容读过即丢
+        if self.chars > limits.head_chars + limits.tail_chars:
+            text = "".join(self.parts)
+            self.parts = []
+            self.head = text[: limits.head_chars]
+            self._add_tail(text)
+
+    def _add_tail(self, text: str) -> None:
+        keep = self.limits.tail_chars if self.limits is not None else 0
+        self.tail.append(text)
+        self.tail_chars += len(text)
+        while self.tail and self.tail_chars - len(self.tail[0]) >= keep:
+            self.tail_chars -= len(self.tail.popleft())
+
+    def fields(self) -> tuple[str, str | None, int]:
+        """`patch`, `patch_tail` and `patch_chars` for the StagedFile."""
+        if self.head is None:
+            return "".join(self.parts), None, self.chars
+        keep = self.limits.tail_chars if self.limits is not None else 0
+        tail = "".join(self.tail)
+        return self.head, tail[len(tail) - keep :], self.chars
+
+
+def _read_header(stdout: IO[bytes]) -> tuple[bytes, bytes]:
+    """The raw and numstat fields, and whatever patch bytes were read past them."""
+    buffer = b""
+    searched = 0
+    while (end := buffer.find(HEADER_END, searched)) == -1:
+        chunk = stdout.read1(READ_CHUNK_SIZE)  # type: ignore[attr-defined]
+        if not chunk:
+            return buffer, b""
+        searched = max(len(buffer) - 1, 0)
+        buffer += chunk
+    return buffer[: end + 1], buffer[end + len(HEADER_END) :]
+
+
+def _find_section_start(buffer: bytes) -> int:
+    """Offset of the next section header that follows a newline in `buffer`, or -1."""
+    found = [idx + 1 for marker in SECTION_MARKERS if (idx := buffer.find(marker)) != -1]
+    return min(found, default=-1)
+
+
+def _iter_patch_chunks(pending: bytes, stdout: IO[bytes]) -> Iterator[tuple[bool, bytes]]:
+    """
+    The patch in chunks of about READ_CHUNK_SIZE bytes, each flagged when it starts a file's section.
+
+    Section headers are found with a search over whole chunks, so no Python code runs per patch line.
+    """
+    # 保留可能被读取边界截断的标记前缀，下一轮再查找
+    hold = max(map(len, SECTION_MARKERS)) - 1
+    buffer = pending
+    at_line_start = True
+    eof = False
+    while True:
+        while not eof and len(buffer) <= max(READ_CHUNK_SIZE, hold):
+            chunk = stdout.read1(READ_CHUNK_SIZE)  # type: ignore[attr-defined]
+            eof = not chunk
+            buffer += chunk
+        if not buffer:
+            return
+        starts_section = at_line_start and buffer.startswith(SECTION_START_BYTES)
+        if (end := _find_section_start(buffer)) != -1:
+            piece, buffer = buffer[:end], buffer[end:]
+        elif eof:
+            piece, buffer = buffer, b""
+        else:
+            piece, buffer = buffer[:-hold], buffer[-hold:]
+        at_line_start = piece.endswith(b"\n")
+        yield starts_section, piece
+
+
+def _iter_section_pieces(pending: bytes, stdout: IO[bytes]) -> Iterator[tuple[bytes | None, bytes]]:
+    """The patch chunks, each paired with the header line of the section it starts, or None."""
+    # 读取边界可能截断头行，凑齐整行后再产出
+    started: bytes | None = None
+    for starts_section, piece in _iter_patch_chunks(pending, stdout):
+        if starts_section:
+            started = piece
+        elif started is not None:
+            started += piece
+        else:
+            yield None, piece
+            continue
+        if b"\n" in started:
+            yield started.split(b"\n", 1)[0], started
+            started = None
+    if started is not None:
+        yield started, started
+
+
+def _unquote_path(quoted: str) -> str:
+    raw = C_ESCAPE_PATTERN.sub(
+        lambda m: bytes([int(m[1], 8)]) if len(m[1]) == OCTAL_ESCAPE_DIGITS else C_ESCAPES.get(m[1], m[1]),
+        quoted.encode(),
+    )
+    return raw.decode("utf-8", errors="replace")
+
+
+def _section_key(header_line: bytes) -> str:
+    """What a section header names: `a/<old> b/<new>` with quoting undone, or the path of an unmerged file."""
+    line = header_line.decode("utf-8", errors="replace")
+    if line.startswith(UNMERGED_SECTION_START):
+        return line[len(UNMERGED_SECTION_START) :]
+    return QUOTED_PATH_PATTERN.sub(lambda m: _unquote_path(m[1]), line[len(DIFF_SECTION_START) :])
+
+
+def _entry_key(status: str, path: str, old_path: str | None) -> str:
+    """The section key of the patch that belongs to a raw entry."""
+    if status.startswith("U"):
+        return path
+    return f"a/{old_path if old_path is not None else path} b/{path}"
+
+
+def _parse_header(header: str) -> list[tuple[str, str, str | None, int | None, int | None]]:
+    fields = header.split("\0")
+    position = 0
+    entries: list[tuple[str, str, str | None]] = []
+    while position < len(fields) and fields[position].startswith(":"):
+        status = fields[position].split()[-1]
+        if status.startswith(TWO_PATH_STATUSES):
+            entries.append((status, fields[position + 2], fields[position + 1]))
+            position += 3
+        else:
+            entries.append((status, fields[position + 1], None))
+            position += 2
+
+    counts: dict[str, tuple[int | None, int | None]] = {}
+    while position < len(fields) and fields[position]:
+        parts = fields[position].split("\t")
+        if len(parts) < NUMSTAT_FIELDS:
+            break
+        path = parts[2]
+        if not path:
+            # 重命名时 numstat 的路径字段为空，随后是旧路径和新路径
+            path = fields[position + 2]
+            position += 2
+        counts[path] = (_parse_count(parts[0]), _parse_count(parts[1]))
+        position += 1
+    return [(status, path, old_path, *counts.get(path, (None, None))) for status, path, old_path in entries]
+
+
+def _parse_count(value: str) -> int | None:
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def parse_staged_diff_stream(stdout: IO[bytes], limits: PatchLimits | None = None) -> StagedChanges:
+    """
+    Parse the output of `git diff` run with STAGED_DIFF_ARGS as it is read.
+
+    With `limits`, memory is bounded by the number of files times the per-file limits, whatever the size of the diff.
+    """
+    header, pending = _read_header(stdout)
+    entries = _parse_header(header.decode("utf-8", errors="replace"))
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    # 按补丁头中的路径对应到 raw 条目；类型变更（T）的一个文件有删除和新增两段补丁，合并为一段
+    sections: dict[str, _PatchSection] = {}
+    section = _PatchSection(limits)
+    for header_line, piece in _iter_section_pieces(pending, stdout):
+        if header_line is not None:
+            key = _section_key(header_line)
+            if (section := sections.get(key)) is None:
+                section = sections[key] = _PatchSection(limits)
+        section.add(decoder.decode(piece))
+
+    files = []
+    for status, path, old_path, added, deleted in entries:
+        file_section = sections.get(_entry_key(status, path, old_path))
+        patch, patch_tail, patch_chars = file_section.fields() if file_section is not None else ("", None, 0)
+        files.append(StagedFile(path, status, old_path, added, deleted, patch, patch_tail, patch_chars))
+    return StagedChanges(tuple(files))
+
+
+def parse_staged_diff(output: str, limits: PatchLimits | None = None) -> StagedChanges:
+    """Parse the output of `git diff` run with STAGED_DIFF_ARGS."""
+    return parse_staged_diff_stream(io.BytesIO(output.encode()), limits)
+
+
+def read_staged_changes(repo: git.Repo, limits: PatchLimits | None = None) -> StagedChanges:
+    """File list, line counts and patch of everything staged, streamed from one `git diff --cached`."""
+    process = repo.git.diff(*STAGED_DIFF_ARGS, as_process=True)
+    stdout = process.proc.stdout
+    finished = False
+    try:
+        staged = parse_staged_diff_stream(stdout, limits)
+        finished = True
+    finally:
+        if finished:
+            process.wait()
+        else:
+            process.proc.kill()
+            process.proc.wait()
+        stdout.close()
+    return staged
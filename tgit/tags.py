@@ -0,0 +1,108 @@
+"""Tag index built from a single `git for-each-ref` call."""
+
+import re
+from datetime import datetime
+from typing import NamedTuple
+
+import git
+
+from tgit.repo_cache import repo_cached
+
+FIELD_SEPARATOR = "\x1f"
+# name, object type, object, peeled type, peeled object, committer date, peeled committer date, tagger date
+TAG_FORMAT = (
+    "%(refname:strip=2)%1f%(objecttype)%1f%(objectname)%1f%(*objecttype)%1f%(*objectname)"
+    "%1f%(committerdate:iso-strict)%1f%(*committerdate:iso-strict)%1f%(taggerdate:iso-strict)"
+)
+TAG_FIELD_COUNT = 8
+TAG_VERSION_PREFIX = "v"
+semver_regex = re.compile(
+    r"^(0|[1-9]\d*)\.(0|[1-9]\d*)\.(0|[1-9]\d*)(?:-((?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*)(?:\.(?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*))*))?(?:\+([0-9a-zA-Z-]+(?:\.[0-9a-zA-Z-]+)*))?$",
+)
+
+
+class TagInfo(NamedTuple):
+    name: str
+    sha: str  # the tagged commit, with annotated tags peeled
+    committed_datetime: datetime
+    tagger_datetime: datetime | None  # only annotated tags have one
+    semver: tuple | None  # precedence key, None for tags that are not semantic versions
+
+
+def semver_key(name: str) -> tuple | None:
+    """Precedence key for a `1.2.3` / `v1.2.3-rc.1` tag name, following semver.org rules."""
+    match = semver_regex.match(name.removeprefix(TAG_VERSION_PREFIX))
+    if not match:
+        return None
+    major, minor, patch, pre_release, _build = match.groups()
+    # A release sorts after all of its pre-releases; numeric identifiers sort before alphanumeric ones.
+    pre_release_key = (
+        tuple((0, int(part), "") if part.isdigit() else (1, 0, part) for part in pre_release.split(".")) if pre_release else ()
+    )
+    return (int(major), int(minor), int(patch), pre_release is None, pre_release_key)
+
+
+def parse_tag_line(line: str) -> TagInfo | None:
+    """Parse one `TAG_FORMAT` line; returns `None` for tags that do not point at a commit."""
+    fields = line.split(FIELD_SEPARATOR)
+    if len(fields) != TAG_FIELD_COUNT:
+        return None
+    name, object_type, object_name, peeled_type, peeled_name, committer_date, peeled_committer_date, tagger_date = fields
+    if object_type == "commit":
+        sha, date = object_name, committer_date
+    elif peeled_type == "commit":
+        sha, date = peeled_name, peeled_committer_date
+    else:
+        return None
+    return TagInfo(
+        name=name,
+        sha=sha,
+        committed_datetime=datetime.fromisoformat(date),
+        tagger_datetime=datetime.fromisoformat(tagger_date) if tagger_date else None,
+        semver=semver_key(name),
+    )
+
+
+class TagIndex:
+    """Every tag in a repository, ordered by the commit date of the tagged commit."""
+
+    def __init__(self, tags: list[TagInfo]) -> None:
+        # sorted() is stable, so tags on equally dated commits keep git's refname order.
+        self.by_date: list[TagInfo] = sorted(tags, key=lambda tag: tag.committed_datetime)
+        self._by_name = {tag.name: tag for tag in self.by_date}
+        self._positions = {tag.name: position for position, tag in enumerate(self.by_date)}
+
+    def __len__(self) -> int:
+        return len(self.by_date)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+
+    def __getitem__(self, name: str) -> TagInfo:
+        return self._by_name[name]
+
+    def get(self, name: str) -> TagInfo | None:
+        return self._by_name.get(name)
+
+    def older_than(self, name: str) -> list[TagInfo]:
+        """Tags dated before `name`, oldest first; empty when `name` is not a tag."""
+        return self.by_date[: self._positions.get(name, 0)]
+
+    @property
+    def by_semver(self) -> list[TagInfo]:
+        """Semantic-version tags from lowest to highest precedence; other tags are left out."""
+        return sorted((tag for tag in self.by_date if tag.semver is not None), key=lambda tag: tag.semver)
+
+    @property
+    def latest(self) -> TagInfo | None:
+        return self.by_date[-1] if self.by_date else None
+
+
+def build_tag_index(repo: git.Repo) -> TagIndex:
+    output = repo.git.for_each_ref("--sort=refname", f"--format={TAG_FORMAT}", "refs/tags")
+    return TagIndex([tag for line in output.splitlines() if (tag := parse_tag_line(line))])
+
+
+def get_tag_index(repo: git.Repo) -> TagIndex:
+    """The tag index for `repo`, built once per process."""
+    return repo_cached(repo, "tag_index", lambda: build_tag_index(repo))
@@ -37,3 +37,7 @@ class TGitSettings:
     reasoning_effort: str = ""
     show_command: bool = True
     skip_confirm: bool = False
+    history_index: bool = False
+    diff_token_budget: int = 0
+    stream: bool = False
+    diff_token_budgets: dict[str, int] = field(default_factory=dict[str, int])
@@ -1,12 +1,13 @@
+import contextlib
 import json
+import os
 import subprocess
 import sys
+import tempfile
 from pathlib import Path
 from typing import Any
 
-import questionary
 import rich
-from rich.syntax import Syntax
 
 from tgit.constants import DEFAULT_MODEL
 from tgit.types import CommitSettings, CommitType, TGitSettings
@@ -61,6 +62,10 @@ def simple_run_command(command: str) -> None:
 
 
 def run_command(settings: TGitSettings, command: str) -> None:
+    # Imported here so that lightweight commands such as `tgit add` stay free of prompt_toolkit and pygments.
+    import questionary  # noqa: PLC0415
+    from rich.syntax import Syntax  # noqa: PLC0415
+
     if settings.show_command:
         console.print("\n[cyan]The following command will be executed:[/cyan]")
         console.print(Syntax(f"\n{command}\n", "bash", line_numbers=False, theme="github-dark", background_color="default", word_wrap=True))
@@ -152,6 +157,10 @@ def _dict_to_settings(data: dict[str, Any]) -> TGitSettings:
         reasoning_effort=data.get("reasoning_effort", ""),
         show_command=data.get("show_command", True),
         skip_confirm=data.get("skip_confirm", False),
+        history_index=data.get("history_index", False),
+        diff_token_budget=data.get("diff_token_budget", 0),
+        diff_token_budgets=data.get("diff_token_budgets", {}),
+        stream=data.get("stream", False),
     )
 
 
@@ -163,3 +172,24 @@ def set_global_settings(key: str, value: Any) -> None:  # noqa: ANN401
 
     file_settings[key] = value
     global_settings_path.write_text(json.dumps(file_settings, indent=2))
+
+
+def write_cache_file(path: Path, data: dict[str, Any]) -> bool:
+    """
+    Write `data` as JSON to `path` through a temporary file, so readers never see a partial entry.
+
+    Returns False when the file could not be written: caches are an optimisation, and failing to write
+    one must not fail the command.
+    """
+    with contextlib.suppress(OSError):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            Path(temp_path).replace(path)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+        return True
+    return False
@@ -6,7 +6,6 @@ import shutil
 import subprocess
 import sys
 import tomllib
-from argparse import Namespace
 from copy import deepcopy
 from dataclasses import dataclass
 from difflib import Differ
@@ -17,14 +16,11 @@ import git
 import questionary
 from questionary import Choice
 
-from tgit.changelog import get_commits, get_git_commits_range, group_commits_by_type, handle_changelog
+from tgit.changelog import ChangelogArgs, TGITCommit, get_commits, get_git_commits_range, group_commits_by_type, handle_changelog
 from tgit.shared import settings
+from tgit.tags import semver_regex
 from tgit.utils import console, get_commit_command, run_command
 
-semver_regex = re.compile(
-    r"^(0|[1-9]\d*)\.(0|[1-9]\d*)\.(0|[1-9]\d*)(?:-((?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*)(?:\.(?:0|[1-9]\d*|\d*[a-zA-Z-][0-9a-zA-Z-]*))*))?(?:\+([0-9a-zA-Z-]+(?:\.[0-9a-zA-Z-]+)*))?$",
-)
-
 
 @dataclass
 class Version:
@@ -73,6 +69,7 @@ class VersionArgs:
     recursive: bool
     custom: str
     path: str
+    traversal: str = "all"
 
 
 class VersionChoice:
@@ -317,7 +314,7 @@ def get_version_from_git(path: Path) -> Version | None:
     return None
 
 
-def get_default_bump_by_commits_dict(commits_by_type: dict[str, list[git.Commit]], prev_version: Version | None = None) -> str:
+def get_default_bump_by_commits_dict(commits_by_type: dict[str, list[TGITCommit]], prev_version: Version | None = None) -> str:
     # v0.x.x breaking change 只 bump minor，v1+ 才 bump major
     if prev_version and prev_version.major == 0:
         if commits_by_type.get("breaking"):
@@ -479,16 +476,16 @@ def handle_version(args: VersionArgs) -> None:
         if ans:
             # 构造 changelog 参数对象
 
-            changelog_args = Namespace(
+            changelog_args = ChangelogArgs(
                 path=path,
                 from_raw=None,
                 to_raw=None,
                 output="CHANGELOG.md",
                 verbose=verbose,
+                traversal=args.traversal,
             )
 
-            # Type ignore needed for argparse Namespace to ChangelogArgs conversion
-            handle_changelog(changelog_args, current_tag=target_tag)  # type: ignore[arg-type]
+            handle_changelog(changelog_args, current_tag=target_tag)
         update_version_files(args, next_version, verbose, recursive=recursive)
         execute_git_commands(args, next_version, verbose)
 
@@ -511,19 +508,18 @@ def get_next_version(args: VersionArgs, prev_version: Version | None, verbose: i
     if _has_explicit_version_args(args):
         return _handle_explicit_version_args(args, prev_version)
 
-    default_bump = _get_default_bump_from_commits(args.path, prev_version, verbose)
+    default_bump = _get_default_bump_from_commits(args.path, prev_version, verbose, args.traversal)
     return _handle_interactive_version_selection(prev_version, default_bump, verbose)
 
 
-def _get_default_bump_from_commits(path: str, prev_version: Version, verbose: int) -> str:
+def _get_default_bump_from_commits(path: str, prev_version: Version, verbose: int, traversal: str = "all") -> str:
     repo = git.Repo(path)
     if verbose > 0:
         console.print("Getting commits...")
     from_ref, to_ref = get_git_commits_range(repo, "", "")
-    tgit_commits = get_commits(repo, from_ref, to_ref)
+    tgit_commits = get_commits(repo, from_ref, to_ref, traversal)
     commits_by_type = group_commits_by_type(tgit_commits)
-    # Type ignore needed for TGITCommit to Commit conversion
-    return get_default_bump_by_commits_dict(commits_by_type, prev_version)  # type: ignore[arg-type]
+    return get_default_bump_by_commits_dict(commits_by_type, prev_version)
 
 
 def _has_explicit_version_args(args: VersionArgs) -> bool:
@@ -853,6 +849,13 @@ def execute_git_commands(args: VersionArgs, next_version: Version, verbose: int)
 @click.option("-pm", "--preminor", help="preminor version")
 @click.option("-pM", "--premajor", help="premajor version")
 @click.option("--custom", is_flag=True, help="custom version to bump to")
+@click.option("--first-parent", "traversal", flag_value="first-parent", help="only follow the first parent of merge commits")
+@click.option(
+    "--merges-as-entries",
+    "traversal",
+    flag_value="merges",
+    help="follow the first parent and count merged pull requests by their title instead of their commits",
+)
 def version(  # noqa: PLR0913
     *,
     path: str,
@@ -868,6 +871,7 @@ def version(  # noqa: PLR0913
     prepatch: str = "",
     preminor: str = "",
     premajor: str = "",
+    traversal: str | None = None,
 ) -> None:
     # Check for mutually exclusive options
     exclusive_options: list[bool | str] = [patch, minor, major, prepatch, preminor, premajor, custom]
@@ -890,5 +894,6 @@ def version(  # noqa: PLR0913
         recursive=recursive,
         custom="" if not custom else "custom",
         path=path,
+        traversal=traversal or "all",
     )
     handle_version(args)